@@ -0,0 +1,163 @@
+import functools
+import os
+import random
+import sys
+import time
+from typing import Optional
+
+from eth_utils import to_checksum_address
+
+ADDRESS_BYTES = 20
+CHECKSUM_CACHE_SIZE = int(os.getenv("CHECKSUM_CACHE_SIZE", "65536"))
+
+_HEX_CHARS = frozenset("0123456789abcdef")
+
+
+# ── Lowercase canonical form (no Keccak) ─────────────────────────────────────
+
+def lower_address(addr) -> Optional[str]:
+    """
+    Canonical lowercase "0x…" form of *addr*, or None if it is not 40 hex
+    characters. This is the key used for every dict/set in the indexer, and
+    getting it needs only a case fold and a character check — no Keccak.
+    """
+    if not addr:
+        return None
+    s = str(addr).lower()
+    if len(s) == 42 and s[:2] == "0x":
+        body = s[2:]
+    elif len(s) == 40:
+        body = s
+        s = "0x" + s
+    else:
+        return None
+    return s if _HEX_CHARS.issuperset(body) else None
+
+
+# ── EIP-55 checksum form (memoized) ──────────────────────────────────────────
+
+@functools.lru_cache(maxsize=CHECKSUM_CACHE_SIZE)
+def _checksum_lower(lower: str) -> str:
+    return to_checksum_address(lower)
+
+
+def checksum_address(addr) -> Optional[str]:
+    """
+    EIP-55 form of *addr*, or None if it is not a valid address. Results are
+    kept in a bounded LRU keyed by the lowercase form, so the Keccak runs
+    once per distinct address rather than once per transaction.
+    """
+    lower = lower_address(addr)
+    return _checksum_lower(lower) if lower else None
+
+
+def checksum_cache_info():
+    return _checksum_lower.cache_info()
+
+
+# ── Binary form ──────────────────────────────────────────────────────────────
+
+class Address(bytes):
+    """
+    20-byte address. Hashes and compares as plain bytes, so it can key the
+    packed user stores directly; renders as the lowercase hex form.
+    """
+
+    __slots__ = ()
+
+    @property
+    def lower(self) -> str:
+        return "0x" + self.hex()
+
+    @property
+    def checksum(self) -> str:
+        return _checksum_lower(self.lower)
+
+    def __str__(self) -> str:
+        return self.lower
+
+
+def address_to_bytes(addr) -> Optional[Address]:
+    """
+    Decode a 0x-prefixed (or bare) hex address into its 20-byte form.
+    Returns None for anything that is not exactly 40 hex characters.
+    """
+    if not addr:
+        return None
+    addr = str(addr)
+    hex_part = addr[2:] if addr[:2] in ("0x", "0X") else addr
+    if len(hex_part) != ADDRESS_BYTES * 2:
+        return None
+    try:
+        return Address.fromhex(hex_part)
+    except ValueError:
+        return None
+
+
+def bytes_to_address(key: bytes) -> str:
+    return "0x" + key.hex()
+
+
+# ── Benchmark: python -m addresses [n_txs] ───────────────────────────────────
+
+def _bench(n: int = 100_000, faucets: int = 2_000, users: int = 30_000) -> None:
+    """
+    Replays the refresh_all_data claim loop over *n* synthetic factory
+    transactions: once the old way (checksum per tx, then .lower() it) and
+    once through the lowercase fast path with checksums only for faucets
+    seen for the first time.
+    """
+    rng = random.Random(7)
+    faucet_pool = [to_checksum_address("0x" + rng.randbytes(20).hex()) for _ in range(faucets)]
+    user_pool   = ["0x" + rng.randbytes(20).hex() for _ in range(users)]
+    txs = [
+        (rng.choice(faucet_pool), "claim", rng.choice(user_pool), 10**18, True, 1_700_000_000 + i)
+        for i in range(n)
+    ]
+    deleted = set(a.lower() for a in faucet_pool[: faucets // 50])
+
+    t0 = time.perf_counter()
+    stats_old: dict = {}
+    for tx in txs:
+        try:
+            faucet_cs = to_checksum_address(str(tx[0]))
+        except Exception:
+            continue
+        addr_lower = faucet_cs.lower()
+        if addr_lower in deleted:
+            continue
+        entry = stats_old.setdefault(addr_lower, {"claims": 0, "addr_checksum": faucet_cs})
+        entry["claims"] += 1
+    for tx in txs:
+        if str(tx[0]).lower() in deleted:
+            continue
+        to_checksum_address(str(tx[2])).lower()
+    old_s = time.perf_counter() - t0
+
+    _checksum_lower.cache_clear()
+    t0 = time.perf_counter()
+    stats_new: dict = {}
+    for tx in txs:
+        addr_lower = lower_address(tx[0])
+        if not addr_lower or addr_lower in deleted:
+            continue
+        entry = stats_new.get(addr_lower)
+        if entry is None:
+            entry = stats_new[addr_lower] = {"claims": 0, "addr_checksum": checksum_address(addr_lower)}
+        entry["claims"] += 1
+    for tx in txs:
+        if lower_address(tx[0]) in deleted:
+            continue
+        address_to_bytes(tx[2])
+    new_s = time.perf_counter() - t0
+
+    assert stats_old == stats_new
+    info = checksum_cache_info()
+    print(f"replay: {n} txs, {faucets} faucets, {users} users")
+    print(f"  checksum per tx     : {old_s * 1000:8.1f} ms")
+    print(f"  lowercase fast path : {new_s * 1000:8.1f} ms   ({old_s / new_s:.1f}x)")
+    print(f"  checksum LRU        : {info.hits} hits, {info.misses} misses, {info.currsize}/{info.maxsize}")
+
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
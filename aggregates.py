@@ -0,0 +1,253 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from postgrest.exceptions import APIError
+
+# Postgres functions behind the quest / quiz dashboard lists. They return one
+# row per quest / quiz instead of every participant, task and question row.
+# Apply once in the Supabase SQL editor (python -m aggregates prints this).
+FUNCTIONS_SQL = """
+create or replace function public.quest_dashboard_counts()
+returns table (quest_address text, participants bigint, tasks integer)
+language sql stable as $$
+    select coalesce(p.quest_address, t.faucet_address),
+           coalesce(p.participants, 0),
+           coalesce(t.tasks, 0)
+    from (
+        select quest_address, count(*) as participants
+        from public.quest_participants
+        group by quest_address
+    ) p
+    full outer join (
+        select faucet_address, coalesce(jsonb_array_length(tasks::jsonb), 0) as tasks
+        from public.faucet_tasks
+    ) t on t.faucet_address = p.quest_address
+$$;
+
+create or replace function public.quiz_dashboard_counts()
+returns table (quiz_id text, players bigint, questions bigint)
+language sql stable as $$
+    select coalesce(p.quiz_id, q.quiz_id)::text,
+           coalesce(p.players, 0),
+           coalesce(q.questions, 0)
+    from (
+        select quiz_id, count(*) as players
+        from public.faucet_quiz_participants
+        group by quiz_id
+    ) p
+    full outer join (
+        select quiz_id, count(*) as questions
+        from public.faucet_quiz_questions
+        group by quiz_id
+    ) q on q.quiz_id = p.quiz_id
+$$;
+
+-- Page views land here as one counter row per post (older views stay as
+-- rows in blog_post_views). last_flush makes a retried increment a no-op.
+create table if not exists public.blog_post_view_counts (
+    post_id    text primary key,
+    views      bigint not null default 0,
+    last_flush text
+);
+
+create or replace function public.increment_blog_post_views(p_post_id text, p_views bigint, p_flush_id text)
+returns void
+language sql as $$
+    insert into public.blog_post_view_counts as c (post_id, views, last_flush)
+    values (p_post_id, p_views, p_flush_id)
+    on conflict (post_id) do update
+        set views = c.views + excluded.views, last_flush = excluded.last_flush
+        where c.last_flush is distinct from excluded.last_flush
+$$;
+
+-- Ids arrive as text and are matched against blog_posts (a small table), so
+-- the likes / views lookups compare post_id with its own type and use its index
+create or replace function public.blog_post_counts(post_ids text[])
+returns table (post_id text, likes bigint, views bigint)
+language sql stable as $$
+    select p.id::text,
+           (select count(*) from public.blog_post_likes l where l.post_id = p.id),
+           (select count(*) from public.blog_post_views v where v.post_id = p.id)
+             + coalesce((select c.views from public.blog_post_view_counts c where c.post_id = p.id::text), 0)
+    from public.blog_posts p
+    where p.id::text = any(post_ids)
+$$;
+"""
+
+QUEST_COUNTS_RPC = "quest_dashboard_counts"
+QUIZ_COUNTS_RPC  = "quiz_dashboard_counts"
+BLOG_COUNTS_RPC  = "blog_post_counts"
+BLOG_VIEWS_RPC   = "increment_blog_post_views"
+
+# Functions PostgREST reported as missing; skipped until restart
+_missing_rpcs: set = set()
+
+# PostgREST's default max-rows: fallback reads page at this size
+FALLBACK_PAGE_SIZE = 1000
+
+
+# ── Local implementations (fallback + memory backend) ───────────────────────
+
+def quest_counts_from_rows(participant_rows: Iterable[Dict], task_rows: Iterable[Dict]) -> List[Dict]:
+    counts: Dict[str, Dict] = {}
+    for p in participant_rows:
+        row = counts.setdefault(p["quest_address"], {"quest_address": p["quest_address"], "participants": 0, "tasks": 0})
+        row["participants"] += 1
+    for t in task_rows:
+        row = counts.setdefault(t["faucet_address"], {"quest_address": t["faucet_address"], "participants": 0, "tasks": 0})
+        row["tasks"] = len(t.get("tasks") or [])
+    return list(counts.values())
+
+
+def quiz_counts_from_rows(participant_rows: Iterable[Dict], question_rows: Iterable[Dict]) -> List[Dict]:
+    counts: Dict[str, Dict] = {}
+    for rows, col in ((participant_rows, "players"), (question_rows, "questions")):
+        for r in rows:
+            qid = str(r["quiz_id"])
+            row = counts.setdefault(qid, {"quiz_id": qid, "players": 0, "questions": 0})
+            row[col] += 1
+    return list(counts.values())
+
+
+def blog_counts_from_rows(post_ids: Iterable, like_rows: Iterable[Dict], view_rows: Iterable[Dict],
+                          counter_rows: Iterable[Dict] = ()) -> List[Dict]:
+    counts = {str(pid): {"post_id": str(pid), "likes": 0, "views": 0} for pid in post_ids}
+    for rows, col in ((like_rows, "likes"), (view_rows, "views")):
+        for r in rows:
+            row = counts.get(str(r["post_id"]))
+            if row is not None:
+                row[col] += 1
+    for r in counter_rows:
+        row = counts.get(str(r["post_id"]))
+        if row is not None:
+            row["views"] += int(r["views"] or 0)
+    return list(counts.values())
+
+
+def increment_views_in_rows(counter_rows: List[Dict], p_post_id: str, p_views: int, p_flush_id: str) -> None:
+    for r in counter_rows:
+        if r["post_id"] == p_post_id:
+            if r.get("last_flush") != p_flush_id:
+                r["views"], r["last_flush"] = r["views"] + p_views, p_flush_id
+            return
+    counter_rows.append({"post_id": p_post_id, "views": p_views, "last_flush": p_flush_id})
+
+
+def _paged_rows(client: Any, table: str, columns: str, order: str) -> List[Dict]:
+    """Every row of *table*, read in pages ordered by the unique column *order*."""
+    rows: List[Dict] = []
+    while True:
+        page = client.table(table).select(columns).order(order)\
+            .range(len(rows), len(rows) + FALLBACK_PAGE_SIZE - 1).execute().data or []
+        rows.extend(page)
+        if len(page) < FALLBACK_PAGE_SIZE:
+            return rows
+
+
+def _fetch_quest_counts_locally(client: Any) -> List[Dict]:
+    return quest_counts_from_rows(
+        _paged_rows(client, "quest_participants", "quest_address", "id"),
+        _paged_rows(client, "faucet_tasks", "faucet_address, tasks", "faucet_address"),
+    )
+
+
+def _fetch_quiz_counts_locally(client: Any) -> List[Dict]:
+    return quiz_counts_from_rows(
+        _paged_rows(client, "faucet_quiz_participants", "quiz_id", "id"),
+        _paged_rows(client, "faucet_quiz_questions", "quiz_id", "id"),
+    )
+
+
+def _exact_count(client: Any, table: str, post_id) -> int:
+    return client.table(table).select("post_id", count="exact").eq("post_id", post_id).limit(1).execute().count or 0
+
+
+def _fetch_blog_counts_locally(client: Any, post_ids: List) -> List[Dict]:
+    # Exact counts per post: row reads would stop at PostgREST's max-rows.
+    # The counter table holds at most one row per post.
+    try:
+        counters = client.table("blog_post_view_counts").select("post_id, views")\
+            .in_("post_id", [str(pid) for pid in post_ids]).execute().data or []
+    except APIError:
+        counters = []  # not created yet: every view is still a row
+    views = {r["post_id"]: int(r["views"] or 0) for r in counters}
+    return [
+        {"post_id": str(pid),
+         "likes":   _exact_count(client, "blog_post_likes", pid),
+         "views":   _exact_count(client, "blog_post_views", pid) + views.get(str(pid), 0)}
+        for pid in post_ids
+    ]
+
+
+def register_memory_rpcs(client: Any) -> None:
+    """Back the functions with Python on the in-memory storage backend."""
+    client.register_rpc(QUEST_COUNTS_RPC, lambda c: quest_counts_from_rows(c.rows("quest_participants"), c.rows("faucet_tasks")))
+    client.register_rpc(QUIZ_COUNTS_RPC, lambda c: quiz_counts_from_rows(c.rows("faucet_quiz_participants"), c.rows("faucet_quiz_questions")))
+    client.register_rpc(BLOG_COUNTS_RPC, lambda c, post_ids: blog_counts_from_rows(
+        post_ids, c.rows("blog_post_likes"), c.rows("blog_post_views"), c.rows("blog_post_view_counts")))
+    client.register_rpc(BLOG_VIEWS_RPC, lambda c, **params: increment_views_in_rows(c.rows("blog_post_view_counts"), **params))
+
+
+# ── Callers ──────────────────────────────────────────────────────────────────
+
+def _call(client: Any, fn: str, fallback: Callable[[Any], List[Dict]], params: Optional[Dict] = None) -> List[Dict]:
+    if fn not in _missing_rpcs:
+        try:
+            return client.rpc(fn, params or {}).execute().data or []
+        except APIError as e:
+            if e.code == "PGRST202":
+                _missing_rpcs.add(fn)
+                print(f"⚠️  [aggregates] {fn}() not deployed — counting rows locally (python -m aggregates prints the SQL)")
+            else:
+                print(f"⚠️  [aggregates] {fn}() failed, counting rows locally: {e}")
+        except Exception as e:
+            print(f"⚠️  [aggregates] {fn}() failed, counting rows locally: {e}")
+    return fallback(client)
+
+
+def quest_dashboard_counts(client: Any) -> Dict[str, Dict]:
+    """{quest_address: {"participants": n, "tasks": n}}"""
+    return {
+        r["quest_address"]: {"participants": int(r["participants"] or 0), "tasks": int(r["tasks"] or 0)}
+        for r in _call(client, QUEST_COUNTS_RPC, _fetch_quest_counts_locally)
+    }
+
+
+def quiz_dashboard_counts(client: Any) -> Dict[str, Dict]:
+    """{str(quiz_id): {"players": n, "questions": n}}"""
+    return {
+        str(r["quiz_id"]): {"players": int(r["players"] or 0), "questions": int(r["questions"] or 0)}
+        for r in _call(client, QUIZ_COUNTS_RPC, _fetch_quiz_counts_locally)
+    }
+
+
+
+def blog_post_counts(client: Any, post_ids: List) -> Dict[str, Dict]:
+    """{str(post_id): {"likes": n, "views": n}} for the given posts."""
+    if not post_ids:
+        return {}
+    rows = _call(client, BLOG_COUNTS_RPC, lambda c: _fetch_blog_counts_locally(c, post_ids),
+                 {"post_ids": [str(pid) for pid in post_ids]})
+    return {str(r["post_id"]): {"likes": int(r["likes"] or 0), "views": int(r["views"] or 0)} for r in rows}
+
+
+def increment_blog_post_views(client: Any, post_id, views: int, flush_id: str) -> None:
+    """
+    Add *views* to the post's counter row. Retrying with the same *flush_id*
+    is a no-op once it has landed. Errors propagate so the caller can retry:
+    unlike reads, a failed write must not fall back after it may have landed.
+    """
+    if BLOG_VIEWS_RPC not in _missing_rpcs:
+        try:
+            client.rpc(BLOG_VIEWS_RPC, {"p_post_id": str(post_id), "p_views": views, "p_flush_id": flush_id}).execute()
+            return
+        except APIError as e:
+            if e.code != "PGRST202":
+                raise
+            _missing_rpcs.add(BLOG_VIEWS_RPC)
+            print(f"⚠️  [aggregates] {BLOG_VIEWS_RPC}() not deployed — writing view rows (python -m aggregates prints the SQL)")
+    # One insert for the post's views; not idempotent, so a retry may repeat it
+    client.table("blog_post_views").insert([{"post_id": post_id}] * views).execute()
+
+
+if __name__ == "__main__":
+    print(FUNCTIONS_SQL.strip())
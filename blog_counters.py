@@ -0,0 +1,202 @@
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class BlogCounters:
+    """
+    Likes / views per blog post, kept in memory, with page views written
+    behind.
+
+    view() only bumps an in-memory counter; flush() writes each post's
+    buffered views as one increment and folds it into the stored totals
+    once it lands. Every increment carries a flush id: a post whose write
+    failed is retried with the same id and count before any new views are
+    sent for it, so the writer can drop a retry that already landed.
+
+    Stored totals are loaded outside any lock and kept for *ttl* seconds,
+    so counts written by other instances show up. A load that overlaps a
+    write of the same post is returned but not kept, since it may or may
+    not include that write. A crash loses at most one flush interval of
+    views.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._stored:  Dict[str, Dict[str, float]] = {}       # post -> {"likes", "views", "loaded_at"}
+        self._pending: Dict[str, int] = {}                    # post -> views not yet written
+        self._unsent:  Dict[str, Tuple[str, int]] = {}        # post -> (flush id, views) of a failed write
+        self._ids:     Dict[str, Any] = {}                    # post -> id as the caller passed it
+        self._writes:  Dict[str, int] = {}                    # post -> bumped at the start and end of each write
+        self._lock = threading.Lock()
+        # Serialises flushes only; readers never wait on it
+        self._flush_lock = threading.Lock()
+
+    def view(self, post_id) -> None:
+        key = str(post_id)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._ids[key] = post_id
+
+    def pending(self, post_id) -> int:
+        key = str(post_id)
+        unsent = self._unsent.get(key)
+        return self._pending.get(key, 0) + (unsent[1] if unsent else 0)
+
+    def views(self, post_id, stored_views: int) -> int:
+        """Views for *post_id*, with *stored_views* standing in when its total is not loaded yet."""
+        key = str(post_id)
+        stored = self._stored.get(key)
+        return int(stored["views"] if stored is not None else stored_views) + self.pending(key)
+
+    def peek(self, post_id) -> Optional[Dict[str, int]]:
+        """{"likes", "views"} if the stored total is loaded and younger than ttl; never loads."""
+        key = str(post_id)
+        stored = self._stored.get(key)
+        if stored is None or time.monotonic() - stored["loaded_at"] > self.ttl:
+            return None
+        return {"likes": int(stored["likes"]), "views": int(stored["views"]) + self.pending(key)}
+
+    def get(self, post_id, load: Callable[[List], Dict[str, Dict]]) -> Dict[str, int]:
+        """{"likes", "views"} for *post_id*; *load* fetches stored totals when missing or older than ttl."""
+        key = str(post_id)
+        stored = self._stored.get(key)
+        if stored is None or time.monotonic() - stored["loaded_at"] > self.ttl:
+            with self._lock:
+                seen = self._writes.get(key, 0)
+            loaded = load([post_id]).get(key) or {"likes": 0, "views": 0}
+            fresh = {"likes": int(loaded["likes"]), "views": int(loaded["views"]), "loaded_at": time.monotonic()}
+            with self._lock:
+                # Odd means a write was in flight when the load started
+                if seen % 2 == 0 and self._writes.get(key, 0) == seen:
+                    self._stored[key] = fresh
+                    stored = fresh
+                elif stored is None:
+                    stored = fresh
+        return {"likes": int(stored["likes"]), "views": int(stored["views"]) + self.pending(key)}
+
+    def set_likes(self, post_id, likes: int) -> None:
+        with self._lock:
+            stored = self._stored.get(str(post_id))
+            if stored is not None:
+                stored["likes"] = likes
+
+    def forget(self, post_id) -> None:
+        key = str(post_id)
+        with self._lock:
+            for d in (self._stored, self._pending, self._unsent, self._ids, self._writes):
+                d.pop(key, None)
+
+    def flush(self, write: Callable[[Any, int, str], None]) -> Tuple[int, Dict[str, Exception]]:
+        """
+        Write buffered views via write(post_id, views, flush_id), one call per
+        post. Returns (views written, {post: error} for the writes that
+        failed); those are retried unchanged on the next flush.
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch: Dict[str, Tuple[str, int]] = self._unsent
+                self._unsent = {}
+                for key in list(self._pending):
+                    # A post with a failed write keeps its new views until that write lands
+                    if key not in batch:
+                        batch[key] = (uuid.uuid4().hex, self._pending.pop(key))
+                ids = {key: self._ids.get(key, key) for key in batch}
+
+            written, failed = 0, {}
+            for key, (flush_id, n) in batch.items():
+                with self._lock:
+                    self._writes[key] = self._writes.get(key, 0) + 1
+                try:
+                    write(ids[key], n, flush_id)
+                except Exception as e:
+                    failed[key] = e
+                with self._lock:
+                    self._writes[key] = self._writes.get(key, 0) + 1
+                    if key in failed:
+                        self._unsent[key] = (flush_id, n)
+                        continue
+                    stored = self._stored.get(key)
+                    if stored is not None:
+                        stored["views"] += n
+                written += n
+            return written, failed
+
+    def __len__(self) -> int:
+        return len(self._stored)
+
+
+# ── Check: python -m blog_counters ───────────────────────────────────────────
+
+def _verify(posts: int = 50, views: int = 20_000, writers: int = 8) -> None:
+    import random
+
+    rng = random.Random(5)
+    table: Dict[str, int] = {}      # stand-in for blog_post_view_counts
+    last_flush: Dict[str, str] = {}
+    table_lock = threading.Lock()
+    fail = {"before": 0.0, "after": 0.0}
+    load_delay = [0.0]
+
+    def load(ids: List) -> Dict[str, Dict]:
+        with table_lock:
+            counts = {str(i): {"likes": 0, "views": table.get(str(i), 0)} for i in ids}
+        time.sleep(load_delay[0])
+        return counts
+
+    def write(post_id, n: int, flush_id: str) -> None:
+        if rng.random() < fail["before"]:
+            raise RuntimeError("increment failed")
+        with table_lock:
+            key = str(post_id)
+            if last_flush.get(key) != flush_id:  # what increment_blog_post_views does
+                table[key] = table.get(key, 0) + n
+                last_flush[key] = flush_id
+        time.sleep(0.0005)
+        if rng.random() < fail["after"]:
+            raise RuntimeError("increment landed, response lost")
+
+    # Long ttl over many posts: first loads run all through the flushes and
+    # are kept, so one that raced a write would show; short ttl: reloads
+    for ttl, n_posts, delay in ((3600.0, posts * 100, 0.003), (0.002, posts, 0.0005)):
+        table.clear()
+        load_delay[0] = delay
+        counters = BlogCounters(ttl=ttl)
+        hits = [rng.randrange(n_posts) for _ in range(views)]
+
+        def _worker(chunk: List[int]) -> None:
+            for pid in chunk:
+                counters.view(pid)
+                counters.get(pid, load)
+
+        step = len(hits) // writers
+        threads = [threading.Thread(target=_worker, args=(hits[i * step:(i + 1) * step],)) for i in range(writers)]
+        for t in threads:
+            t.start()
+        flushed, failures = 0, 0
+        while any(t.is_alive() for t in threads):
+            fail["before"], fail["after"] = rng.random() * 0.3, rng.random() * 0.3
+            written, failed = counters.flush(write)
+            flushed, failures = flushed + written, failures + len(failed)
+        for t in threads:
+            t.join()
+        fail["before"] = fail["after"] = load_delay[0] = 0.0
+        while counters._unsent or counters._pending:
+            flushed += counters.flush(write)[0]
+
+        expected: Dict[str, int] = {}
+        for pid in hits[:step * writers]:
+            expected[str(pid)] = expected.get(str(pid), 0) + 1
+        assert table == expected and flushed == sum(expected.values())
+        assert all(counters.get(pid, load)["views"] == expected.get(str(pid), 0) for pid in range(n_posts))
+        print(f"ttl {ttl:g}s, {n_posts:,} posts: {step * writers:,} views from {writers} threads, {failures} failed post writes retried, totals match")
+
+    # Views another instance wrote show up once the stored total expires
+    table["0"] += 5
+    time.sleep(counters.ttl * 2)
+    assert counters.get(0, load)["views"] == expected["0"] + 5
+
+
+if __name__ == "__main__":
+    _verify()
@@ -0,0 +1,241 @@
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from addresses import lower_address
+
+CLAIM_TX_TYPES = ("claim", "claimwhenactive")
+_NO_TS = np.iinfo(np.int64).max
+
+
+# ── Decoding ─────────────────────────────────────────────────────────────────
+
+def _intern(column: Sequence, canonical: Callable) -> Tuple[List[str], np.ndarray]:
+    """
+    Map a column of raw values to dense ids. Only the distinct raw values go
+    through *canonical*; case variants that canonicalize to the same key
+    share an id and invalid values get -1.
+    """
+    raw_index: Dict = dict.fromkeys(column)
+    for i, raw in enumerate(raw_index):
+        raw_index[raw] = i
+    raw_ids = np.fromiter(map(raw_index.__getitem__, column), dtype=np.int64, count=len(column))
+    keys: List[str] = []
+    index: Dict[str, int] = {}
+    remap: List[int] = []
+    for raw in raw_index:
+        key = canonical(raw)
+        if key is None:
+            remap.append(-1)
+            continue
+        idx = index.get(key)
+        if idx is None:
+            idx = index[key] = len(keys)
+            keys.append(key)
+        remap.append(idx)
+    return keys, np.array(remap, dtype=np.int64)[raw_ids]
+
+
+def _lower_type(raw) -> str:
+    return str(raw).lower()
+
+
+class TxArrays:
+    """
+    Factory transactions (faucet, txType, claimer, amount, isEther, timestamp)
+    decoded into columns: interned faucet/type/claimer ids plus a timestamp
+    array. Ids index into the matching key lists. Amounts are uint256 and
+    nothing aggregates them, so they are not decoded.
+    """
+
+    __slots__ = ("faucets", "faucet_id", "types", "type_id", "claimers", "claimer_id", "ts")
+
+    def __init__(self, faucets, faucet_id, types, type_id, claimers, claimer_id, ts):
+        self.faucets,  self.faucet_id  = faucets,  faucet_id
+        self.types,    self.type_id    = types,    type_id
+        self.claimers, self.claimer_id = claimers, claimer_id
+        self.ts = ts
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def claim_mask(self, claim_types: Iterable[str] = CLAIM_TX_TYPES) -> np.ndarray:
+        wanted = set(claim_types)
+        codes  = [i for i, t in enumerate(self.types) if t in wanted]
+        return np.isin(self.type_id, codes)
+
+
+def decode_transactions(txs: Sequence) -> TxArrays:
+    if not txs:
+        empty = np.empty(0, dtype=np.int64)
+        return TxArrays([], empty, [], empty, [], empty, empty)
+    faucets,  faucet_id  = _intern([tx[0] for tx in txs], lower_address)
+    types,    type_id    = _intern([tx[1] for tx in txs], _lower_type)
+    claimers, claimer_id = _intern([tx[2] for tx in txs], lower_address)
+    ts = np.array([tx[5] for tx in txs], dtype=np.int64)
+    return TxArrays(faucets, faucet_id, types, type_id, claimers, claimer_id, ts)
+
+
+# ── Vectorized group-bys ─────────────────────────────────────────────────────
+
+def _day(ts: int) -> str:
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def aggregate_claims(
+    arr: TxArrays,
+    deleted: Iterable[str] = (),
+    claim_types: Iterable[str] = CLAIM_TX_TYPES,
+) -> Dict:
+    """
+    Claim transactions from live faucets, grouped:
+
+      total       number of claims
+      claims      {faucet: claim count}
+      latest      {faucet: latest claim timestamp}
+      first_seen  {claimer: earliest claim timestamp}
+      daily       {UTC "YYYY-MM-DD": claim count}
+    """
+    mask = arr.claim_mask(claim_types) & (arr.faucet_id >= 0)
+    deleted = set(deleted)
+    if deleted and arr.faucets:
+        dead = np.fromiter((f in deleted for f in arr.faucets), dtype=bool, count=len(arr.faucets))
+        mask &= ~dead[np.maximum(arr.faucet_id, 0)]
+
+    fid = arr.faucet_id[mask]
+    cid = arr.claimer_id[mask]
+    ts  = arr.ts[mask]
+
+    counts = np.bincount(fid, minlength=len(arr.faucets))
+    latest = np.zeros(len(arr.faucets), dtype=np.int64)
+    np.maximum.at(latest, fid, ts)
+
+    valid = cid >= 0
+    first = np.full(len(arr.claimers), _NO_TS, dtype=np.int64)
+    np.minimum.at(first, cid[valid], ts[valid])
+
+    days, day_counts = np.unique(ts // 86400, return_counts=True)
+
+    live = np.flatnonzero(counts)
+    seen = np.flatnonzero(first != _NO_TS)
+    return {
+        "total":      int(mask.sum()),
+        "claims":     {arr.faucets[i]: int(counts[i]) for i in live},
+        "latest":     {arr.faucets[i]: int(latest[i]) for i in live},
+        "first_seen": {arr.claimers[i]: int(first[i]) for i in seen},
+        "daily":      {_day(d * 86400): int(c) for d, c in zip(days, day_counts)},
+    }
+
+
+# ── Equivalence check: python -m claim_aggregation [n_txs] ───────────────────
+
+def _synthetic_txs(n: int, faucets: int = 2_000, users: int = 30_000, seed: int = 7) -> List[tuple]:
+    rng = random.Random(seed)
+    faucet_pool = ["0x" + rng.randbytes(20).hex() for _ in range(faucets)]
+    # Mixed-case duplicates and a malformed address exercise canonicalization
+    faucet_pool += [a.upper().replace("0X", "0x") for a in faucet_pool[:20]] + ["0xnot-an-address"]
+    user_pool = ["0x" + rng.randbytes(20).hex() for _ in range(users)]
+    types = ["claim", "claimWhenActive", "fund", "withdraw", "setClaimParameters"]
+    start = 1_700_000_000
+    return [
+        (
+            rng.choice(faucet_pool),
+            rng.choice(types),
+            rng.choice(user_pool),
+            rng.randrange(10**15, 10**21),
+            rng.random() < 0.5,
+            start + rng.randrange(0, 400 * 86400),
+        )
+        for _ in range(n)
+    ]
+
+
+def _baseline_loop(txs: Sequence, deleted: set) -> Dict:
+    """
+    The per-transaction loops refresh_all_data ran before aggregate_claims,
+    ported as they were (safe_checksum inlined, w3 dropped).
+    """
+    from eth_utils import to_checksum_address
+
+    def safe_checksum(addr):
+        try:
+            return to_checksum_address(addr)
+        except Exception:
+            return None
+
+    faucet_stats = {}
+    unique_users = set()
+    all_claims   = []
+
+    chain_claim_txs = [tx for tx in txs if str(tx[1]).lower() in ("claim", "claimwhenactive")]
+    for tx in chain_claim_txs:
+        faucet_cs = safe_checksum(str(tx[0]))
+        if not faucet_cs:
+            continue
+        addr_lower = faucet_cs.lower()
+        if addr_lower in deleted:
+            continue
+        claimer_cs = safe_checksum(str(tx[2]))
+        if claimer_cs:
+            unique_users.add(claimer_cs.lower())
+        all_claims.append(tx)
+        if addr_lower not in faucet_stats:
+            faucet_stats[addr_lower] = {"claims": 0, "latest": 0}
+        faucet_stats[addr_lower]["claims"] += 1
+        faucet_stats[addr_lower]["latest"]  = max(faucet_stats[addr_lower]["latest"], int(tx[5]))
+
+    first_claim_per_user = {}
+    for tx in all_claims:
+        claimer  = str(tx[2]).lower()
+        date_str = datetime.fromtimestamp(int(tx[5])).strftime("%Y-%m-%d")
+        if claimer not in first_claim_per_user or date_str < first_claim_per_user[claimer]:
+            first_claim_per_user[claimer] = date_str
+
+    return {
+        "faucet_stats":         faucet_stats,
+        "unique_users":         unique_users,
+        "all_claims":           all_claims,
+        "first_claim_per_user": first_claim_per_user,
+    }
+
+
+def _verify(n: int = 100_000) -> None:
+    # The baseline dated claims in local time; the indexer now uses UTC days
+    os.environ["TZ"] = "UTC"
+    time.tzset()
+    txs = _synthetic_txs(n)
+    deleted = {lower_address(tx[0]) for tx in txs[:25]} - {None}
+
+    t0 = time.perf_counter()
+    want = _baseline_loop(txs, deleted)
+    loop_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    arr = decode_transactions(txs)
+    decode_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = aggregate_claims(arr, deleted)
+    agg_s = time.perf_counter() - t0
+
+    assert got["total"] == len(want["all_claims"]), "total differs"
+    assert got["claims"] == {f: s["claims"] for f, s in want["faucet_stats"].items()}, "claims differ"
+    assert got["latest"] == {f: s["latest"] for f, s in want["faucet_stats"].items()}, "latest differs"
+    assert set(got["first_seen"]) == want["unique_users"], "claimers differ"
+    assert {c: _day(ts) for c, ts in got["first_seen"].items()} == want["first_claim_per_user"], "first_seen differs"
+    daily: Dict[str, int] = {}
+    for tx in want["all_claims"]:
+        day = _day(tx[5])
+        daily[day] = daily.get(day, 0) + 1
+    assert got["daily"] == daily, "daily differs"
+    print(f"aggregation: {n} txs, {len(got['claims'])} faucets, {len(got['first_seen'])} claimers — outputs match")
+    print(f"  per-tx loop        : {loop_s * 1000:8.1f} ms")
+    print(f"  decode + group-by  : {(decode_s + agg_s) * 1000:8.1f} ms   (decode {decode_s * 1000:.1f}, group-by {agg_s * 1000:.1f})")
+
+
+if __name__ == "__main__":
+    _verify(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
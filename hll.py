@@ -0,0 +1,303 @@
+import base64
+import hashlib
+import math
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from user_store import UniqueUserStore, address_to_bytes
+
+CHAIN_PRECISION  = 14   # 16 KB per sketch, ~0.8% standard error
+WEEK_PRECISION   = 12   # 4 KB,  ~1.6%
+DAY_PRECISION    = 10   # 1 KB,  ~3.3%
+DAY_RETENTION    = 400  # daily sketches kept per scope (older days are still in the weekly ones)
+WEEK_RETENTION   = 156  # weekly sketches kept per scope (~3 years)
+LEGACY_SCOPE     = "*"  # day/week sketches persisted before they were split by scope
+
+
+# ── HyperLogLog ──────────────────────────────────────────────────────────────
+
+def _sigma(x: float) -> float:
+    if x == 1.0:
+        return math.inf
+    y, z = 1.0, x
+    while True:
+        x *= x
+        z_prev = z
+        z += x * y
+        y += y
+        if z == z_prev:
+            return z
+
+
+def _tau(x: float) -> float:
+    if x == 0.0 or x == 1.0:
+        return 0.0
+    y, z = 1.0, 1 - x
+    while True:
+        x = math.sqrt(x)
+        z_prev = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == z_prev:
+            return z / 3
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct-count sketch over 20-byte address keys.
+    Standard error is ~1.04 / sqrt(2**p); memory is 2**p bytes.
+    """
+
+    __slots__ = ("p", "registers")
+
+    def __init__(self, p: int = CHAIN_PRECISION, registers: Optional[bytes] = None):
+        self.p = p
+        self.registers = bytearray(registers) if registers else bytearray(1 << p)
+
+    def add(self, key: bytes) -> bool:
+        """Adds *key*; returns whether a register changed (the estimate can only move then)."""
+        h = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+        idx  = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+            return True
+        return False
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.p != self.p:
+            raise ValueError(f"cannot merge p={other.p} into p={self.p}")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self) -> int:
+        """
+        Ertl's improved estimator ("New cardinality estimation algorithms for
+        HyperLogLog sketches", 2017): unbiased across the whole range without
+        HLL++'s empirical bias tables or a linear-counting switch-over.
+        """
+        m = len(self.registers)
+        q = 64 - self.p
+        hist = [0] * (q + 2)
+        for r in self.registers:
+            hist[r] += 1
+        z = m * _tau(1 - hist[q + 1] / m)
+        for k in range(q, 0, -1):
+            z = 0.5 * (z + hist[k])
+        z += m * _sigma(hist[0] / m)
+        if z == math.inf:
+            return 0
+        return int(round(m * m / (2 * math.log(2) * z)))
+
+    def to_b64(self) -> str:
+        return base64.b64encode(bytes(self.registers)).decode("ascii")
+
+    @classmethod
+    def from_b64(cls, p: int, data: str) -> "HyperLogLog":
+        return cls(p, base64.b64decode(data))
+
+
+# ── Sketch-backed unique-user store ──────────────────────────────────────────
+
+def _day_key(ts: int) -> str:
+    return datetime.fromtimestamp(int(ts), tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _week_key(ts: int) -> str:
+    year, week, _ = datetime.fromtimestamp(int(ts), tz=timezone.utc).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class SketchUserStore:
+    """
+    Drop-in alternative to UniqueUserStore that keeps HyperLogLog sketches
+    instead of address sets: one per scope (chain), one per source (claims,
+    checkin, quest_quiz), one per scope and UTC day / ISO week for dated
+    merges (undated ones, such as check-ins, only reach the totals), and a
+    running total. All-scope day / week figures are unions of the scoped
+    sketches. The total's estimate is cached and only recounted
+    after a merge changed a register. Cursors and the deleted-set
+    bookkeeping behave exactly as in the exact store.
+    """
+
+    mode = "hll"
+
+    def __init__(self):
+        self.scopes:  Dict[str, HyperLogLog] = {}
+        self.sources: Dict[str, HyperLogLog] = {}
+        self.days:    Dict[str, Dict[str, HyperLogLog]] = {}   # scope -> day -> sketch
+        self.weeks:   Dict[str, Dict[str, HyperLogLog]] = {}   # scope -> week -> sketch
+        self.union   = HyperLogLog(CHAIN_PRECISION)
+        self.cursors: Dict[str, int] = {}
+        self.deleted: set = set()
+        self._total: Optional[int] = None
+
+    def merge(
+        self,
+        scope,
+        addresses: Iterable[str],
+        source: Optional[str] = None,
+        timestamps: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Merge into *scope*. Returns the estimated growth of the total.
+        *timestamps* (one per address) also place each address in that
+        scope's day and week sketches.
+        """
+        before  = self.total()
+        scope   = str(scope)
+        changed = False
+        scope_hll  = self.scopes.setdefault(scope, HyperLogLog(CHAIN_PRECISION))
+        source_hll = self.sources.setdefault(source, HyperLogLog(CHAIN_PRECISION)) if source else None
+        days, weeks = self.days.setdefault(scope, {}), self.weeks.setdefault(scope, {})
+        ts_iter = iter(timestamps) if timestamps is not None else None
+        for addr in addresses:
+            ts  = next(ts_iter, None) if ts_iter is not None else None
+            key = address_to_bytes(str(addr))
+            if key is None:
+                continue
+            scope_hll.add(key)
+            changed |= self.union.add(key)
+            if source_hll is not None:
+                source_hll.add(key)
+            if ts:
+                days.setdefault(_day_key(ts), HyperLogLog(DAY_PRECISION)).add(key)
+                weeks.setdefault(_week_key(ts), HyperLogLog(WEEK_PRECISION)).add(key)
+        if not changed:
+            return 0
+        self._total = self.union.count()
+        return max(0, self._total - before)
+
+    def cursor(self, key: str) -> int:
+        return self.cursors.get(key, 0)
+
+    def advance(self, key: str, position: int) -> None:
+        self.cursors[key] = position
+
+    def scope_size(self, scope) -> int:
+        hll = self.scopes.get(str(scope))
+        return hll.count() if hll else 0
+
+    def total(self) -> int:
+        if self._total is None:
+            self._total = self.union.count()
+        return self._total
+
+    @staticmethod
+    def _series(by_scope: Dict[str, Dict[str, HyperLogLog]], last: int) -> Dict[str, int]:
+        """{period: estimate} over the *last* periods, unioning every scope's sketch for a period."""
+        periods = sorted({k for sketches in by_scope.values() for k in sketches})[-last:]
+        out = {}
+        for period in periods:
+            union = None
+            for sketches in by_scope.values():
+                hll = sketches.get(period)
+                if hll is None:
+                    continue
+                if union is None:
+                    union = HyperLogLog(hll.p, hll.registers)
+                else:
+                    union.merge(hll)
+            out[period] = union.count()
+        return out
+
+    def breakdown(self, days: int = 30, weeks: int = 12) -> Dict:
+        scoped = lambda by_scope: {k: v for k, v in by_scope.items() if k != LEGACY_SCOPE}
+        return {
+            "mode":     self.mode,
+            "total":    self.total(),
+            "byScope":  {k: v.count() for k, v in self.scopes.items()},
+            "bySource": {k: v.count() for k, v in self.sources.items()},
+            "daily":    [{"date": k, "users": n} for k, n in self._series(self.days, days).items()],
+            "weekly":   [{"week": k, "users": n} for k, n in self._series(self.weeks, weeks).items()],
+            "dailyByScope": {
+                scope: [{"date": k, "users": sketches[k].count()} for k in sorted(sketches)[-days:]]
+                for scope, sketches in scoped(self.days).items() if sketches
+            },
+            "weeklyByScope": {
+                scope: [{"week": k, "users": sketches[k].count()} for k in sorted(sketches)[-weeks:]]
+                for scope, sketches in scoped(self.weeks).items() if sketches
+            },
+        }
+
+    def _expire(self) -> None:
+        for by_scope, keep in ((self.days, DAY_RETENTION), (self.weeks, WEEK_RETENTION)):
+            for sketches in by_scope.values():
+                for stale in sorted(sketches)[:-keep]:
+                    del sketches[stale]
+
+    def to_state(self) -> Dict:
+        self._expire()
+        nested = lambda by_scope: {s: {k: v.to_b64() for k, v in sk.items()} for s, sk in by_scope.items()}
+        return {
+            "mode":    self.mode,
+            "scopes":  {k: v.to_b64() for k, v in self.scopes.items()},
+            "sources": {k: v.to_b64() for k, v in self.sources.items()},
+            "days":    nested(self.days),
+            "weeks":   nested(self.weeks),
+            "union":   self.union.to_b64(),
+            "cursors": dict(self.cursors),
+            "deleted": sorted(self.deleted),
+        }
+
+    @staticmethod
+    def _nested_from_state(p: int, raw: Optional[Dict]) -> Dict[str, Dict[str, HyperLogLog]]:
+        raw = raw or {}
+        # Older state held one flat {period: sketch} map across all scopes
+        if any(isinstance(v, str) for v in raw.values()):
+            raw = {LEGACY_SCOPE: raw}
+        return {scope: {k: HyperLogLog.from_b64(p, v) for k, v in sketches.items()} for scope, sketches in raw.items()}
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "SketchUserStore":
+        store = cls()
+        if not state or state.get("mode") != cls.mode:
+            return store
+        store.scopes  = {k: HyperLogLog.from_b64(CHAIN_PRECISION, v) for k, v in (state.get("scopes") or {}).items()}
+        store.sources = {k: HyperLogLog.from_b64(CHAIN_PRECISION, v) for k, v in (state.get("sources") or {}).items()}
+        store.days    = cls._nested_from_state(DAY_PRECISION, state.get("days"))
+        store.weeks   = cls._nested_from_state(WEEK_PRECISION, state.get("weeks"))
+        if state.get("union"):
+            store.union = HyperLogLog.from_b64(CHAIN_PRECISION, state["union"])
+        store.cursors = {k: int(v) for k, v in (state.get("cursors") or {}).items()}
+        store.deleted = set(state.get("deleted") or [])
+        return store
+
+
+# ── Accuracy check against the exact store: python -m hll [n] ────────────────
+
+def _verify(n: int = 100_000, chains: int = 5) -> None:
+    addrs = ["0x" + os.urandom(20).hex() for _ in range(n)]
+    # ~20% overlap between neighbouring chains so the union is non-trivial
+    per_chain = [addrs[i * n // chains : (i + 1) * n // chains + n // (chains * 5)] for i in range(chains)]
+
+    exact, sketch = UniqueUserStore(), SketchUserStore()
+    for cid, chunk in enumerate(per_chain):
+        exact.merge(cid, chunk)
+        sketch.merge(cid, chunk, source="claims")
+
+    rows: List[tuple] = [("total", exact.total(), sketch.total())]
+    rows += [(f"chain {cid}", exact.scope_size(cid), sketch.scope_size(cid)) for cid in range(chains)]
+    bound = 3 * 1.04 / math.sqrt(1 << CHAIN_PRECISION)
+    for label, want, got in rows:
+        err = abs(got - want) / want
+        print(f"  {label:<8} exact={want:>7}  hll={got:>7}  err={err * 100:5.2f}%")
+        assert err <= bound, f"{label}: error {err:.4f} exceeds 3σ bound {bound:.4f}"
+
+    # Dated merges: per-scope days, and the all-scope day is the union of the scopes
+    day = 1_700_000_000
+    dated = SketchUserStore()
+    dated.merge("a", addrs[:3000], timestamps=[day] * 3000)
+    dated.merge("b", addrs[2000:5000], timestamps=[day] * 3000)
+    assert dated.merge("a", addrs[:3000], timestamps=[day] * 3000) == 0
+    b = dated.breakdown()
+    day_bound = 3 * 1.04 / math.sqrt(1 << DAY_PRECISION)
+    assert abs(b["daily"][0]["users"] - 5000) / 5000 <= day_bound, b["daily"]
+    assert abs(b["dailyByScope"]["b"][0]["users"] - 3000) / 3000 <= day_bound, b["dailyByScope"]
+    print(f"  dated    all-scope day={b['daily'][0]['users']} (exact 5000), scope b={b['dailyByScope']['b'][0]['users']} (exact 3000)")
+
+
+if __name__ == "__main__":
+    _verify(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,264 @@
+"""
+Offline load test: drives the API in-process through httpx's ASGI transport
+against the in-memory storage backend, one endpoint at a time at a fixed
+request rate, and reports latency percentiles.
+
+    python -m loadtest --rps 50 --duration 10
+    python -m loadtest faucets blog_list --rps 200 --faucets 5000
+
+Requests are scheduled open-loop (independent of how fast earlier ones
+finish) and latency is measured from the scheduled send time, so queueing
+behind a slow handler shows up in p99 instead of lowering the send rate.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List
+
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+os.environ.setdefault("DELETED_FAUCETS_URL", "")
+
+import httpx
+
+import main  # noqa: E402  (env must be set before the app builds its client)
+
+FACTORY_TYPES = ("dropcode", "droplist", "custom")
+TAGS = ("defi", "airdrop", "guide", "celo", "base", "update")
+
+
+# ── Synthetic dataset ────────────────────────────────────────────────────────
+
+def _addr(rng: random.Random) -> str:
+    return "0x" + rng.randbytes(20).hex()
+
+
+def seed_dataset(faucets: int = 1_000, claims: int = 20_000, posts: int = 300, seed: int = 7) -> Dict[str, int]:
+    """Fill the in-memory tables and in-process caches the benchmarked endpoints read."""
+    rng = random.Random(seed)
+    client = main.supabase
+    now = datetime.now(timezone.utc)
+    chains = list(main.CHAIN_CONFIGS.items())
+
+    faucet_rows: List[Dict] = []
+    for i in range(faucets):
+        chain_id, cfg = rng.choice(chains)
+        faucet_rows.append({
+            "faucet_address":  _addr(rng),
+            "chain_id":        chain_id,
+            "network_name":    cfg["name"],
+            "factory_address": _addr(rng),
+            "factory_type":    rng.choice(FACTORY_TYPES),
+            "faucet_name":     f"Faucet {i}",
+            "token_symbol":    rng.choice(("CELO", "USDC", "ETH", "cUSD")),
+            "token_decimals":  18,
+            "is_ether":        rng.random() < 0.3,
+            "is_claim_active": rng.random() < 0.6,
+            "owner_address":   _addr(rng),
+            "slug":            f"faucet-{i}",
+            "start_time":      int((now - timedelta(days=rng.randrange(400))).timestamp()),
+        })
+
+    users = [_addr(rng) for _ in range(max(1, claims // 4))]
+    claim_cache: List[Dict] = []
+    per_faucet: Dict[str, Dict] = {}
+    for _ in range(claims):
+        f = rng.choice(faucet_rows)
+        ts = int((now - timedelta(seconds=rng.randrange(400 * 86400))).timestamp())
+        claim_cache.append({
+            "faucet": f["faucet_address"], "faucet_name": f["faucet_name"], "slug": f["slug"],
+            "claimer": rng.choice(users), "amount": str(rng.randrange(10**15, 10**20)),
+            "token_symbol": f["token_symbol"], "token_decimals": 18, "is_ether": f["is_ether"],
+            "time": ts, "network": f["network_name"], "chain_id": f["chain_id"],
+            "transaction_type": "claim",
+        })
+        agg = per_faucet.setdefault(f["faucet_address"], {"claims": 0, "latest": 0, "row": f})
+        agg["claims"] += 1
+        agg["latest"] = max(agg["latest"], ts)
+    claim_cache.sort(key=lambda c: c["time"], reverse=True)
+
+    ranked = sorted(per_faucet.items(), key=lambda kv: kv[1]["claims"], reverse=True)
+    claim_data = [
+        {
+            "faucet_address": addr, "faucet_name": a["row"]["faucet_name"], "network": a["row"]["network_name"],
+            "chain_id": a["row"]["chain_id"], "rank": i + 1, "claims": a["claims"],
+            "total_transactions": a["claims"], "total_amount": "0", "latest_claim_time": a["latest"],
+        }
+        for i, (addr, a) in enumerate(ranked)
+    ]
+    per_network: Dict[str, int] = {}
+    for f in faucet_rows:
+        per_network[f["network_name"]] = per_network.get(f["network_name"], 0) + 1
+
+    cumulative, user_data = 0, []
+    for d in range(120, -1, -1):
+        new = rng.randrange(0, 60)
+        cumulative += new
+        user_data.append({"date": (now - timedelta(days=d)).strftime("%Y-%m-%d"),
+                          "new_users": new, "cumulative_users": cumulative})
+
+    blog_posts = [
+        {
+            "id": i + 1, "slug": f"post-{i}", "title": f"Post {i}", "content": "lorem ipsum " * 400,
+            "excerpt": "lorem ipsum", "cover_image_url": None, "tags": rng.sample(TAGS, 2),
+            "author_name": "FaucetDrops Team", "author_avatar": "", "author_handle": None,
+            "source_url": None, "is_published": True,
+            "published_at": (now - timedelta(hours=i)).isoformat(),
+        }
+        for i in range(posts)
+    ]
+    likes = [{"post_id": rng.randrange(1, posts + 1), "fingerprint": f"fp-{i}"} for i in range(posts * 5)]
+    views = [{"post_id": rng.randrange(1, posts + 1)} for _ in range(posts * 40)]
+
+    quests = [{"faucet_address": _addr(rng), "title": f"Quest {i}", "chain_id": rng.choice(chains)[0],
+               "is_active": rng.random() < 0.5, "is_draft": False} for i in range(50)]
+    quest_participants = [{"quest_address": rng.choice(quests)["faucet_address"], "wallet_address": rng.choice(users),
+                           "points": rng.randrange(100), "updated_at": now.isoformat()} for _ in range(2_000)]
+    quizzes = [{"id": i + 1, "code": f"Q{i}", "title": f"Quiz {i}", "status": rng.choice(("active", "finished")),
+                "chain_id": rng.choice(chains)[0], "faucet_address": _addr(rng), "creator_address": _addr(rng),
+                "is_ai_generated": False, "max_participants": 100, "time_per_question": 30,
+                "rewards_distributed": False} for i in range(40)]
+    quiz_participants = [{"quiz_id": rng.randrange(1, 41), "wallet_address": rng.choice(users),
+                          "final_rank": None, "final_points": rng.randrange(50), "points": rng.randrange(50)}
+                         for _ in range(1_500)]
+    quiz_answers = [{"quiz_id": p["quiz_id"], "wallet_address": p["wallet_address"],
+                     "is_correct": rng.random() < 0.6, "points_earned": 10, "answered_at": now.isoformat()}
+                    for p in quiz_participants for _ in range(3)]
+
+    client.seed({
+        "network_faucets":  faucet_rows,
+        "faucet_details":   faucet_rows,
+        "claim_data":       claim_data,
+        "faucet_data":      [{"network": n, "faucets": c} for n, c in per_network.items()],
+        "user_data":        user_data,
+        "network_tx_data":  [{"network": n, "total_transactions": c * 20, "chain_id": 0} for n, c in per_network.items()],
+        "dashboard_meta":   [{"id": 1, "total_claims": claims, "total_unique_users": cumulative,
+                              "total_faucets": faucets, "total_transactions": claims * 2}],
+        "blog_posts":       blog_posts,
+        "blog_post_likes":  likes,
+        "blog_post_views":  views,
+        "quests":           quests,
+        "quest_participants": quest_participants,
+        "faucet_quizzes":   quizzes,
+        "faucet_quiz_participants": quiz_participants,
+        "faucet_quiz_answers": quiz_answers,
+    })
+
+    # /api/claims would otherwise crawl the chains on a cold cache
+    main.global_claims_cache = claim_cache
+    main.claims_last_updated = datetime.utcnow()
+    return {"faucets": faucets, "claims": claims, "posts": posts}
+
+
+# ── Scenarios ────────────────────────────────────────────────────────────────
+
+def _scenarios(rng: random.Random, posts: int) -> Dict[str, Callable[[], tuple]]:
+    return {
+        "faucets":   lambda: ("GET", f"/api/faucets?page={rng.randrange(1, 6)}&per_page=50"),
+        "dashboard": lambda: ("GET", "/api/dashboard"),
+        "analytics": lambda: ("GET", "/api/analytics"),
+        "claims":    lambda: ("GET", "/api/claims?limit=100"),
+        "blog_list": lambda: ("GET", f"/api/blog/posts?page={rng.randrange(1, 4)}&limit=12"),
+        "blog_tag":  lambda: ("GET", f"/api/blog/posts?page=1&limit=12&tag={rng.choice(TAGS)}"),
+        "blog_post": lambda: ("GET", f"/api/blog/posts/post-{rng.randrange(posts)}"),
+        "blog_like": lambda: ("POST", f"/api/blog/posts/post-{rng.randrange(posts)}/like"
+                                      f"?fingerprint=lt-{rng.randrange(10**9)}"),
+    }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+async def _drive(client: httpx.AsyncClient, make_request: Callable[[], tuple], rps: float, duration: float) -> Dict:
+    loop = asyncio.get_running_loop()
+    latencies: List[float] = []
+    errors = 0
+    total = max(1, int(rps * duration))
+
+    async def one(scheduled: float):
+        nonlocal errors
+        method, url = make_request()
+        try:
+            resp = await client.request(method, url)
+            if resp.status_code >= 400:
+                errors += 1
+        except Exception:
+            errors += 1
+        latencies.append(loop.time() - scheduled)
+
+    start = loop.time()
+    tasks = []
+    for i in range(total):
+        scheduled = start + i / rps
+        delay = scheduled - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+
+    latencies.sort()
+    return {
+        "sent":     total,
+        "errors":   errors,
+        "achieved": total / elapsed if elapsed else 0.0,
+        "p50_ms":   _percentile(latencies, 50) * 1000,
+        "p99_ms":   _percentile(latencies, 99) * 1000,
+        "max_ms":   (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+async def run(endpoints: List[str], rps: float, duration: float, warmup: int) -> List[Dict]:
+    rng = random.Random(11)
+    posts = len(main.supabase.rows("blog_posts"))
+    scenarios = _scenarios(rng, posts)
+    transport = httpx.ASGITransport(app=main.app)
+    results: List[Dict] = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+        for name in endpoints:
+            for _ in range(warmup):
+                method, url = scenarios[name]()
+                await client.request(method, url)
+            stats = await _drive(client, scenarios[name], rps, duration)
+            results.append({"endpoint": name, **stats})
+            print(f"   ✅ {name}: {stats['sent']} requests, p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+    return results
+
+
+def _report(results: List[Dict], rps: float) -> None:
+    print(f"\n{'endpoint':<12} {'target':>7} {'achieved':>9} {'sent':>6} {'errors':>7} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for r in results:
+        print(f"{r['endpoint']:<12} {rps:>7.0f} {r['achieved']:>9.1f} {r['sent']:>6} {r['errors']:>7} "
+              f"{r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['max_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    scenario_names = list(_scenarios(random.Random(), 1))
+    parser = argparse.ArgumentParser(prog="python -m loadtest")
+    parser.add_argument("endpoints", nargs="*", default=scenario_names, help=f"any of: {', '.join(scenario_names)}")
+    parser.add_argument("--rps",      type=float, default=50)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per endpoint")
+    parser.add_argument("--warmup",   type=int,   default=5,  help="untimed requests per endpoint")
+    parser.add_argument("--faucets",  type=int,   default=1_000)
+    parser.add_argument("--claims",   type=int,   default=20_000)
+    parser.add_argument("--posts",    type=int,   default=300)
+    args = parser.parse_args()
+
+    if main.STORAGE_BACKEND != "memory":
+        sys.exit("loadtest seeds synthetic data and needs STORAGE_BACKEND=memory")
+    unknown = set(args.endpoints) - set(scenario_names)
+    if unknown:
+        sys.exit(f"unknown endpoints: {', '.join(sorted(unknown))}")
+
+    t0 = time.perf_counter()
+    sizes = seed_dataset(args.faucets, args.claims, args.posts)
+    print(f"🌱 Seeded {sizes} in {time.perf_counter() - t0:.2f}s")
+    _report(asyncio.run(run(args.endpoints, args.rps, args.duration, args.warmup)), args.rps)
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Query
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from web3 import Web3
@@ -7,7 +7,7 @@ from fastapi import File, UploadFile
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from collections import defaultdict
 from typing import List, Dict, Any, Optional
-import asyncio, os, requests
+import asyncio, functools, os, requests
 from supabase import create_client, Client
 import os
 from fastapi import Form         
@@ -15,6 +15,21 @@ import uuid
 import mimetypes
 import httpx
 from abi import (FAUCET_ABI, FACTORY_ABI, QUEST_FACTORY_ABI_MINIMAL, CHECKIN_ABI, ERC20_ABI, QUEST_ABI, QUIZ_ABI,QUIZ_FACTORY_ABI,QUEST_FACTORY_ABI)
+from addresses import checksum_address, lower_address, address_to_bytes, bytes_to_address
+from user_store import UniqueUserStore, FirstSeenIndex, SortedAddressSet
+from claim_aggregation import CLAIM_TX_TYPES, aggregate_claims, decode_transactions
+from rpc_replay import make_provider
+from memory_backend import MemoryClient
+from blog_counters import BlogCounters
+from post_cache import PostBodyCache
+from aggregates import blog_post_counts, increment_blog_post_views, quest_dashboard_counts, quiz_dashboard_counts, register_memory_rpcs
+from response_cache import ResponseCache, TableSnapshots
+from metrics import (InstrumentedClient, cache_lookup, instrument_provider, register_cache_age,
+                     render as render_metrics, stage, timed_job)
+from hll import SketchUserStore
+from quiz_rollup import QuizAnswerRollup
+from timeseries import GRANULARITIES, BucketSeries, ClaimRollup, QuestCompletionRollup, bucket_of, bucket_span, sum_windows, utc_day
+import tracing
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import hashlib
@@ -22,7 +37,10 @@ import secrets
 import re
 import hashlib
 import secrets
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor
+import threading
+import time
 
 load_dotenv()
 
@@ -48,34 +66,88 @@ def hash_password(password: str) -> str:
 def generate_session_token() -> str:
     return secrets.token_urlsafe(32)
 
+# Sessions seen valid recently: token -> [checked_at, extended_at] (monotonic).
+# Within the TTL a token is trusted without a select; the sliding expiry is
+# written back at most once per interval. Deletes on another instance take
+# effect there within the TTL. Tokens deleted here are tombstoned so a check
+# already in flight cannot put them back in the cache.
+SESSION_CACHE_TTL_SECONDS       = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_EXTEND_INTERVAL_SECONDS = float(os.getenv("SESSION_EXTEND_INTERVAL_SECONDS", "3600"))
+SESSION_TOMBSTONE_SECONDS       = 600
+_session_cache: Dict[str, List[float]] = {}
+_session_deleted: Dict[str, float] = {}  # token -> deleted_at (monotonic)
+_session_cache_lock = threading.Lock()
+
+
+def _extend_session(token: str) -> None:
+    new_expiry = datetime.now(timezone.utc) + timedelta(days=365)
+    supabase.table("blog_sessions").update({
+        "expires_at": new_expiry.isoformat()
+    }).eq("token", token).execute()
+
+
+def _prune_sessions(now: float) -> None:
+    """Drop entries that would be re-checked and re-extended anyway. Caller holds the lock."""
+    for token in [t for t, (checked, extended) in _session_cache.items()
+                  if now - checked >= SESSION_CACHE_TTL_SECONDS and now - extended >= SESSION_EXTEND_INTERVAL_SECONDS]:
+        del _session_cache[token]
+
+
 def is_valid_session(token: str) -> bool:
     if not token:
         return False
-    try:
-        result = supabase.table("blog_sessions")\
-            .select("token, expires_at")\
-            .eq("token", token)\
-            .single()\
-            .execute()
-        if not result.data:
+    now = time.monotonic()
+    with _session_cache_lock:
+        if token in _session_deleted:
             return False
-        new_expiry = datetime.now(timezone.utc) + timedelta(days=365)
-        supabase.table("blog_sessions").update({
-            "expires_at": new_expiry.isoformat()
-        }).eq("token", token).execute()
+        entry = _session_cache.get(token)
+    fresh = entry is not None and now - entry[0] < SESSION_CACHE_TTL_SECONDS
+    cache_lookup("blog_session", fresh)
+    try:
+        if not fresh:
+            result = supabase.table("blog_sessions")\
+                .select("token, expires_at")\
+                .eq("token", token)\
+                .maybe_single()\
+                .execute()
+            if not result or not result.data:
+                with _session_cache_lock:
+                    _session_cache.pop(token, None)
+                return False
+        extended_at = entry[1] if entry is not None else None
+        if extended_at is None or now - extended_at >= SESSION_EXTEND_INTERVAL_SECONDS:
+            _extend_session(token)
+            extended_at = now
+        with _session_cache_lock:
+            if token in _session_deleted:
+                return False  # logged out while this check was in flight
+            if len(_session_cache) > 10_000:
+                _prune_sessions(now)
+            _session_cache[token] = [entry[0] if fresh else now, extended_at]
         return True
     except Exception:
         return False
 
+
 def create_session(token: str):
     expires_at = datetime.now(timezone.utc) + timedelta(days=365)
     supabase.table("blog_sessions").upsert({
         "token": token,
         "expires_at": expires_at.isoformat()
     }).execute()
+    now = time.monotonic()
+    with _session_cache_lock:
+        _session_deleted.pop(token, None)
+        _session_cache[token] = [now, now]
     return expires_at
 
 def delete_session(token: str):
+    now = time.monotonic()
+    with _session_cache_lock:
+        _session_cache.pop(token, None)
+        for t in [t for t, deleted_at in _session_deleted.items() if now - deleted_at >= SESSION_TOMBSTONE_SECONDS]:
+            del _session_deleted[t]
+        _session_deleted[token] = now
     supabase.table("blog_sessions")\
         .delete()\
         .eq("token", token)\
@@ -310,13 +382,25 @@ NATIVE_SYMBOLS: Dict[int, str] = {
 supabase_url = os.getenv("SUPABASE_URL")
 supabase_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_KEY")
 
+# "supabase" (default) or "memory": an in-process stand-in for offline runs
+# and load tests, optionally seeded from the JSON file in STORAGE_SEED_FILE.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+
 supabase: Client = None
-if supabase_url and supabase_key:
+if STORAGE_BACKEND == "memory":
+    supabase = MemoryClient.from_seed_file(os.getenv("STORAGE_SEED_FILE"))
+    register_memory_rpcs(supabase)
+    print("🧪 Using in-memory storage backend (STORAGE_BACKEND=memory)")
+elif supabase_url and supabase_key:
     supabase = create_client(supabase_url, supabase_key)
     print("✅ Supabase connected successfully")
 else:
     print("⚠️  WARNING: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY not found in .env")
 
+if supabase is not None:
+    # Per-table query latency for /metrics
+    supabase = InstrumentedClient(supabase)
+
 
 # ====================== GLOBAL DASHBOARD CACHE ======================
 
@@ -334,12 +418,62 @@ dashboard_data: Dict[str, Any] = {
 }
 
 
+# ====================== INDEXER STATE ======================
+# Small persisted blobs (cursors, compact address sets, rollups) that let the
+# background jobs work incrementally. Backed by the Supabase `indexer_state`
+# table (key text primary key, value jsonb, updated_at timestamptz) with an
+# in-process copy so incremental runs still work when Supabase is missing.
+
+_indexer_state: Dict[str, Any] = {}
+
+
+def load_indexer_state(key: str) -> Optional[Dict]:
+    if key in _indexer_state:
+        return _indexer_state[key]
+    if not supabase:
+        return None
+    try:
+        rows = supabase.table("indexer_state").select("value").eq("key", key).execute().data or []
+        if rows:
+            _indexer_state[key] = rows[0]["value"]
+            return _indexer_state[key]
+    except Exception as e:
+        print(f"   ⚠️  [indexer_state] load {key} failed: {e}")
+    return None
+
+
+def save_indexer_state(key: str, value: Dict) -> None:
+    _indexer_state[key] = value
+    if not supabase:
+        return
+    try:
+        supabase.table("indexer_state").upsert({
+            "key":        key,
+            "value":      value,
+            "updated_at": datetime.utcnow().isoformat(),
+        }, on_conflict="key").execute()
+    except Exception as e:
+        print(f"   ⚠️  [indexer_state] save {key} failed: {e}")
+
+
 # ====================== SHARED HELPERS ======================
 
+_rpc_chain_names: Dict[str, str] = {}
+
+
+def _rpc_chain_label(url: str) -> str:
+    if not _rpc_chain_names:
+        for configs in (CHAIN_CONFIGS, CHAIN_CONFIGS_V2):
+            for cfg in configs.values():
+                for rpc_url in cfg.get("rpcUrls", []):
+                    _rpc_chain_names.setdefault(rpc_url, cfg["name"])
+    return _rpc_chain_names.get(url, "unknown")
+
+
 def get_web3(rpc_urls: list) -> Web3:
     for url in rpc_urls:
         try:
-            w3 = Web3(Web3.HTTPProvider(url))
+            w3 = Web3(instrument_provider(make_provider(url), _rpc_chain_label(url)))
             if w3.is_connected():
                 return w3
         except Exception:
@@ -353,10 +487,8 @@ def is_placeholder_address(addr: str) -> bool:
 
 
 def safe_checksum(w3: Web3, addr: str) -> Optional[str]:
-    try:
-        return w3.to_checksum_address(addr)
-    except Exception:
-        return None
+    # Memoized; loops that only need the lowercase key should use lower_address
+    return checksum_address(addr)
 
 
 def _safe_call(contract, fn_name: str):
@@ -371,20 +503,37 @@ def _chunks(lst: List, n: int):
         yield lst[i : i + n]
 
 
+DELETED_FAUCETS_URL = os.getenv("DELETED_FAUCETS_URL", "https://faucetdrop-backend.onrender.com/deleted-faucets")
+DELETED_FAUCETS_TTL_SECONDS = int(os.getenv("DELETED_FAUCETS_TTL_SECONDS", "60"))
+
+_deleted_faucets_cache: Dict[str, Any] = {"value": None, "fetched_at": 0.0, "built_at": None}
+
+
 async def fetch_deleted_faucets() -> set:
     """
     FIX: Fetches deleted faucets from BOTH the API endpoint AND the Supabase
     'deleted_faucets' table to ensure nothing slips through.
+    Kept for DELETED_FAUCETS_TTL_SECONDS; callers get their own copy.
     """
+    cached = _deleted_faucets_cache
+    fresh = cached["value"] is not None and time.monotonic() - cached["fetched_at"] < DELETED_FAUCETS_TTL_SECONDS
+    cache_lookup("deleted_faucets", fresh)
+    if fresh:
+        return set(cached["value"])
+    return await asyncio.get_running_loop().run_in_executor(None, _load_deleted_faucets)
+
+
+def _load_deleted_faucets() -> set:
     deleted: set = set()
 
-    # Source 1: API endpoint
-    try:
-        r = requests.get("https://faucetdrop-backend.onrender.com/deleted-faucets", timeout=5)
-        if r.ok:
-            deleted.update(a.lower() for a in r.json().get("deletedAddresses", []))
-    except Exception:
-        pass
+    # Source 1: API endpoint (DELETED_FAUCETS_URL="" skips it)
+    if DELETED_FAUCETS_URL:
+        try:
+            r = requests.get(DELETED_FAUCETS_URL, timeout=5)
+            if r.ok:
+                deleted.update(a.lower() for a in r.json().get("deletedAddresses", []))
+        except Exception:
+            pass
 
     # Source 2: Supabase deleted_faucets table (belt-and-suspenders)
     if supabase:
@@ -394,6 +543,7 @@ async def fetch_deleted_faucets() -> set:
         except Exception:
             pass  # table may not exist — that's fine
 
+    _deleted_faucets_cache.update(value=frozenset(deleted), fetched_at=time.monotonic(), built_at=time.time())
     return deleted
 
 
@@ -409,11 +559,125 @@ def _is_deleted_onchain(w3: Web3, faucet_cs: str) -> bool:
         return False  # if we can't read, assume not deleted
 
 
-def get_faucet_name_sync(w3: Web3, addr_checksum: str) -> str:
+# ── Faucet name cache ──
+# Names are read once and kept per chain in indexer_state. They only change
+# through updateName(), which emits NameUpdated(string); apply_name_updates
+# scans those logs since the last scanned block and rewrites cached names.
+# /force-sync-faucet drops the cached name outright.
+
+FAUCET_NAMES_STATE_KEY = "faucet_names"
+NAME_LOG_CHUNK_BLOCKS  = int(os.getenv("NAME_LOG_CHUNK_BLOCKS", "5000"))
+NAME_LOG_MAX_BLOCKS    = int(os.getenv("NAME_LOG_MAX_BLOCKS", "500000"))
+NAME_LOG_ADDRESSES     = int(os.getenv("NAME_LOG_ADDRESSES", "500"))  # addresses per get_logs filter
+NAME_UPDATED_TOPIC     = Web3.to_hex(Web3.keccak(text="NameUpdated(string)"))
+
+_faucet_names: Optional[Dict[str, Any]] = None
+_faucet_names_lock = threading.Lock()
+
+
+def _name_cache() -> Dict[str, Any]:
+    global _faucet_names
+    if _faucet_names is None:
+        state = load_indexer_state(FAUCET_NAMES_STATE_KEY) or {}
+        _faucet_names = {
+            "names":  {k: dict(v) for k, v in (state.get("names") or {}).items()},
+            "blocks": dict(state.get("blocks") or {}),
+        }
+    return _faucet_names
+
+
+def cached_faucet_name(chain_id: int, addr: str) -> Optional[str]:
+    return _name_cache()["names"].get(str(chain_id), {}).get(addr.lower())
+
+
+def remember_faucet_name(chain_id: int, addr: str, name: str) -> None:
+    if name and name.strip():
+        with _faucet_names_lock:
+            _name_cache()["names"].setdefault(str(chain_id), {})[addr.lower()] = name
+
+
+def invalidate_faucet_name(addr: str) -> None:
+    with _faucet_names_lock:
+        for names in _name_cache()["names"].values():
+            names.pop(addr.lower(), None)
+
+
+def save_faucet_names() -> None:
+    with _faucet_names_lock:
+        save_indexer_state(FAUCET_NAMES_STATE_KEY, _name_cache())
+
+
+def apply_name_updates(w3: Web3, chain_id: int) -> int:
+    """
+    Folds NameUpdated logs emitted since the last scan into the cache.
+    Returns how many cached names changed. If the gap is too large to scan
+    the chain's cached names are dropped and re-read lazily instead.
+    """
+    cache = _name_cache()
+    try:
+        latest = w3.eth.block_number
+    except Exception as e:
+        print(f"   ⚠️  [names] chain {chain_id}: block_number failed — {e}")
+        return 0
+
+    last = cache["blocks"].get(str(chain_id))
+    if last is None or latest - last > NAME_LOG_MAX_BLOCKS:
+        with _faucet_names_lock:
+            if last is not None:
+                print(f"   ♻️  [names] chain {chain_id}: {latest - last} blocks behind — dropping cached names")
+            cache["names"].pop(str(chain_id), None)
+            cache["blocks"][str(chain_id)] = latest
+        return 0
+
+    changed = 0
+    names = cache["names"].get(str(chain_id), {})
+    # Only cached faucets matter, and many providers reject address-less ranges
+    with _faucet_names_lock:
+        watched = [Web3.to_checksum_address(a) for a in names]
+    start = last + 1
+    while start <= latest:
+        end = min(start + NAME_LOG_CHUNK_BLOCKS - 1, latest)
+        logs = []
+        try:
+            for addrs in _chunks(watched, NAME_LOG_ADDRESSES):
+                logs += w3.eth.get_logs({"fromBlock": start, "toBlock": end, "address": addrs, "topics": [NAME_UPDATED_TOPIC]})
+        except Exception as e:
+            print(f"   ⚠️  [names] chain {chain_id}: get_logs {start}-{end} failed — {e}")
+            break
+        for log in logs:
+            addr = log["address"].lower()
+            if addr not in names:
+                continue
+            try:
+                (new_name,) = w3.codec.decode(["string"], bytes(log["data"]))
+            except Exception:
+                new_name = None
+            with _faucet_names_lock:
+                if new_name and new_name.strip():
+                    names[addr] = new_name
+                else:
+                    names.pop(addr, None)
+            changed += 1
+        with _faucet_names_lock:
+            cache["blocks"][str(chain_id)] = end
+        start = end + 1
+
+    if changed:
+        print(f"   🏷️  [names] chain {chain_id}: {changed} NameUpdated events applied")
+    return changed
+
+
+def get_faucet_name_sync(w3: Web3, addr_checksum: str, chain_id: Optional[int] = None) -> str:
     short = f"Faucet {addr_checksum[:6]}...{addr_checksum[-4:]}"
+    if chain_id is not None:
+        cached = cached_faucet_name(chain_id, addr_checksum)
+        if cached:
+            return cached
     try:
         contract = w3.eth.contract(address=addr_checksum, abi=FAUCET_ABI)
         name = contract.functions.name().call()
+        if chain_id is not None:
+            remember_faucet_name(chain_id, addr_checksum, name)
         return name if name and name.strip() else short
     except Exception:
         return short
@@ -429,29 +693,221 @@ def _try_checkin(w3: Web3, addr_checksum: str):
         return 0, []
 
 
-def detect_and_call(w3: Web3, address_checksum: str):
+# ── Contract-kind registry ──
+# detect_and_call used to find a contract's kind by attempting full
+# getAllTransactions()/getAllFaucets() downloads under each ABI in turn.
+# Kinds are now probed once with cheap getters (counters only, no arrays),
+# persisted with the bytecode hash, and re-probed only if a typed call fails
+# and the code hash changed.
+
+CONTRACT_KINDS_STATE_KEY = "contract_kinds"
+_contract_kinds: Optional[Dict[str, Dict]] = None
+
+_KIND_PROBES = (
+    ("factory", FACTORY_ABI,               "getTotalFaucets"),
+    ("checkin", CHECKIN_ABI,               "getUniqueParticipantCount"),
+    # After the checks above: check-in contracts expose this counter too
+    ("quest",   FACTORY_ABI,               "getTotalTransactions"),
+)
+
+
+def _contract_kind_registry() -> Dict[str, Dict]:
+    global _contract_kinds
+    if _contract_kinds is None:
+        _contract_kinds = dict(load_indexer_state(CONTRACT_KINDS_STATE_KEY) or {})
+    return _contract_kinds
+
+
+def _code_hash(w3: Web3, address_checksum: str) -> Optional[str]:
     try:
-        contract = w3.eth.contract(address=address_checksum, abi=FACTORY_ABI)
-        factory_txs = contract.functions.getAllTransactions().call()
-        faucets = contract.functions.getAllFaucets().call()
-        return ("factory", factory_txs, faucets)
+        code = w3.eth.get_code(address_checksum)
+        return Web3.keccak(code).hex() if code else None
     except Exception:
-        pass
-    try:
+        return None
+
+
+def _probe_contract_kind(w3: Web3, address_checksum: str) -> str:
+    for kind, abi, fn_name in _KIND_PROBES:
+        try:
+            w3.eth.contract(address=address_checksum, abi=abi).functions[fn_name]().call()
+            return kind
+        except Exception:
+            continue
+    return "unknown"
+
+
+def _call_as_kind(w3: Web3, address_checksum: str, kind: str):
+    if kind == "factory":
+        contract = w3.eth.contract(address=address_checksum, abi=FACTORY_ABI)
+        return ("factory", contract.functions.getAllTransactions().call(),
+                contract.functions.getAllFaucets().call())
+    if kind == "quest":
         contract = w3.eth.contract(address=address_checksum, abi=QUEST_FACTORY_ABI_MINIMAL)
-        factory_txs = contract.functions.getAllTransactions().call()
-        faucets = contract.functions.getAllQuests().call()
-        return ("quest", factory_txs, faucets)
-    except Exception:
-        pass
-    try:
+        return ("quest", contract.functions.getAllTransactions().call(),
+                contract.functions.getAllQuests().call())
+    if kind == "checkin":
         contract = w3.eth.contract(address=address_checksum, abi=CHECKIN_ABI)
         tx_count = contract.functions.getTotalTransactions().call()
         participants = contract.functions.getAllParticipants().call()
         return ("checkin", tx_count, [p.lower() for p in participants if p])
+    raise ValueError(f"unknown contract kind {kind!r}")
+
+
+def detect_and_call(w3: Web3, address_checksum: str, chain_id: Optional[int] = None):
+    registry = _contract_kind_registry()
+    key = f"{chain_id}:{address_checksum.lower()}"
+    entry = registry.get(key)
+
+    if entry:
+        try:
+            return _call_as_kind(w3, address_checksum, entry["kind"])
+        except Exception:
+            code_hash = _code_hash(w3, address_checksum)
+            if code_hash is None or code_hash == entry.get("code_hash"):
+                # Same bytecode (or get_code failed too) — a transient RPC
+                # failure, keep the registered kind for the next run
+                return ("unknown", None, None)
+            print(f"   ♻️  {address_checksum[:10]}... bytecode changed — re-probing contract kind")
+            registry.pop(key, None)
+            save_indexer_state(CONTRACT_KINDS_STATE_KEY, registry)
+
+    kind = _probe_contract_kind(w3, address_checksum)
+    if kind == "unknown":
+        return ("unknown", None, None)
+
+    registry[key] = {"kind": kind, "code_hash": _code_hash(w3, address_checksum)}
+    save_indexer_state(CONTRACT_KINDS_STATE_KEY, registry)
+    try:
+        return _call_as_kind(w3, address_checksum, kind)
     except Exception:
-        pass
-    return ("unknown", None, None)
+        return ("unknown", None, None)
+
+
+# ── Shared factory transaction store ──
+# refresh_all_data and refresh_claims_cache read the same factories. Both go
+# through fetch_factory_snapshot, which downloads getAllTransactions() at most
+# once per FACTORY_TX_MAX_AGE_SECONDS and, past that age, only if the cheap
+# getTotalTransactions()/getTotalFaucets() counters moved. The max age is
+# kept well under the 15-minute claims interval, so every claims run checks
+# the counters instead of depending on timing jitter. Consumers pull the
+# transactions appended since their last read with factory_tx_delta; once
+# every consumer has read a prefix, release_factory_snapshot drops it.
+
+FACTORY_TX_MAX_AGE_SECONDS = int(os.getenv("FACTORY_TX_MAX_AGE_SECONDS", "300"))
+FACTORY_TX_CONSUMERS = ("dashboard", "claims")
+
+_factory_snapshots: Dict[str, Dict] = {}
+_factory_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+_factory_cursors: Dict[str, Dict[str, int]] = defaultdict(dict)
+
+
+class TxWindow:
+    """
+    A factory's append-only transaction array with the first *base*
+    entries dropped. len() is the full length; slices must start at or
+    after base.
+    """
+
+    __slots__ = ("base", "tail")
+
+    def __init__(self, base: int, tail: List):
+        self.base, self.tail = base, tail
+
+    def __len__(self) -> int:
+        return self.base + len(self.tail)
+
+    def __getitem__(self, sl: slice) -> List:
+        start, stop, _ = sl.indices(len(self))
+        if start < self.base:
+            raise IndexError(f"transactions before {self.base} were released")
+        return self.tail[start - self.base : max(start, stop) - self.base]
+
+    def trimmed(self, position: int) -> "TxWindow":
+        return TxWindow(position, self.tail[position - self.base :])
+
+
+def _factory_totals(w3: Web3, address_checksum: str, kind: str) -> Optional[tuple]:
+    """
+    Counters matching _snapshot_totals(kind). Quest factories only may have
+    getTotalTransactions(); None (no cheap check) means re-download.
+    """
+    try:
+        contract = w3.eth.contract(address=address_checksum, abi=FACTORY_ABI)
+        if kind == "quest":
+            return (contract.functions.getTotalTransactions().call(),)
+        return (contract.functions.getTotalTransactions().call(),
+                contract.functions.getTotalFaucets().call())
+    except Exception:
+        return None
+
+
+def _snapshot_base(result: tuple) -> int:
+    return result[1].base if isinstance(result[1], TxWindow) else 0
+
+
+def _snapshot_totals(result: tuple) -> Optional[tuple]:
+    if result[0] == "factory":
+        return (len(result[1]), len(result[2]))
+    if result[0] == "quest":
+        return (len(result[1]),)
+    return None
+
+
+def fetch_factory_snapshot(w3: Web3, address_checksum: str, chain_id: int, since: int = 0):
+    """
+    detect_and_call, served from the shared store when still current.
+    Factory / quest transactions come back as a TxWindow; one released past
+    *since* (the caller's oldest cursor) is downloaded again. Blocks on the
+    factory's lock while another job downloads it: call from a thread.
+    """
+    key = f"{chain_id}:{address_checksum.lower()}"
+    with _factory_locks[key]:
+        snap = _factory_snapshots.get(key)
+        now  = time.monotonic()
+        usable = snap is not None and _snapshot_base(snap["result"]) <= since
+        if usable and now - snap["fetched_at"] < FACTORY_TX_MAX_AGE_SECONDS:
+            return snap["result"]
+        if usable and snap["totals"] is not None \
+                and _factory_totals(w3, address_checksum, snap["result"][0]) == snap["totals"]:
+            snap["fetched_at"] = now
+            return snap["result"]
+
+        result = detect_and_call(w3, address_checksum, chain_id)
+        if result[0] in ("factory", "quest"):
+            result = (result[0], TxWindow(0, result[1]), result[2])
+        if result[0] != "unknown":
+            _factory_snapshots[key] = {
+                "result":     result,
+                "fetched_at": now,
+                "totals":     _snapshot_totals(result),
+            }
+        return result
+
+
+def factory_tx_delta(consumer: str, key: str, txs: List) -> tuple:
+    """
+    Transactions appended since *consumer* last read *key*, and whether the
+    consumer must discard what it holds (the array shrank, e.g. a redeploy).
+    """
+    cursors = _factory_cursors[consumer]
+    start = cursors.get(key, 0)
+    reset = start > len(txs)
+    if reset:
+        start = 0
+    cursors[key] = len(txs)
+    return txs[start:], reset
+
+
+def release_factory_snapshot(key: str) -> None:
+    """Drop the stored transactions every consumer in FACTORY_TX_CONSUMERS has read."""
+    with _factory_locks[key]:
+        snap = _factory_snapshots.get(key)
+        if snap is None or not isinstance(snap["result"][1], TxWindow):
+            return
+        kind, window, extra = snap["result"]
+        passed = min(min(_factory_cursors[c].get(key, 0) for c in FACTORY_TX_CONSUMERS), len(window))
+        if passed > window.base:
+            snap["result"] = (kind, window.trimmed(passed), extra)
 
 
 def _get_all_faucets_from_factory(w3: Web3, factory_cs: str) -> List[str]:
@@ -471,7 +927,96 @@ def _make_slug(name: str, address: str) -> str:
     return f"{name_part}-{addr_suffix}" if name_part else addr_suffix
 
 
-# ====================== TOKEN SYMBOL RESOLVER ======================
+# ====================== TOKEN REGISTRY ======================
+# ERC20 symbol/decimals never change, so they are resolved once per
+# (chain_id, token_address), persisted in the Supabase `token_registry`
+# table (unique on chain_id, token_address) and loaded at startup.
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+_token_registry: Dict[tuple, Dict] = {}
+TOKEN_REGISTRY_PAGE_SIZE = 1000
+
+
+def load_token_registry() -> int:
+    if not supabase:
+        return 0
+    try:
+        loaded = 0
+        while True:
+            # Paged on the unique key: a single select stops at max-rows
+            rows = supabase.table("token_registry")\
+                .select("chain_id, token_address, symbol, decimals")\
+                .order("chain_id").order("token_address")\
+                .range(loaded, loaded + TOKEN_REGISTRY_PAGE_SIZE - 1)\
+                .execute().data or []
+            for r in rows:
+                _token_registry[(int(r["chain_id"]), r["token_address"].lower())] = {
+                    "symbol":   r["symbol"],
+                    "decimals": int(r["decimals"]),
+                }
+            loaded += len(rows)
+            if len(rows) < TOKEN_REGISTRY_PAGE_SIZE:
+                break
+    except Exception as e:
+        print(f"   ⚠️  [token_registry] load failed: {e}")
+    return len(_token_registry)
+
+
+def _register_tokens(entries: Dict[tuple, Dict]) -> None:
+    if not entries:
+        return
+    _token_registry.update(entries)
+    if not supabase:
+        return
+    rows = [
+        {"chain_id": cid, "token_address": addr, "symbol": meta["symbol"], "decimals": meta["decimals"]}
+        for (cid, addr), meta in entries.items()
+    ]
+    try:
+        for chunk in _chunks(rows, 100):
+            supabase.table("token_registry").upsert(chunk, on_conflict="chain_id,token_address").execute()
+    except Exception as e:
+        print(f"   ⚠️  [token_registry] save failed: {e}")
+
+
+def prefetch_token_metadata(w3: Web3, chain_id: int, token_addrs: List[str]) -> int:
+    """
+    Resolves every token in *token_addrs* that the registry doesn't know yet
+    with one JSON-RPC batch (symbol + decimals per token). Falls back to
+    per-token calls if the endpoint rejects batches. Returns how many were added.
+    """
+    unknown = sorted({
+        a.lower() for a in token_addrs
+        if a and a.lower() != ZERO_ADDRESS and (chain_id, a.lower()) not in _token_registry
+    })
+    if not unknown:
+        return 0
+
+    found: Dict[tuple, Dict] = {}
+    try:
+        with w3.batch_requests() as batch:
+            for addr in unknown:
+                tok = w3.eth.contract(address=w3.to_checksum_address(addr), abi=ERC20_ABI)
+                batch.add(tok.functions.symbol())
+                batch.add(tok.functions.decimals())
+            responses = batch.execute()
+        for n, addr in enumerate(unknown):
+            symbol, decimals = responses[2 * n], responses[2 * n + 1]
+            if isinstance(symbol, str) and symbol:
+                found[(chain_id, addr)] = {"symbol": symbol, "decimals": int(decimals or 18)}
+    except Exception as e:
+        print(f"   ⚠️  [token_registry] batch of {len(unknown)} failed ({e}) — resolving one by one")
+        for addr in unknown:
+            tok = w3.eth.contract(address=w3.to_checksum_address(addr), abi=ERC20_ABI)
+            symbol = _safe_call(tok, "symbol")
+            if symbol:
+                found[(chain_id, addr)] = {"symbol": str(symbol), "decimals": int(_safe_call(tok, "decimals") or 18)}
+
+    _register_tokens(found)
+    print(f"   🪙  [token_registry] +{len(found)} tokens on chain {chain_id}")
+    return len(found)
+
 
 def resolve_token_symbol(
     w3: Web3,
@@ -479,19 +1024,23 @@ def resolve_token_symbol(
     is_ether: bool,
     chain_id: int,
 ) -> tuple[str, int]:
-    zero_addr = "0x0000000000000000000000000000000000000000"
-
-    if is_ether or token_addr.lower() == zero_addr:
+    if is_ether or token_addr.lower() == ZERO_ADDRESS:
         return NATIVE_SYMBOLS.get(chain_id, "ETH"), 18
 
+    known = _token_registry.get((chain_id, token_addr.lower()))
+    if known:
+        return known["symbol"], known["decimals"]
+
     try:
         tok = w3.eth.contract(
             address=w3.to_checksum_address(token_addr),
             abi=ERC20_ABI,
         )
-        symbol   = _safe_call(tok, "symbol")   or "TOKEN"
+        symbol   = _safe_call(tok, "symbol")
         decimals = _safe_call(tok, "decimals") or 18
-        return str(symbol), int(decimals)
+        if symbol:
+            _register_tokens({(chain_id, token_addr.lower()): {"symbol": str(symbol), "decimals": int(decimals)}})
+        return str(symbol or "TOKEN"), int(decimals)
     except Exception as e:
         print(f"      ⚠️  resolve_token_symbol({token_addr}): {e}")
         return "TOKEN", 18
@@ -505,7 +1054,13 @@ def fetch_faucet_details_sync(
     factory_address: str,
     factory_type: str,
     chain_id: int,
+    defer_token: bool = False,
 ) -> Optional[Dict]:
+    """
+    With *defer_token*, a token missing from the registry is left as
+    token_symbol/token_decimals = None for the caller to batch-resolve
+    (see _fill_token_metadata) instead of costing two calls here.
+    """
     try:
         checksum = w3.to_checksum_address(faucet_address)
         contract = w3.eth.contract(address=checksum, abi=FAUCET_ABI)
@@ -516,7 +1071,9 @@ def fetch_faucet_details_sync(
             print(f"      🗑️  {checksum[:10]}... is deleted on-chain — skipping")
             return None
 
-        name            = _safe_call(contract, "name")          or f"Faucet {faucet_address[:6]}...{faucet_address[-4:]}"
+        name            = cached_faucet_name(chain_id, faucet_address) or _safe_call(contract, "name")
+        remember_faucet_name(chain_id, faucet_address, name)
+        name            = name or f"Faucet {faucet_address[:6]}...{faucet_address[-4:]}"
         owner           = _safe_call(contract, "owner")         or ""
         token_addr      = _safe_call(contract, "token")         or "0x0000000000000000000000000000000000000000"
         claim_amount    = _safe_call(contract, "claimAmount")   or 0
@@ -530,13 +1087,17 @@ def fetch_faucet_details_sync(
         balance  = str(balance_tuple[0]) if balance_tuple else "0"
         is_ether = bool(balance_tuple[1]) if balance_tuple else False
 
-        token_symbol, token_decimals = resolve_token_symbol(
-            w3, str(token_addr), is_ether, chain_id
-        )
+        if (defer_token and not is_ether and str(token_addr).lower() != ZERO_ADDRESS
+                and (chain_id, str(token_addr).lower()) not in _token_registry):
+            token_symbol, token_decimals = None, None
+        else:
+            token_symbol, token_decimals = resolve_token_symbol(
+                w3, str(token_addr), is_ether, chain_id
+            )
 
         print(
             f"      🪙  {checksum[:10]}... token={token_addr[:10]}... "
-            f"is_ether={is_ether} → symbol={token_symbol} decimals={token_decimals}"
+            f"is_ether={is_ether} → symbol={token_symbol or '(batched)'} decimals={token_decimals}"
         )
 
         return {
@@ -592,7 +1153,11 @@ async def _enrich_with_metadata(rows: List[Dict]) -> List[Dict]:
 
 # ====================== SUPABASE SAVE HELPER ======================
 
-def save_dashboard_to_supabase(data: Dict[str, Any]) -> None:
+def save_dashboard_to_supabase(data: Dict[str, Any], user_rows: Optional[List[Dict]] = None) -> None:
+    """
+    *user_rows*, when given, are the only users_chart dates written to
+    user_data (the incremental refresh passes just the changed tail).
+    """
     if not supabase:
         return
 
@@ -616,15 +1181,15 @@ def save_dashboard_to_supabase(data: Dict[str, Any]) -> None:
             supabase.table("faucet_data").upsert(chunk, on_conflict="network").execute()
 
         # ── 2. user_data ──────────────────────────────────────────────────────
-        user_rows = [
+        user_upserts = [
             {
                 "date":             item["date"],
                 "new_users":        item["newUsers"],
                 "cumulative_users": item["cumulativeUsers"],
             }
-            for item in data["users_chart"]
+            for item in (data["users_chart"] if user_rows is None else user_rows)
         ]
-        for chunk in _chunks(user_rows, 100):
+        for chunk in _chunks(user_upserts, 100):
             supabase.table("user_data").upsert(chunk, on_conflict="date").execute()
 
         # ── 3. claim_data ─────────────────────────────────────────────────────
@@ -688,15 +1253,30 @@ def save_dashboard_to_supabase(data: Dict[str, Any]) -> None:
     except Exception as e:
         print(f"⚠️  [save_dashboard_to_supabase] failed: {e}")
 
+def _cached_participants(entry: Dict) -> List[str]:
+    return [bytes_to_address(k) for k in SortedAddressSet.from_b64(entry.get("participants", ""))]
+
+
+PARTICIPANT_FETCH_CONCURRENCY = int(os.getenv("PARTICIPANT_FETCH_CONCURRENCY", "8"))
+PARTICIPANT_CACHE_STATE_KEY   = "participant_cache"
+
+
 async def collect_quest_quiz_unique_participants() -> set:
     """
     FIX: Also reads participants directly from Supabase tables
     (quest_participants, faucet_quiz_participants) as a supplement to
     on-chain calls, so we never miss users that are in the DB but not
     yet reflected on-chain or vice versa.
-    """
-    all_participants: set = set()
 
+    Chains are crawled in parallel, getUniqueParticipants() calls within a
+    chain fan out over PARTICIPANT_FETCH_CONCURRENCY threads, and the DB
+    participant read overlaps with all of it.
+
+    Participant arrays are cached per contract with their length: the full
+    array is only re-downloaded when getUniqueParticipantCount() has grown,
+    and contracts past their endTime (or quizzes marked finished) are frozen
+    after one last full read and never called again.
+    """
     _PARTICIPANTS_ABI = [
         {
             "inputs": [],
@@ -704,7 +1284,21 @@ async def collect_quest_quiz_unique_participants() -> set:
             "outputs": [{"internalType": "address[]", "name": "", "type": "address[]"}],
             "stateMutability": "view",
             "type": "function",
-        }
+        },
+        {
+            "inputs": [],
+            "name": "getUniqueParticipantCount",
+            "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function",
+        },
+        {
+            "inputs": [],
+            "name": "endTime",
+            "outputs": [{"internalType": "uint256", "name": "", "type": "uint256"}],
+            "stateMutability": "view",
+            "type": "function",
+        },
     ]
     _GET_ALL_QUESTS_ABI = [
         {
@@ -726,77 +1320,136 @@ async def collect_quest_quiz_unique_participants() -> set:
     ]
 
     loop = asyncio.get_running_loop()
+    participant_cache: Dict[str, Dict] = dict(load_indexer_state(PARTICIPANT_CACHE_STATE_KEY) or {})
+    cache_stats = {"frozen": 0, "unchanged": 0, "fetched": 0}
+    cache_stats_lock = threading.Lock()  # bumped from every chain's item workers
+
+    def _count(stat: str) -> None:
+        with cache_stats_lock:
+            cache_stats[stat] += 1
+
+    # Quest/quiz addresses known to Supabase are chain-agnostic — read them
+    # once and share with every chain worker. "finished" collects quizzes the
+    # backend has closed, which are frozen like on-chain ended contracts.
+    def _fetch_sb_item_addresses() -> Dict[str, set]:
+        found: Dict[str, set] = {"quest": set(), "quiz": set(), "finished": set()}
+        if not supabase:
+            return found
+        for kind, sb_table, sb_cols in (("quest", "quests", "faucet_address"),
+                                        ("quiz",  "faucet_quizzes", "faucet_address, status")):
+            try:
+                rows = supabase.table(sb_table).select(sb_cols).execute().data or []
+                found[kind] = {r["faucet_address"].lower() for r in rows if r.get("faucet_address")
+                               and not is_placeholder_address(r["faucet_address"])}
+                found["finished"].update(r["faucet_address"].lower() for r in rows
+                                         if r.get("faucet_address") and r.get("status") == "finished")
+            except Exception as e:
+                print(f"   ⚠️  {kind} Supabase fetch failed: {e}")
+        return found
 
-    def _fetch_sync():
+    def _fetch_chain(chain_id: int, cfg: Dict, sb_items: Future) -> set:
         participants: set = set()
+        chain_name = cfg["name"]
+        try:
+            w3 = get_web3(cfg["rpcUrls"])
+        except Exception as e:
+            print(f"   ⚠️  [{chain_name}] RPC failed: {e}")
+            tracing.error(f"RPC failed: {e}")
+            return participants
 
-        for chain_id, cfg in CHAIN_CONFIGS.items():
-            chain_name = cfg["name"]
+        kinds = [
+            ("quest", cfg.get("Quests", []), _GET_ALL_QUESTS_ABI),
+            ("quiz",  cfg.get("quiz",   []), _GET_ALL_QUIZZES_ABI),
+        ]
+
+        finished = sb_items.result()["finished"]
+
+        def _fetch_item(kind: str, addr_lower: str):
+            # One bad item must not fail pool.map and with it the whole chain
             try:
-                w3 = get_web3(cfg["rpcUrls"])
+                return _read_item(kind, addr_lower)
             except Exception as e:
-                print(f"   ⚠️  [{chain_name}] RPC failed: {e}")
-                continue
-
-            kinds = [
-                ("quest", cfg.get("Quests", []), _GET_ALL_QUESTS_ABI, "quests",          "faucet_address"),
-                ("quiz",  cfg.get("quiz",   []), _GET_ALL_QUIZZES_ABI, "faucet_quizzes", "faucet_address"),
-            ]
+                print(f"      ⚠️  {kind} {addr_lower[:10]}... participants failed: {e}")
+                tracing.error(f"{kind} {addr_lower} participants failed: {e}")
+                return kind, addr_lower, None
+
+        def _read_item(kind: str, addr_lower: str):
+            cache_key = f"{chain_id}:{addr_lower}"
+            cached = participant_cache.get(cache_key)
+            if cached and cached.get("frozen"):
+                _count("frozen")
+                return kind, addr_lower, _cached_participants(cached)
+            cs = safe_checksum(w3, addr_lower)
+            if not cs:
+                return kind, addr_lower, None
+            contract = w3.eth.contract(address=cs, abi=_PARTICIPANTS_ABI)
+            count = _safe_call(contract, "getUniqueParticipantCount")
+            if cached and count is not None and int(count) == cached.get("count"):
+                _count("unchanged")
+                return kind, cs, _cached_participants(cached)
+            try:
+                raw = contract.functions.getUniqueParticipants().call()
+            except Exception as e:
+                print(f"      ⚠️  {kind} {cs[:10]}... getUniqueParticipants failed: {e}")
+                return kind, cs, None
+            _count("fetched")
+            end_time = _safe_call(contract, "endTime") or 0
+            ended = (0 < int(end_time) < int(datetime.now(timezone.utc).timestamp())) or addr_lower in finished
+            participant_cache[cache_key] = {
+                "count":        len(raw),
+                "participants": SortedAddressSet(b"".join(sorted(
+                    {k for k in (address_to_bytes(p) for p in raw if p) if k}
+                ))).to_b64(),
+                "frozen":       ended,
+            }
+            return kind, cs, raw
 
-            for kind, factory_addrs_raw, getter_abi, sb_table, sb_col in kinds:
-                if isinstance(factory_addrs_raw, str):
-                    factory_addrs_raw = [factory_addrs_raw] if factory_addrs_raw else []
+        jobs: List[tuple] = []
+        for kind, factory_addrs_raw, getter_abi in kinds:
+            if isinstance(factory_addrs_raw, str):
+                factory_addrs_raw = [factory_addrs_raw] if factory_addrs_raw else []
 
-                item_addresses: set = set()
+            item_addresses: set = set()
 
-                for factory_raw in factory_addrs_raw:
-                    if not factory_raw or is_placeholder_address(factory_raw):
-                        continue
-                    factory_cs = safe_checksum(w3, factory_raw)
-                    if not factory_cs:
-                        continue
+            for factory_raw in factory_addrs_raw:
+                if not factory_raw or is_placeholder_address(factory_raw):
+                    continue
+                factory_cs = safe_checksum(w3, factory_raw)
+                if not factory_cs:
+                    continue
 
-                    try:
-                        fc = w3.eth.contract(address=factory_cs, abi=getter_abi)
-                        fn_name = "getAllQuests" if kind == "quest" else "getAllQuizzes"
-                        on_chain_addrs = fc.functions[fn_name]().call()
-                        item_addresses.update(a.lower() for a in on_chain_addrs if a)
-                        print(f"   ✅ [{chain_name}] {kind} factory {factory_cs[:10]}...: "
-                              f"{len(on_chain_addrs)} addresses from chain")
-                    except Exception as e:
-                        print(f"   ⚠️  [{chain_name}] {kind} factory {factory_cs[:10]}... "
-                              f"on-chain getter failed: {e}")
-
-                if supabase:
-                    try:
-                        rows = supabase.table(sb_table).select(sb_col).execute().data or []
-                        sb_addrs = {r[sb_col].lower() for r in rows if r.get(sb_col)
-                                    and not is_placeholder_address(r[sb_col])}
-                        new_from_sb = sb_addrs - item_addresses
-                        if new_from_sb:
-                            print(f"   ➕ [{chain_name}] {kind} Supabase added "
-                                  f"{len(new_from_sb)} extra addresses")
-                        item_addresses.update(sb_addrs)
-                    except Exception as e:
-                        print(f"   ⚠️  [{chain_name}] {kind} Supabase fetch failed: {e}")
-
-                print(f"   🔍 [{chain_name}] calling getUniqueParticipants on "
-                      f"{len(item_addresses)} {kind} contracts...")
-
-                for addr_lower in item_addresses:
-                    cs = safe_checksum(w3, addr_lower)
-                    if not cs:
-                        continue
-                    try:
-                        contract = w3.eth.contract(address=cs, abi=_PARTICIPANTS_ABI)
-                        raw_participants = contract.functions.getUniqueParticipants().call()
-                        before = len(participants)
-                        participants.update(p.lower() for p in raw_participants if p)
-                        added = len(participants) - before
-                        print(f"      📄 {kind} {cs[:10]}...: "
-                              f"{len(raw_participants)} participants, +{added} new unique")
-                    except Exception as e:
-                        print(f"      ⚠️  {kind} {cs[:10]}... getUniqueParticipants failed: {e}")
+                try:
+                    fc = w3.eth.contract(address=factory_cs, abi=getter_abi)
+                    fn_name = "getAllQuests" if kind == "quest" else "getAllQuizzes"
+                    on_chain_addrs = fc.functions[fn_name]().call()
+                    item_addresses.update(a.lower() for a in on_chain_addrs if a)
+                    print(f"   ✅ [{chain_name}] {kind} factory {factory_cs[:10]}...: "
+                          f"{len(on_chain_addrs)} addresses from chain")
+                except Exception as e:
+                    print(f"   ⚠️  [{chain_name}] {kind} factory {factory_cs[:10]}... "
+                          f"on-chain getter failed: {e}")
+                    tracing.error(f"{kind} factory {factory_cs} getter failed: {e}")
+
+            sb_addrs = sb_items.result()[kind]
+            new_from_sb = sb_addrs - item_addresses
+            if new_from_sb:
+                print(f"   ➕ [{chain_name}] {kind} Supabase added "
+                      f"{len(new_from_sb)} extra addresses")
+            item_addresses.update(sb_addrs)
+
+            print(f"   🔍 [{chain_name}] calling getUniqueParticipants on "
+                  f"{len(item_addresses)} {kind} contracts...")
+            jobs.extend((kind, a) for a in item_addresses)
+
+        with ThreadPoolExecutor(max_workers=PARTICIPANT_FETCH_CONCURRENCY) as pool:
+            for kind, cs, raw_participants in pool.map(lambda job: _fetch_item(*job), jobs):
+                if raw_participants is None:
+                    continue
+                before = len(participants)
+                participants.update(p.lower() for p in raw_participants if p)
+                added = len(participants) - before
+                print(f"      📄 {kind} {cs[:10]}...: "
+                      f"{len(raw_participants)} participants, +{added} new unique")
 
         return participants
 
@@ -827,9 +1480,19 @@ async def collect_quest_quiz_unique_participants() -> set:
 
         return db_participants
 
+    sb_pool = ThreadPoolExecutor(max_workers=1)
     try:
-        onchain_result = await loop.run_in_executor(None, _fetch_sync)
-        db_result      = await loop.run_in_executor(None, _fetch_db_participants)
+        sb_items = sb_pool.submit(_fetch_sb_item_addresses)
+        db_result, *chain_results = await asyncio.gather(
+            loop.run_in_executor(None, _fetch_db_participants),
+            *[loop.run_in_executor(None, tracing.bind(_fetch_chain, cfg["name"], "chain", chain_id=chain_id),
+                                   chain_id, cfg, sb_items)
+              for chain_id, cfg in CHAIN_CONFIGS.items()],
+        )
+        onchain_result = set().union(*chain_results)
+        save_indexer_state(PARTICIPANT_CACHE_STATE_KEY, participant_cache)
+        print(f"   🧊 participant cache: {cache_stats['frozen']} frozen, "
+              f"{cache_stats['unchanged']} unchanged, {cache_stats['fetched']} re-fetched")
 
         combined = onchain_result | db_result
         only_in_db = db_result - onchain_result
@@ -847,10 +1510,28 @@ async def collect_quest_quiz_unique_participants() -> set:
     except Exception as e:
         print(f"⚠️  [collect_quest_quiz_unique_participants] failed: {e}")
         return set()
-    
-    
+    finally:
+        sb_pool.shutdown(wait=False)
+
+
 # ====================== BACKGROUND JOB: network_faucets + faucet_details ======================
 
+def _fill_token_metadata(w3: Web3, chain_id: int, detail_rows: List[Dict]) -> None:
+    """Batch-resolves tokens deferred by fetch_faucet_details_sync and fills the rows in place."""
+    pending = [d for d in detail_rows if d["token_symbol"] is None]
+    if not pending:
+        return
+    prefetch_token_metadata(w3, chain_id, [d["token_address"] for d in pending])
+    # Once per distinct token: one the prefetch could not resolve would
+    # otherwise cost two calls for every faucet using it
+    resolved: Dict[tuple, tuple] = {}
+    for d in pending:
+        key = (d["token_address"].lower(), bool(d["is_ether"]))
+        if key not in resolved:
+            resolved[key] = resolve_token_symbol(w3, d["token_address"], d["is_ether"], chain_id)
+        d["token_symbol"], d["token_decimals"] = resolved[key]
+
+@timed_job("network_faucets")
 async def refresh_network_faucets():
     """
     Crawls every chain → every typed factory → every faucet.
@@ -863,59 +1544,72 @@ async def refresh_network_faucets():
     print(f"   🗑️  Gating {len(deleted_set)} known deleted faucets")
 
     for chain_id, cfg in CHAIN_CONFIGS_V2.items():
-        factories_map: Dict[str, str] = cfg.get("factories", {})
-        if not factories_map:
-            continue
-
-        try:
-            w3 = get_web3(cfg["rpcUrls"])
-        except Exception as e:
-            print(f"   ⚠️  {cfg['name']}: all RPCs failed — {e}")
-            continue
-
-        meta_rows:   List[Dict] = []
-        detail_rows: List[Dict] = []
-
-        for factory_addr, factory_type in factories_map.items():
-            if is_placeholder_address(factory_addr):
-                continue
-            factory_cs = safe_checksum(w3, factory_addr)
-            if not factory_cs:
+        with tracing.span(cfg["name"], "chain", chain_id=chain_id):
+            factories_map: Dict[str, str] = cfg.get("factories", {})
+            if not factories_map:
                 continue
 
-            faucet_list = _get_all_faucets_from_factory(w3, factory_cs)
-            print(f"   📋 {cfg['name']}/{factory_cs[:10]}... ({factory_type}): {len(faucet_list)} faucets")
+            try:
+                w3 = get_web3(cfg["rpcUrls"])
+            except Exception as e:
+                print(f"   ⚠️  {cfg['name']}: all RPCs failed — {e}")
+                tracing.error(f"all RPCs failed: {e}")
+                continue
 
-            for faucet_raw in faucet_list:
-                faucet_cs = safe_checksum(w3, faucet_raw)
-                if not faucet_cs:
-                    continue
+            detail_rows: List[Dict] = []
+            apply_name_updates(w3, chain_id)
 
-                # FIX: Gate 1 — check known deleted list (fast, no RPC)
-                if faucet_cs.lower() in deleted_set:
-                    print(f"      🗑️  {faucet_cs[:10]}... in deleted list — skipping")
+            for factory_addr, factory_type in factories_map.items():
+                if is_placeholder_address(factory_addr):
                     continue
-
-                # fetch_faucet_details_sync already does Gate 2 (on-chain deleted flag)
-                detail = fetch_faucet_details_sync(w3, faucet_cs, factory_addr, factory_type, chain_id)
-                if detail is None:
-                    # Either deleted on-chain or fetch failed — evict from DB to be safe
-                    if supabase:
-                        try:
-                            supabase.table("network_faucets").delete().eq("faucet_address", faucet_cs.lower()).execute()
-                            supabase.table("faucet_details").delete().eq("faucet_address", faucet_cs.lower()).execute()
-                        except Exception:
-                            pass
+                factory_cs = safe_checksum(w3, factory_addr)
+                if not factory_cs:
                     continue
 
-                detail_rows.append(detail)
-
-                meta_rows.append({
+                with tracing.span(factory_cs, "factory", type=factory_type):
+                    with stage("network_faucets", "factory_list"):
+                        faucet_list = _get_all_faucets_from_factory(w3, factory_cs)
+                    print(f"   📋 {cfg['name']}/{factory_cs[:10]}... ({factory_type}): {len(faucet_list)} faucets")
+                    tracing.count("faucets", len(faucet_list))
+
+                    for faucet_raw in faucet_list:
+                        faucet_lower = lower_address(faucet_raw)
+                        if not faucet_lower:
+                            continue
+
+                        # FIX: Gate 1 — check known deleted list (fast, no RPC)
+                        if faucet_lower in deleted_set:
+                            print(f"      🗑️  {faucet_lower[:10]}... in deleted list — skipping")
+                            tracing.count("deleted")
+                            continue
+                        faucet_cs = checksum_address(faucet_lower)
+
+                        # fetch_faucet_details_sync already does Gate 2 (on-chain deleted flag)
+                        with stage("network_faucets", "details"):
+                            detail = fetch_faucet_details_sync(w3, faucet_cs, factory_addr, factory_type, chain_id,
+                                                               defer_token=True)
+                        if detail is None:
+                            tracing.count("evicted")
+                            # Either deleted on-chain or fetch failed — evict from DB to be safe
+                            if supabase:
+                                try:
+                                    supabase.table("network_faucets").delete().eq("faucet_address", faucet_cs.lower()).execute()
+                                    supabase.table("faucet_details").delete().eq("faucet_address", faucet_cs.lower()).execute()
+                                except Exception:
+                                    pass
+                            continue
+
+                        detail_rows.append(detail)
+
+            with stage("network_faucets", "metadata"):
+                _fill_token_metadata(w3, chain_id, detail_rows)
+            meta_rows = [
+                {
                     "faucet_address":  detail["faucet_address"],
                     "chain_id":        chain_id,
                     "network_name":    cfg["name"],
-                    "factory_address": factory_addr.lower(),
-                    "factory_type":    factory_type,
+                    "factory_address": detail["factory_address"],
+                    "factory_type":    detail["factory_type"],
                     "faucet_name":     detail["faucet_name"],
                     "slug":            detail["slug"],
                     "token_symbol":    detail["token_symbol"],
@@ -924,19 +1618,24 @@ async def refresh_network_faucets():
                     "is_claim_active": detail["is_claim_active"],
                     "owner_address":   detail["owner_address"],
                     "start_time":      detail["start_time"],
-                })
+                }
+                for detail in detail_rows
+            ]
 
-        detail_rows = await _enrich_with_metadata(detail_rows)
+            with stage("network_faucets", "metadata"):
+                detail_rows = await _enrich_with_metadata(detail_rows)
 
-        if supabase and meta_rows:
-            try:
-                for chunk in _chunks(meta_rows, 100):
-                    supabase.table("network_faucets").upsert(chunk, on_conflict="faucet_address").execute()
-                for chunk in _chunks(detail_rows, 100):
-                    supabase.table("faucet_details").upsert(chunk, on_conflict="faucet_address").execute()
-                print(f"   ✅ {cfg['name']}: saved {len(meta_rows)} live faucets")
-            except Exception as e:
-                print(f"   ⚠️  {cfg['name']}: Supabase upsert failed — {e}")
+            if supabase and meta_rows:
+                try:
+                    with stage("network_faucets", "supabase_write"):
+                        for chunk in _chunks(meta_rows, 100):
+                            supabase.table("network_faucets").upsert(chunk, on_conflict="faucet_address").execute()
+                        for chunk in _chunks(detail_rows, 100):
+                            supabase.table("faucet_details").upsert(chunk, on_conflict="faucet_address").execute()
+                    print(f"   ✅ {cfg['name']}: saved {len(meta_rows)} live faucets")
+                    tracing.count("saved", len(meta_rows))
+                except Exception as e:
+                    print(f"   ⚠️  {cfg['name']}: Supabase upsert failed — {e}")
 
     # FIX: Evict ALL known deleted faucets from both tables after crawl
     if supabase and deleted_set:
@@ -950,284 +1649,476 @@ async def refresh_network_faucets():
                 pass
         print(f"   🗑️  Evicted {evicted} deleted faucets from network_faucets + faucet_details")
 
+    save_faucet_names()
     print(f"✅ [refresh_network_faucets] done")
 
 
 # ====================== BACKGROUND JOB: dashboard ======================
 
-def _fetch_quest_quiz_participant_dates() -> dict:
+UNIQUE_USERS_STATE_KEY = "unique_users"
+FIRST_SEEN_STATE_KEY   = "first_seen"
+# Faucets found deleted on-chain (their `deleted` flag) but missing from the
+# deleted-faucets list; kept so later runs exclude them from the start
+ONCHAIN_DELETED_STATE_KEY = "onchain_deleted_faucets"
+# "exact" keeps every address (compact sorted sets); "hll" keeps only
+# HyperLogLog sketches and adds per-source / per-day / per-week estimates.
+UNIQUE_USERS_MODE = os.getenv("UNIQUE_USERS_MODE", "exact").lower()
+_unique_user_breakdown: Dict[str, Any] = {}
+
+
+CLAIM_ROLLUP_STATE_KEY = "claim_rollup"
+FAUCET_TYPES = ("dropcode", "droplist", "custom")
+
+# (chain_id, factory address lower) -> faucet type; unknown factories count as dropcode
+FACTORY_TYPES: Dict[tuple, str] = {
+    (chain_id, addr.lower()): ftype if ftype in FAUCET_TYPES else "dropcode"
+    for chain_id, cfg in CHAIN_CONFIGS_V2.items()
+    for addr, ftype in cfg.get("factories", {}).items()
+}
+
+_claim_rollup: Optional[ClaimRollup] = None
+_new_users_series: Optional[BucketSeries] = None
+
+
+def _load_onchain_deleted() -> set:
+    return set((load_indexer_state(ONCHAIN_DELETED_STATE_KEY) or {}).get("faucets") or [])
+
+
+def _load_claim_rollup() -> ClaimRollup:
+    # Deletions are handled per factory in _retire_deleted_claims, no rebuild
+    return ClaimRollup.from_state(load_indexer_state(CLAIM_ROLLUP_STATE_KEY))
+
+
+def _retire_deleted_claims(rollup: ClaimRollup, key: str, chain_id: int, faucet_type: str,
+                           factory_txs: List, tx_faucets: List[str], deleted: set) -> int:
+    """
+    Subtracts the claims already folded into *rollup* for this factory's
+    faucets (*tx_faucets*: those its transactions name) that joined the
+    deleted set since the last run. Returns how many.
+    """
+    dead    = set(tx_faucets) & deleted
+    newly   = dead - rollup.retired_for(key)
+    removed = 0
+    if newly and getattr(factory_txs, "base", 0):
+        # The folded prefix is no longer available; retried next run
+        return 0
+    if newly:
+        folded = [tx for tx in factory_txs[:min(rollup.cursor(key), len(factory_txs))]
+                  if lower_address(tx[0]) in newly]
+        if folded:
+            agg = aggregate_claims(decode_transactions(folded))
+            rollup.remove_daily(chain_id, faucet_type, agg["daily"])
+            removed = agg["total"]
+    rollup.retired[key] = dead
+    return removed
+
+
+# Per-factory claim counts folded from factory_tx_delta("dashboard", ...), so
+# refresh_all_data only decodes the transactions appended since its last run.
+# Deleted faucets are filtered when the counts are read.
+_factory_claim_stats: Dict[str, Dict] = {}
+
+
+def _fold_factory_claims(key: str, factory_txs: TxWindow) -> Dict:
+    delta, reset = factory_tx_delta("dashboard", key, factory_txs)
+    stats = _factory_claim_stats.get(key)
+    if stats is None or reset:
+        stats = _factory_claim_stats[key] = {"total": 0, "claims": {}, "latest": {}, "faucets": set()}
+    if delta:
+        arr = decode_transactions(delta)
+        agg = aggregate_claims(arr)
+        stats["total"] += agg["total"]
+        for faucet, count in agg["claims"].items():
+            stats["claims"][faucet] = stats["claims"].get(faucet, 0) + count
+            stats["latest"][faucet] = max(stats["latest"].get(faucet, 0), agg["latest"][faucet])
+        stats["faucets"].update(arr.faucets)
+    return stats
+
+
+def _current_claim_rollup() -> ClaimRollup:
+    return _claim_rollup or ClaimRollup.from_state(load_indexer_state(CLAIM_ROLLUP_STATE_KEY))
+
+
+def _load_unique_user_store(deleted: set):
+    """
+    Restores the persisted unique-user store for the configured mode. The
+    store only ever grows, so a faucet that joined the deleted set since the
+    last run forces a rebuild from scratch to drop its claimers.
     """
-    Returns {wallet_address_lower: "YYYY-MM-DD"} for the earliest
-    participation date across quests and quizzes.
+    store_cls = SketchUserStore if UNIQUE_USERS_MODE == "hll" else UniqueUserStore
+    store = store_cls.from_state(load_indexer_state(UNIQUE_USERS_STATE_KEY))
+    newly_deleted = deleted - store.deleted
+    if store.scopes and newly_deleted:
+        print(f"   ♻️  {len(newly_deleted)} newly deleted faucets — rebuilding unique-user store")
+        store = store_cls()
+    return store
+
+
+def _load_first_seen_index(deleted: set) -> FirstSeenIndex:
+    """Same rebuild-on-new-deletion rule as the unique-user store."""
+    index = FirstSeenIndex.from_state(load_indexer_state(FIRST_SEEN_STATE_KEY))
+    newly_deleted = deleted - index.deleted
+    if len(index) and newly_deleted:
+        print(f"   ♻️  {len(newly_deleted)} newly deleted faucets — rebuilding first-seen index")
+        rebuilt = FirstSeenIndex()
+        rebuilt.inherit_dates(index)
+        index = rebuilt
+    return index
+
+
+def _delta_since(store, key: str, items: List) -> List:
+    """
+    Items appended since *store*'s cursor for *key* (factory transaction and
+    participant arrays are append-only), advancing the cursor.
+    """
+    start = store.cursor(key)
+    if start > len(items):
+        start = 0
+    store.advance(key, len(items))
+    return items[start:]
+
+
+PARTICIPANT_DATES_PAGE_SIZE = 1000  # PostgREST's default max-rows
+
+
+def _fetch_quest_quiz_participant_dates(watermarks: Optional[Dict[str, str]] = None) -> tuple:
+    """
+    Returns ({wallet_address_lower: "YYYY-MM-DD"}, new_watermarks) for the
+    earliest participation date across quests and quizzes.
+    With *watermarks* ({table: created_at}) only rows at or after each
+    table's watermark are read, oldest first and a page at a time, so a
+    watermark never moves past rows that were not returned.
     Only uses Supabase — on-chain getUniqueParticipants has no timestamps.
     """
     first_date: dict = {}
+    new_watermarks: Dict[str, str] = dict(watermarks or {})
 
     if not supabase:
-        return first_date
+        return first_date, new_watermarks
 
-    # Quest participants
-    try:
-        rows = supabase.table("quest_participants")\
-            .select("wallet_address, created_at")\
-            .execute().data or []
-        for r in rows:
-            addr = (r.get("wallet_address") or "").lower()
-            ts   = r.get("created_at")
-            if not addr or not ts:
-                continue
-            try:
-                date_str = datetime.fromisoformat(
-                    str(ts).replace("Z", "+00:00")
-                ).strftime("%Y-%m-%d")
-                if addr not in first_date or date_str < first_date[addr]:
-                    first_date[addr] = date_str
-            except Exception:
-                continue
-    except Exception as e:
-        print(f"   ⚠️  [quest participant dates] {e}")
-
-    # Quiz participants
-    try:
-        rows = supabase.table("faucet_quiz_participants")\
-            .select("wallet_address, created_at")\
-            .execute().data or []
-        for r in rows:
-            addr = (r.get("wallet_address") or "").lower()
-            ts   = r.get("created_at")
-            if not addr or not ts:
-                continue
-            try:
-                date_str = datetime.fromisoformat(
-                    str(ts).replace("Z", "+00:00")
-                ).strftime("%Y-%m-%d")
-                if addr not in first_date or date_str < first_date[addr]:
-                    first_date[addr] = date_str
-            except Exception:
-                continue
-    except Exception as e:
-        print(f"   ⚠️  [quiz participant dates] {e}")
+    for table, label in (("quest_participants", "quest"), ("faucet_quiz_participants", "quiz")):
+        try:
+            rows: List[Dict] = []
+            while True:
+                query = supabase.table(table).select("wallet_address, created_at")
+                if new_watermarks.get(table):
+                    query = query.gte("created_at", new_watermarks[table])
+                page = query.order("created_at").order("wallet_address")\
+                    .range(len(rows), len(rows) + PARTICIPANT_DATES_PAGE_SIZE - 1).execute().data or []
+                rows.extend(page)
+                if len(page) < PARTICIPANT_DATES_PAGE_SIZE:
+                    break
+            for r in rows:
+                addr = (r.get("wallet_address") or "").lower()
+                ts   = r.get("created_at")
+                if not addr or not ts:
+                    continue
+                if str(ts) > new_watermarks.get(table, ""):
+                    new_watermarks[table] = str(ts)
+                try:
+                    date_str = datetime.fromisoformat(
+                        str(ts).replace("Z", "+00:00")
+                    ).strftime("%Y-%m-%d")
+                    if addr not in first_date or date_str < first_date[addr]:
+                        first_date[addr] = date_str
+                except Exception:
+                    continue
+        except Exception as e:
+            print(f"   ⚠️  [{label} participant dates] {e}")
 
     print(f"   📅 [quest/quiz dates] {len(first_date)} dated participants")
-    return first_date
+    return first_date, new_watermarks
 
 
+@timed_job("dashboard")
 async def refresh_all_data():
-    global dashboard_data
+    global dashboard_data, _unique_user_breakdown, _claim_rollup, _new_users_series
     print(f"🔄 [refresh_all_data] started at {datetime.utcnow()}")
-    all_claims           = []
+    total_claims         = 0
     all_txs_count        = 0
     network_stats        = []
     network_faucets_list = []
-    unique_users: set    = set()
     faucet_stats         = {}
 
     # FIX: Fetch deleted set ONCE from both sources at the start
-    deleted = await fetch_deleted_faucets()
-    print(f"   🗑️  Deleted faucets to exclude: {len(deleted)}")
+    onchain_deleted = _load_onchain_deleted()
+    deleted = await fetch_deleted_faucets() | onchain_deleted
+    print(f"   🗑️  Deleted faucets to exclude: {len(deleted)} ({len(onchain_deleted)} flagged on-chain)")
+
+    # The stores are rebuilt against this set and record it as handled; faucets
+    # found deleted on-chain during the run are left for the next run's check
+    user_store = _load_unique_user_store(deleted)
+    first_seen = _load_first_seen_index(deleted)
+    handled_deleted = set(deleted)
+    claim_rollup = _load_claim_rollup()
+    loop = asyncio.get_running_loop()
 
     for chain_id, cfg in CHAIN_CONFIGS.items():
-        chain_name  = cfg["name"]
-        chain_color = NETWORK_COLORS.get(chain_name, "#888888")
-        try:
-            w3 = get_web3(cfg["rpcUrls"])
-        except Exception as e:
-            print(f"⚠️  {chain_name}: All RPCs failed — {e}")
-            network_stats.append({"name": chain_name, "chainId": chain_id, "totalTransactions": 0, "color": chain_color})
-            network_faucets_list.append({"network": chain_name, "faucets": 0})
-            continue
-
-        chain_tx_count     = 0
-        chain_faucet_count = 0
-        chain_claim_txs    = []
-
-        for factory_addr in cfg["factoryAddresses"]:
-            if is_placeholder_address(factory_addr):
-                continue
-            addr_checksum = safe_checksum(w3, factory_addr)
-            if not addr_checksum:
+        with tracing.span(cfg["name"], "chain", chain_id=chain_id):
+            chain_name  = cfg["name"]
+            chain_color = NETWORK_COLORS.get(chain_name, "#888888")
+            try:
+                w3 = get_web3(cfg["rpcUrls"])
+            except Exception as e:
+                print(f"⚠️  {chain_name}: All RPCs failed — {e}")
+                tracing.error(f"all RPCs failed: {e}")
+                network_stats.append({"name": chain_name, "chainId": chain_id, "totalTransactions": 0, "color": chain_color})
+                network_faucets_list.append({"network": chain_name, "faucets": 0})
                 continue
 
-            contract_type, data_a, data_b = detect_and_call(w3, addr_checksum)
+            chain_tx_count     = 0
+            chain_faucet_count = 0
+            chain_claim_stats  = []
+            chain_new_claims   = []
+            chain_dated_claims = []
 
-            if contract_type in ("factory", "quest"):
-                factory_txs      = data_a
-                faucet_addresses = data_b
-                chain_tx_count += len(factory_txs)
-                claims = [tx for tx in factory_txs if str(tx[1]).lower() in ("claim", "claimwhenactive")]
-                chain_claim_txs.extend(claims)
-                label = "QUEST" if contract_type == "quest" else "FACTORY"
-                print(f"   📋 {chain_name}/{addr_checksum[:10]}... {label}: {len(factory_txs)} txs, {len(claims)} claims")
+            for factory_addr in cfg["factoryAddresses"]:
+                if is_placeholder_address(factory_addr):
+                    continue
+                addr_checksum = safe_checksum(w3, factory_addr)
+                if not addr_checksum:
+                    continue
 
-                for faucet_raw in faucet_addresses:
-                    faucet_cs = safe_checksum(w3, faucet_raw)
-                    if not faucet_cs:
-                        continue
-                    addr_lower = faucet_cs.lower()
+                with tracing.span(addr_checksum, "factory"):
+                    # Oldest position this run reads from; a rebuilt store needs
+                    # transactions the snapshot may already have released
+                    cursor_key = f"{chain_id}:{addr_checksum.lower()}"
+                    since = min(user_store.cursor(cursor_key), first_seen.cursor(cursor_key),
+                                claim_rollup.cursor(cursor_key), _factory_cursors["dashboard"].get(cursor_key, 0))
+                    with stage("dashboard", "factory_snapshot"):
+                        contract_type, data_a, data_b = await loop.run_in_executor(
+                            None, fetch_factory_snapshot, w3, addr_checksum, chain_id, since)
+
+                    if contract_type in ("factory", "quest"):
+                        factory_txs      = data_a
+                        faucet_addresses = data_b
+                        chain_tx_count += len(factory_txs)
+                        with stage("dashboard", "aggregate"):
+                            claim_stats = _fold_factory_claims(cursor_key, factory_txs)
+                        chain_claim_stats.append(claim_stats)
+                        n_claims = claim_stats["total"]
+
+                        chain_new_claims.extend(
+                            tx for tx in _delta_since(user_store, cursor_key, factory_txs)
+                            if str(tx[1]).lower() in CLAIM_TX_TYPES
+                        )
+                        chain_dated_claims.extend(_delta_since(first_seen, cursor_key, factory_txs))
+                        label = "QUEST" if contract_type == "quest" else "FACTORY"
+                        print(f"   📋 {chain_name}/{addr_checksum[:10]}... {label}: {len(factory_txs)} txs, {n_claims} claims")
+                        tracing.count("txs", len(factory_txs))
+                        tracing.count("claims", n_claims)
+
+                        for faucet_raw in faucet_addresses:
+                            addr_lower = lower_address(faucet_raw)
+                            if not addr_lower or addr_lower in deleted:
+                                continue
+                            if addr_lower in faucet_stats:
+                                chain_faucet_count += 1
+                                continue
 
-                    if addr_lower in deleted:
-                        continue
+                            faucet_cs = checksum_address(addr_lower)
+                            if _is_deleted_onchain(w3, faucet_cs):
+                                print(f"      🗑️  {faucet_cs[:10]}... deleted on-chain — skipping")
+                                deleted.add(addr_lower)
+                                onchain_deleted.add(addr_lower)
+                                continue
 
-                    if addr_lower not in faucet_stats and _is_deleted_onchain(w3, faucet_cs):
-                        print(f"      🗑️  {faucet_cs[:10]}... deleted on-chain — skipping")
-                        deleted.add(addr_lower)
-                        continue
+                            chain_faucet_count += 1
+                            faucet_stats[addr_lower] = {
+                                "claims": 0, "latest": 0, "name": "",
+                                "network": chain_name, "chainId": chain_id,
+                                "w3": w3, "addr_checksum": faucet_cs, "checkin_txs": 0,
+                            }
 
-                    chain_faucet_count += 1
-                    if addr_lower not in faucet_stats:
-                        faucet_stats[addr_lower] = {
-                            "claims": 0, "latest": 0, "name": "",
-                            "network": chain_name, "chainId": chain_id,
-                            "w3": w3, "addr_checksum": faucet_cs, "checkin_txs": 0,
-                        }
+                        # After the faucet loop, so faucets it found deleted on-chain
+                        # are retired and kept out of the rollup in this same run
+                        factory_type = FACTORY_TYPES.get((chain_id, addr_checksum.lower()), "dropcode")
+                        if factory_txs.base and (claim_stats["faucets"] & deleted) - claim_rollup.retired_for(cursor_key):
+                            # Retiring re-reads the folded prefix, which was released
+                            with stage("dashboard", "factory_snapshot"):
+                                full = await loop.run_in_executor(None, fetch_factory_snapshot, w3, addr_checksum, chain_id, 0)
+                            if full[0] == contract_type:
+                                factory_txs = full[1]
+                        retired = _retire_deleted_claims(claim_rollup, cursor_key, chain_id, factory_type,
+                                                         factory_txs, claim_stats["faucets"], deleted)
+                        if retired:
+                            print(f"   ♻️  {chain_name}/{addr_checksum[:10]}... {retired} claims of deleted faucets left the claim rollup")
+                        claim_delta = _delta_since(claim_rollup, cursor_key, factory_txs)
+                        if claim_delta:
+                            with stage("dashboard", "aggregate"):
+                                claim_rollup.add_daily(
+                                    chain_id, factory_type,
+                                    aggregate_claims(decode_transactions(claim_delta), deleted)["daily"],
+                                )
+                        release_factory_snapshot(cursor_key)
+
+                    elif contract_type == "checkin":
+                        tx_count     = data_a
+                        participants = data_b
+                        addr_lower   = addr_checksum.lower()
+                        chain_tx_count += tx_count
+                        tracing.count("txs", tx_count)
+                        if addr_lower not in deleted:
+                            chain_faucet_count += 1
+                            new_participants = _delta_since(user_store, f"{chain_id}:{addr_lower}:participants", participants)
+                            # Check-ins carry no timestamps, so they stay out of the day / week
+                            # sketches: a rebuild resets this cursor and would re-date them all
+                            added = user_store.merge(chain_id, new_participants, source="checkin")
+                            print(f"   🔄 {chain_name}/{addr_checksum[:10]}... CHECKIN: {tx_count} txs, "
+                                  f"{len(participants)} participants (+{added} new unique)")
+                            if addr_lower not in faucet_stats:
+                                faucet_stats[addr_lower] = {
+                                    "claims": 0, "latest": 0, "name": "",
+                                    "network": chain_name, "chainId": chain_id,
+                                    "w3": w3, "addr_checksum": addr_checksum, "checkin_txs": tx_count,
+                                }
+                            else:
+                                faucet_stats[addr_lower]["checkin_txs"] = tx_count
+                        else:
+                            print(f"   🗑️  {chain_name}/{addr_checksum[:10]}... CHECKIN deleted — txs counted, faucet excluded")
+                    else:
+                        print(f"   ❓ {chain_name}/{addr_checksum[:10]}... unknown, skipping")
+                        tracing.error("unknown contract type")
 
-            elif contract_type == "checkin":
-                tx_count     = data_a
-                participants = data_b
-                addr_lower   = addr_checksum.lower()
-                chain_tx_count += tx_count
-                if addr_lower not in deleted:
-                    chain_faucet_count += 1
-                    before = len(unique_users)
-                    unique_users.update(participants)
-                    print(f"   🔄 {chain_name}/{addr_checksum[:10]}... CHECKIN: {tx_count} txs, "
-                          f"{len(participants)} participants (+{len(unique_users)-before} new unique)")
-                    if addr_lower not in faucet_stats:
-                        faucet_stats[addr_lower] = {
+            # Claim counts / latest claim per live faucet from the folded factory counts
+            for claim_stats in chain_claim_stats:
+                for addr_lower, count in claim_stats["claims"].items():
+                    if addr_lower in deleted:
+                        continue
+                    total_claims += count
+                    stats = faucet_stats.get(addr_lower)
+                    if stats is None:
+                        stats = faucet_stats[addr_lower] = {
                             "claims": 0, "latest": 0, "name": "",
                             "network": chain_name, "chainId": chain_id,
-                            "w3": w3, "addr_checksum": addr_checksum, "checkin_txs": tx_count,
+                            "w3": w3, "addr_checksum": checksum_address(addr_lower), "checkin_txs": 0,
                         }
-                    else:
-                        faucet_stats[addr_lower]["checkin_txs"] = tx_count
-                else:
-                    print(f"   🗑️  {chain_name}/{addr_checksum[:10]}... CHECKIN deleted — txs counted, faucet excluded")
-            else:
-                print(f"   ❓ {chain_name}/{addr_checksum[:10]}... unknown, skipping")
-
-        for tx in chain_claim_txs:
-            faucet_cs = safe_checksum(w3, str(tx[0]))
-            if not faucet_cs:
-                continue
-            addr_lower = faucet_cs.lower()
-            if addr_lower in deleted:
-                continue
-            claimer_cs = safe_checksum(w3, str(tx[2]))
-            if claimer_cs:
-                unique_users.add(claimer_cs.lower())
-            all_claims.append(tx)
-            if addr_lower not in faucet_stats:
-                faucet_stats[addr_lower] = {
-                    "claims": 0, "latest": 0, "name": "",
-                    "network": chain_name, "chainId": chain_id,
-                    "w3": w3, "addr_checksum": faucet_cs, "checkin_txs": 0,
-                }
-            faucet_stats[addr_lower]["claims"] += 1
-            faucet_stats[addr_lower]["latest"]  = max(faucet_stats[addr_lower]["latest"], int(tx[5]))
-
-        for addr_lower, stats in faucet_stats.items():
-            if stats["chainId"] != chain_id or stats["claims"] > 0 or stats["checkin_txs"] > 0:
-                continue
-            checkin_count, checkin_participants = _try_checkin(stats["w3"], stats["addr_checksum"])
-            if checkin_count > 0:
-                stats["checkin_txs"]  = checkin_count
-                chain_tx_count       += checkin_count
-                before = len(unique_users)
-                unique_users.update(checkin_participants)
-                print(f"      🔄 CHECKIN fallback {stats['addr_checksum'][:10]}...: "
-                      f"{checkin_count} txs (+{len(unique_users)-before} new unique)")
-
-        quest_quiz_tx_count = 0
-        for kind, cfg_key in (("quest", "Quests"), ("quiz", "quiz")):
-            factory_addrs_raw = cfg.get(cfg_key, [])
-            if isinstance(factory_addrs_raw, str):
-                factory_addrs_raw = [factory_addrs_raw] if factory_addrs_raw else []
-
-            factory_abi = QUEST_FACTORY_ABI if kind == "quest" else QUIZ_FACTORY_ABI
+                    stats["claims"] += count
+                    stats["latest"]  = max(stats["latest"], claim_stats["latest"][addr_lower])
+
+            # Only claims appended since the previous run are merged into the store
+            live_new_claims = [tx for tx in chain_new_claims if lower_address(tx[0]) not in deleted]
+            user_store.merge(
+                chain_id,
+                [str(tx[2]) for tx in live_new_claims],
+                source="claims",
+                timestamps=[int(tx[5]) for tx in live_new_claims],
+            )
+            dated = aggregate_claims(decode_transactions(chain_dated_claims), deleted)["first_seen"]
+            for claimer, ts in dated.items():
+                first_seen.observe(claimer, utc_day(ts).isoformat())
 
-            for factory_addr_raw in factory_addrs_raw:
-                if not factory_addr_raw or is_placeholder_address(factory_addr_raw):
-                    continue
-                factory_cs = safe_checksum(w3, factory_addr_raw)
-                if not factory_cs:
+            for addr_lower, stats in faucet_stats.items():
+                if stats["chainId"] != chain_id or stats["claims"] > 0 or stats["checkin_txs"] > 0:
                     continue
-                try:
-                    fc = w3.eth.contract(address=factory_cs, abi=factory_abi)
-                    factory_txs = fc.functions.getAllTransactions().call()
-                    quest_quiz_tx_count += len(factory_txs)
-                    chain_tx_count      += len(factory_txs)
-                    print(f"   ✅ {chain_name}/{factory_cs[:10]}... {kind.upper()}-FACTORY: "
-                          f"{len(factory_txs)} txs")
-                except Exception:
-                    print(f"   ⚠️  {chain_name} {kind} factory {factory_cs[:10]}... "
-                          f"getAllTransactions() failed — skipping tx count")
+                checkin_count, checkin_participants = _try_checkin(stats["w3"], stats["addr_checksum"])
+                if checkin_count > 0:
+                    stats["checkin_txs"]  = checkin_count
+                    chain_tx_count       += checkin_count
+                    new_participants = _delta_since(user_store, f"{chain_id}:{addr_lower}:participants", checkin_participants)
+                    added = user_store.merge(chain_id, new_participants, source="checkin")
+                    print(f"      🔄 CHECKIN fallback {stats['addr_checksum'][:10]}...: "
+                          f"{checkin_count} txs (+{added} new unique)")
+
+            quest_quiz_tx_count = 0
+            for kind, cfg_key in (("quest", "Quests"), ("quiz", "quiz")):
+                factory_addrs_raw = cfg.get(cfg_key, [])
+                if isinstance(factory_addrs_raw, str):
+                    factory_addrs_raw = [factory_addrs_raw] if factory_addrs_raw else []
 
-        if quest_quiz_tx_count > 0:
-            print(f"   📊 {chain_name}: +{quest_quiz_tx_count} txs from quest/quiz factories")
+                factory_abi = QUEST_FACTORY_ABI if kind == "quest" else QUIZ_FACTORY_ABI
 
-        all_txs_count += chain_tx_count
-        network_stats.append({"name": chain_name, "chainId": chain_id,
-                               "totalTransactions": chain_tx_count, "color": chain_color})
-        network_faucets_list.append({"network": chain_name, "faucets": chain_faucet_count})
-        print(f"   ✅ {chain_name}: {chain_tx_count} txs total, {chain_faucet_count} active faucets")
+                for factory_addr_raw in factory_addrs_raw:
+                    if not factory_addr_raw or is_placeholder_address(factory_addr_raw):
+                        continue
+                    factory_cs = safe_checksum(w3, factory_addr_raw)
+                    if not factory_cs:
+                        continue
+                    try:
+                        fc = w3.eth.contract(address=factory_cs, abi=factory_abi)
+                        factory_txs = fc.functions.getAllTransactions().call()
+                        quest_quiz_tx_count += len(factory_txs)
+                        chain_tx_count      += len(factory_txs)
+                        print(f"   ✅ {chain_name}/{factory_cs[:10]}... {kind.upper()}-FACTORY: "
+                              f"{len(factory_txs)} txs")
+                    except Exception:
+                        print(f"   ⚠️  {chain_name} {kind} factory {factory_cs[:10]}... "
+                              f"getAllTransactions() failed — skipping tx count")
+                        tracing.error(f"{kind} factory {factory_cs} getAllTransactions() failed")
+
+            if quest_quiz_tx_count > 0:
+                print(f"   📊 {chain_name}: +{quest_quiz_tx_count} txs from quest/quiz factories")
+                tracing.count("txs", quest_quiz_tx_count)
+
+            all_txs_count += chain_tx_count
+            network_stats.append({"name": chain_name, "chainId": chain_id,
+                                   "totalTransactions": chain_tx_count, "color": chain_color})
+            network_faucets_list.append({"network": chain_name, "faucets": chain_faucet_count})
+            print(f"   ✅ {chain_name}: {chain_tx_count} txs total, {chain_faucet_count} active faucets")
+            tracing.count("faucets", chain_faucet_count)
 
     # ── Quest + Quiz unique participants ──
     print(f"\n📊 [refresh_all_data] Collecting unique quest/quiz participants...")
-    users_from_faucets = len(unique_users)
+    users_before_qq = user_store.total()
 
-    quest_quiz_participants = await collect_quest_quiz_unique_participants()
+    with stage("dashboard", "quest_quiz_participants"):
+        quest_quiz_participants = await collect_quest_quiz_unique_participants()
 
-    already_seen  = quest_quiz_participants & unique_users
-    net_new       = quest_quiz_participants - unique_users
-    unique_users.update(quest_quiz_participants)
+    net_new      = user_store.merge("quest_quiz", quest_quiz_participants, source="quest_quiz")
+    already_seen = max(0, len(quest_quiz_participants) - net_new)
+
+    # Participant rows added since the last run carry dates: they feed users_chart
+    # below and the quest_quiz day / week sketches here
+    quest_quiz_dates, first_seen.watermarks = await loop.run_in_executor(
+        None, _fetch_quest_quiz_participant_dates, first_seen.watermarks
+    )
+    user_store.merge(
+        "quest_quiz", list(quest_quiz_dates), source="quest_quiz",
+        timestamps=[int(datetime.fromisoformat(d).replace(tzinfo=timezone.utc).timestamp()) for d in quest_quiz_dates.values()],
+    )
+    total_unique_users = user_store.total()
+
+    if onchain_deleted - handled_deleted:
+        save_indexer_state(ONCHAIN_DELETED_STATE_KEY, {"faucets": sorted(onchain_deleted)})
+    user_store.deleted = set(handled_deleted)
+    save_indexer_state(UNIQUE_USERS_STATE_KEY, user_store.to_state())
+    _unique_user_breakdown = {**user_store.breakdown(), "last_updated": datetime.utcnow().isoformat()}
 
     print(
         f"\n{'─'*60}\n"
         f"  👥 Unique user breakdown:\n"
-        f"     Faucet claims + checkins : {users_from_faucets:>6}\n"
+        f"     Known before quest/quiz  : {users_before_qq:>6}\n"
         f"     Quest/Quiz participants  : {len(quest_quiz_participants):>6}\n"
-        f"       └─ already in faucets : {len(already_seen):>6}\n"
-        f"       └─ net new (quest/quiz): {len(net_new):>6}\n"
-        f"     TOTAL unique users       : {len(unique_users):>6}\n"
+        f"       └─ already known      : {already_seen:>6}\n"
+        f"       └─ net new (quest/quiz): {net_new:>6}\n"
+        f"     TOTAL unique users       : {total_unique_users:>6}\n"
         f"{'─'*60}"
     )
 
     print(f"🔤 Fetching names for {len(faucet_stats)} faucets...")
-    for addr_lower, stats in faucet_stats.items():
-        stats["name"] = get_faucet_name_sync(stats["w3"], stats["addr_checksum"])
-
-    # ── Faucet claim dates (existing) ──
-    first_claim_per_user = {}
-    for tx in all_claims:
-        claimer  = str(tx[2]).lower()
-        date_str = datetime.fromtimestamp(int(tx[5])).strftime("%Y-%m-%d")
-        if claimer not in first_claim_per_user or date_str < first_claim_per_user[claimer]:
-            first_claim_per_user[claimer] = date_str
-
-    # ── Merge quest/quiz participant dates ──
-    loop = asyncio.get_running_loop()
-    quest_quiz_dates = await loop.run_in_executor(
-        None, _fetch_quest_quiz_participant_dates
-    )
-    merged_qq = 0
-    for addr, date_str in quest_quiz_dates.items():
-        if addr not in first_claim_per_user or date_str < first_claim_per_user[addr]:
-            first_claim_per_user[addr] = date_str
-            merged_qq += 1
-    print(f"   📅 Merged {merged_qq} quest/quiz-only dated users into users_chart")
-
-    new_users_by_date = defaultdict(int)
-    for date_str in first_claim_per_user.values():
-        new_users_by_date[date_str] += 1
-
-    users_chart = []
-    cumulative  = 0
-    for date_str in sorted(new_users_by_date.keys()):
-        new = new_users_by_date[date_str]
-        cumulative += new
-        users_chart.append({"date": date_str, "newUsers": new, "cumulativeUsers": cumulative})
-
-    total_claims   = len(all_claims)
+    with stage("dashboard", "names"):
+        chain_w3 = {stats["chainId"]: stats["w3"] for stats in faucet_stats.values()}
+        for chain_id, w3 in chain_w3.items():
+            apply_name_updates(w3, chain_id)
+        for addr_lower, stats in faucet_stats.items():
+            stats["name"] = get_faucet_name_sync(stats["w3"], stats["addr_checksum"], stats["chainId"])
+        save_faucet_names()
+
+    # ── users_chart: fold new quest/quiz participant rows into the first-seen index ──
+    merged_qq = sum(1 for addr, date_str in quest_quiz_dates.items() if first_seen.observe(addr, date_str))
+    print(f"   📅 Merged {merged_qq} quest/quiz dated users into users_chart")
+
+    users_chart    = first_seen.chart()
+    user_rows      = first_seen.take_affected()
+    first_seen.deleted = set(handled_deleted)
+    save_indexer_state(FIRST_SEEN_STATE_KEY, first_seen.to_state())
+    _new_users_series = BucketSeries.from_state(first_seen.new_by_date)
+    print(f"   📅 users_chart: {len(first_seen)} dated users, {len(user_rows)} dates changed")
+
+    save_indexer_state(CLAIM_ROLLUP_STATE_KEY, claim_rollup.to_state())
+    _claim_rollup = claim_rollup
+    print(f"   📈 claim rollup: {claim_rollup.total()} claims in {len(claim_rollup.series)} chain/type series")
+
     sorted_faucets = sorted(faucet_stats.items(), key=lambda x: x[1]["latest"], reverse=True)
     rankings = [
         {
@@ -1261,7 +2152,7 @@ async def refresh_all_data():
 
     dashboard_data = {
         "total_claims":         total_claims,
-        "total_unique_users":   len(unique_users),
+        "total_unique_users":   total_unique_users,
         "total_faucets":        sum(x["faucets"] for x in network_faucets_list),
         "total_transactions":   all_txs_count,
         "claims_pie_data":      pie,
@@ -1271,107 +2162,123 @@ async def refresh_all_data():
         "network_faucets":      network_faucets_list,
         "last_updated":         datetime.utcnow().isoformat(),
     }
-    print(f"✅ Done: {total_claims} claims | {len(unique_users)} unique users | "
+    print(f"✅ Done: {total_claims} claims | {total_unique_users} unique users | "
           f"{dashboard_data['total_faucets']} faucets | {all_txs_count} txs")
-    save_dashboard_to_supabase(dashboard_data)
+    with stage("dashboard", "supabase_write"):
+        save_dashboard_to_supabase(dashboard_data, user_rows=user_rows)
        
+# ── Quest / quiz list cache ──
+# Payloads are served from memory for LIST_CACHE_TTL_SECONDS, then served
+# stale for up to LIST_CACHE_STALE_SECONDS more while one rebuild runs.
+# The quests / faucet_quizzes rows are shared with the analytics builders
+# for the same window, so one refresh does not read them twice.
+LIST_CACHE_TTL_SECONDS   = float(os.getenv("LIST_CACHE_TTL_SECONDS", "60"))
+LIST_CACHE_STALE_SECONDS = float(os.getenv("LIST_CACHE_STALE_SECONDS", "600"))
+QUIZ_COLUMNS = (
+    "id, code, title, status, chain_id, faucet_address, creator_address, "
+    "is_ai_generated, max_participants, time_per_question, created_at, "
+    "rewards_distributed"
+)
+
+_list_cache      = ResponseCache("quest_quiz_lists", LIST_CACHE_TTL_SECONDS, LIST_CACHE_STALE_SECONDS)
+_table_snapshots = TableSnapshots(LIST_CACHE_TTL_SECONDS)
+
+
+def _shared_rows(table: str, columns: str = "*") -> List[Dict]:
+    """Rows of *table* read at most once per window across the list endpoints and analytics."""
+    return _table_snapshots.get(
+        table, columns, lambda: supabase.table(table).select(columns).execute().data or []
+    )
+
+
+def _build_quest_list() -> dict:
+    quest_rows = _shared_rows("quests")
+
+    counts = quest_dashboard_counts(supabase)
+
+    quests = []
+    for q in quest_rows:
+        addr = q.get("faucet_address", "")
+        quest_counts = counts.get(addr, {})
+        quests.append({
+            "faucetAddress":     addr,
+            "title":             q.get("title", "Untitled Quest"),
+            "isActive":          q.get("is_active", False),
+            "isDraft":           q.get("is_draft", False),
+            "isFunded":          q.get("is_funded", False),
+            "totalParticipants": quest_counts.get("participants", 0),
+            "tasksCount":        quest_counts.get("tasks", 0),
+            "rewardPool":        q.get("reward_pool", "0"),
+            "tokenSymbol":       q.get("token_symbol", ""),
+        })
+
+    return {"success": True, "quests": quests, "count": len(quests)}
+
+
+def _build_quiz_list() -> dict:
+    quiz_rows = _shared_rows("faucet_quizzes", QUIZ_COLUMNS)
+
+    quiz_ids = [q["id"] for q in quiz_rows]
+    if not quiz_ids:
+        return {"success": True, "quizzes": [], "count": 0}
+
+    counts = quiz_dashboard_counts(supabase)
+
+    # One reward row per quiz: already aggregate-sized
+    r_rows = supabase.table("faucet_quiz_rewards")\
+        .select("quiz_id, pool_amount, token_symbol").execute().data or []
+    reward_map: dict = {
+        r["quiz_id"]: {
+            "poolAmount":  float(r.get("pool_amount") or 0),
+            "tokenSymbol": r.get("token_symbol", ""),
+        }
+        for r in r_rows
+    }
+
+    quizzes = []
+    for q in quiz_rows:
+        qid    = q["id"]
+        reward = reward_map.get(qid)
+        quiz_counts = counts.get(str(qid), {})
+        quizzes.append({
+            "code":           (q.get("code") or "").upper(),
+            "title":          q.get("title", "Untitled Quiz"),
+            "status":         q.get("status", "waiting"),
+            "playerCount":    quiz_counts.get("players", 0),
+            "totalQuestions": quiz_counts.get("questions", 0),
+            "reward": reward if reward and reward["poolAmount"] > 0 else None,
+        })
+
+    order = {"active": 0, "waiting": 1, "finished": 2}
+    quizzes.sort(key=lambda x: order.get(x["status"], 3))
+
+    return {"success": True, "quizzes": quizzes, "count": len(quizzes)}
+
+
 @app.get("/api/quests")
 async def get_all_quests_for_dashboard():
-    """All quests for the analytics dashboard table."""
+    """
+    All quests for the analytics dashboard table. Participant and task counts
+    are grouped in the database (quest_dashboard_counts), one row per quest.
+    """
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not available")
     try:
-        quest_rows = supabase.table("quests").select("*").execute().data or []
-
-        p_rows = supabase.table("quest_participants")\
-            .select("quest_address, wallet_address").execute().data or []
-        participant_counts: dict = {}
-        for p in p_rows:
-            addr = p["quest_address"]
-            participant_counts[addr] = participant_counts.get(addr, 0) + 1
-
-        t_rows = supabase.table("faucet_tasks")\
-            .select("faucet_address, tasks").execute().data or []
-        task_counts: dict = {
-            r["faucet_address"]: len(r.get("tasks") or [])
-            for r in t_rows
-        }
-
-        quests = []
-        for q in quest_rows:
-            addr = q.get("faucet_address", "")
-            quests.append({
-                "faucetAddress":     addr,
-                "title":             q.get("title", "Untitled Quest"),
-                "isActive":          q.get("is_active", False),
-                "isDraft":           q.get("is_draft", False),
-                "isFunded":          q.get("is_funded", False),
-                "totalParticipants": participant_counts.get(addr, 0),
-                "tasksCount":        task_counts.get(addr, 0),
-                "rewardPool":        q.get("reward_pool", "0"),
-                "tokenSymbol":       q.get("token_symbol", ""),
-            })
-
-        return {"success": True, "quests": quests, "count": len(quests)}
+        return await _list_cache.get("quests", _build_quest_list)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/quiz/list")
 async def get_all_quizzes_for_dashboard():
-    """All quizzes for the analytics dashboard table."""
+    """
+    All quizzes for the analytics dashboard table. Player and question counts
+    are grouped in the database (quiz_dashboard_counts), one row per quiz.
+    """
     if not supabase:
         raise HTTPException(status_code=503, detail="Database not available")
     try:
-        quiz_rows = supabase.table("faucet_quizzes").select(
-            "id, code, title, status, chain_id, created_at"
-        ).execute().data or []
-
-        quiz_ids = [q["id"] for q in quiz_rows]
-        if not quiz_ids:
-            return {"success": True, "quizzes": [], "count": 0}
-
-        p_rows = supabase.table("faucet_quiz_participants")\
-            .select("quiz_id").execute().data or []
-        player_counts: dict = {}
-        for p in p_rows:
-            qid = p["quiz_id"]
-            player_counts[qid] = player_counts.get(qid, 0) + 1
-
-        q_rows = supabase.table("faucet_quiz_questions")\
-            .select("quiz_id").execute().data or []
-        question_counts: dict = {}
-        for q in q_rows:
-            qid = q["quiz_id"]
-            question_counts[qid] = question_counts.get(qid, 0) + 1
-
-        r_rows = supabase.table("faucet_quiz_rewards")\
-            .select("quiz_id, pool_amount, token_symbol").execute().data or []
-        reward_map: dict = {
-            r["quiz_id"]: {
-                "poolAmount":  float(r.get("pool_amount") or 0),
-                "tokenSymbol": r.get("token_symbol", ""),
-            }
-            for r in r_rows
-        }
-
-        quizzes = []
-        for q in quiz_rows:
-            qid    = q["id"]
-            reward = reward_map.get(qid)
-            quizzes.append({
-                "code":           (q.get("code") or "").upper(),
-                "title":          q.get("title", "Untitled Quiz"),
-                "status":         q.get("status", "waiting"),
-                "playerCount":    player_counts.get(qid, 0),
-                "totalQuestions": question_counts.get(qid, 0),
-                "reward": reward if reward and reward["poolAmount"] > 0 else None,
-            })
-
-        order = {"active": 0, "waiting": 1, "finished": 2}
-        quizzes.sort(key=lambda x: order.get(x["status"], 3))
-
-        return {"success": True, "quizzes": quizzes, "count": len(quizzes)}
+        return await _list_cache.get("quizzes", _build_quiz_list)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1473,17 +2380,60 @@ def load_from_supabase() -> Optional[dict]:
 
 # ====================== ANALYTICS ENDPOINT (Supabase-driven) ======================
 
-async def build_faucet_analytics() -> dict:
-    try:
-        # ── FIX: Fetch deleted set to gate network_faucets rows ──
-        deleted_set = await fetch_deleted_faucets()
+async def _read_tables(section: str, reads: Dict[str, Any], timings: Optional[Dict[str, Dict]]) -> Dict[str, Any]:
+    """
+    Run a builder's independent table reads concurrently in the executor.
+    *reads* maps a name to a blocking callable (or an awaitable); each read's
+    wall time lands in timings[section]["reads"] and in the run trace.
+    """
+    loop = asyncio.get_running_loop()
+    read_ms: Dict[str, float] = {}
+    if timings is not None:
+        timings.setdefault(section, {})["reads"] = read_ms
 
-        # ── Single fetch of meta — use as the ONE source of truth for totals ──
-        meta_rows = supabase.table("dashboard_meta").select("*").eq("id", 1).execute().data
+    async def _one(name: str, read):
+        t0 = time.perf_counter()
+        try:
+            if asyncio.iscoroutine(read):
+                return await read
+            return await loop.run_in_executor(None, tracing.bind(read, name, "read"))
+        finally:
+            read_ms[name] = round((time.perf_counter() - t0) * 1000, 1)
+
+    results = await asyncio.gather(*(_one(name, read) for name, read in reads.items()))
+    return dict(zip(reads, results))
+
+
+def _select_all(table: str, columns: str = "*"):
+    return lambda: supabase.table(table).select(columns).execute().data or []
+
+
+def _volume_by_type(rollup: ClaimRollup, granularity: str, start, end, label: str, fmt) -> List[Dict]:
+    """One row per bucket in [start, end] with claims per faucet type (zeros included)."""
+    by_type = {t: sum_windows(rollup.select(faucet_type=t), granularity, start, end) for t in FAUCET_TYPES}
+    return [
+        {label: fmt(bucket), "period": bucket, **{t: by_type[t][i][1] for t in FAUCET_TYPES}}
+        for i, (bucket, _) in enumerate(by_type[FAUCET_TYPES[0]])
+    ]
+
+
+async def build_faucet_analytics(timings: Optional[Dict[str, Dict]] = None) -> dict:
+    try:
+        # ── FIX: deleted set gates network_faucets rows; dashboard_meta is the
+        #    ONE source of truth for totals. All reads run concurrently ──
+        tables = await _read_tables("faucet", {
+            "deleted_faucets": fetch_deleted_faucets(),
+            "dashboard_meta":  lambda: supabase.table("dashboard_meta").select("*").eq("id", 1).execute().data,
+            "network_faucets": _select_all("network_faucets"),
+            "claim_data":      _select_all("claim_data"),
+            "claim_rollup":    _current_claim_rollup,
+        }, timings)
+        deleted_set = tables["deleted_faucets"]
+        meta_rows   = tables["dashboard_meta"]
         meta = meta_rows[0] if meta_rows else {}
 
         # ── Faucet rows from network_faucets — filter out deleted ──
-        all_faucet_rows = supabase.table("network_faucets").select("*").execute().data or []
+        all_faucet_rows = tables["network_faucets"]
         faucet_rows = [
             f for f in all_faucet_rows
             if f.get("faucet_address", "").lower() not in deleted_set
@@ -1497,9 +2447,8 @@ async def build_faucet_analytics() -> dict:
         unique_users      = meta.get("total_unique_users", 0)
         avg_drop_per_user = round(total_drops / unique_users, 2) if unique_users else 0
 
-        # ── Monthly volume: aggregate claim_data by month + factory_type ──
         # Filter claim_data to exclude deleted faucets too
-        claim_rows_raw = supabase.table("claim_data").select("*").execute().data or []
+        claim_rows_raw = tables["claim_data"]
         claim_rows = [
             r for r in claim_rows_raw
             if r.get("faucet_address", "").lower() not in deleted_set
@@ -1510,34 +2459,17 @@ async def build_faucet_analytics() -> dict:
             for f in faucet_rows
         }
 
-        MONTH_ORDER = ["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"]
-        monthly_map: dict = {}
-
-        for row in claim_rows:
-            ts = row.get("latest_claim_time")
-            if not ts:
-                continue
-            try:
-                if isinstance(ts, (int, float)):
-                    dt = datetime.fromtimestamp(int(ts))
-                else:
-                    dt = datetime.fromisoformat(str(ts))
-                month_key = dt.strftime("%b")
-            except Exception:
-                continue
-
-            if month_key not in monthly_map:
-                monthly_map[month_key] = {"month": month_key, "dropcode": 0, "droplist": 0, "custom": 0}
-
-            faucet_addr = row.get("faucet_address", "")
-            ftype = faucet_type_map.get(faucet_addr, "dropcode")
-            ftype = ftype if ftype in ("dropcode", "droplist", "custom") else "dropcode"
-            monthly_map[month_key][ftype] += row.get("claims", 0)
-
-        monthly_volume = sorted(
-            monthly_map.values(),
-            key=lambda x: MONTH_ORDER.index(x["month"]) if x["month"] in MONTH_ORDER else 99
-        )[-7:]
+        # ── Claim volume by month / week / day + faucet type, from the claim rollup ──
+        rollup = tables["claim_rollup"]
+        today  = datetime.now(timezone.utc).date()
+        month_start = today.replace(day=1)
+        for _ in range(6):
+            month_start = (month_start - timedelta(days=1)).replace(day=1)
+        monthly_volume = _volume_by_type(rollup, "month", month_start, today, "month",
+                                         lambda key: datetime.strptime(key, "%Y-%m").strftime("%b"))
+        weekly_volume  = _volume_by_type(rollup, "week", today - timedelta(days=today.weekday() + 7 * 7), today,
+                                         "week", lambda key: key)
+        daily_volume   = _volume_by_type(rollup, "day", today - timedelta(days=29), today, "date", lambda key: key)
 
         # ── Type split (% of live faucets by factory_type) ──
         type_counts: dict = {"dropcode": 0, "droplist": 0, "custom": 0}
@@ -1586,6 +2518,8 @@ async def build_faucet_analytics() -> dict:
             "uniqueUsers":    unique_users,
             "avgDropPerUser": avg_drop_per_user,
             "monthlyVolume":  monthly_volume,
+            "weeklyVolume":   weekly_volume,
+            "dailyVolume":    daily_volume,
             "typeSplit":      type_split,
             "topNetworks":    top_networks,
             "recentActivity": recent_activity,
@@ -1594,28 +2528,36 @@ async def build_faucet_analytics() -> dict:
         print(f"⚠️  [build_faucet_analytics] {e}")
         return {
             "totalFaucets": 0, "totalDrops": 0, "uniqueUsers": 0, "avgDropPerUser": 0,
-            "monthlyVolume": [], "typeSplit": [], "topNetworks": [], "recentActivity": [],
+            "monthlyVolume": [], "weeklyVolume": [], "dailyVolume": [],
+            "typeSplit": [], "topNetworks": [], "recentActivity": [],
         }
 
 
-async def build_quest_analytics() -> dict:
+async def build_quest_analytics(timings: Optional[Dict[str, Dict]] = None) -> dict:
     """
     Builds QuestAnalytics entirely from Supabase tables.
     Tables used: quests, quest_participants, faucet_tasks, submissions
     """
     try:
-        quest_rows = supabase.table("quests").select("*").execute().data or []
+        tables = await _read_tables("quest", {
+            "quests":             lambda: _shared_rows("quests"),
+            "quest_participants": _select_all("quest_participants", "wallet_address, quest_address, points, updated_at"),
+            "submissions":        _select_all("submissions", "faucet_address, wallet_address, status, submitted_at"),
+            "faucet_tasks":       _select_all("faucet_tasks", "faucet_address, tasks"),
+            "quest_completions":  _update_quest_completion_rollup,
+        }, timings)
+        quest_rows = tables["quests"]
 
         active_quests = sum(1 for q in quest_rows if q.get("is_active") and not q.get("is_draft"))
         total_quests  = len([q for q in quest_rows if not q.get("is_draft")])
 
-        participant_rows = supabase.table("quest_participants").select("wallet_address, quest_address, points, updated_at").execute().data or []
+        participant_rows = tables["quest_participants"]
         unique_participants = len({r["wallet_address"] for r in participant_rows})
 
-        submission_rows = supabase.table("submissions").select("faucet_address, wallet_address, status, submitted_at").execute().data or []
+        submission_rows = tables["submissions"]
         completions = sum(1 for s in submission_rows if s.get("status") == "approved")
 
-        task_rows = supabase.table("faucet_tasks").select("faucet_address, tasks").execute().data or []
+        task_rows = tables["faucet_tasks"]
         task_count_map = {r["faucet_address"]: len(r.get("tasks") or []) for r in task_rows}
         avg_tasks = round(
             sum(task_count_map.values()) / len(task_count_map), 1
@@ -1701,44 +2643,141 @@ async def build_quest_analytics() -> dict:
         }
 
 
-async def build_quiz_analytics() -> dict:
+QUIZ_ROLLUP_STATE_KEY     = "quiz_answer_rollup"
+QUIZ_ROLLUP_REBUILD_HOURS = float(os.getenv("QUIZ_ROLLUP_REBUILD_HOURS", "24"))
+QUIZ_ANSWERS_PAGE_SIZE    = 1000
+
+_quiz_rollup: Optional[QuizAnswerRollup] = None
+_quiz_rollup_lock = threading.Lock()
+
+QUEST_ROLLUP_STATE_KEY     = "quest_completion_rollup"
+QUEST_ROLLUP_REBUILD_HOURS = float(os.getenv("QUEST_ROLLUP_REBUILD_HOURS", "24"))
+SUBMISSIONS_PAGE_SIZE      = 1000
+
+_quest_rollup: Optional[QuestCompletionRollup] = None
+_quest_rollup_lock = threading.Lock()
+
+
+def _update_quiz_answer_rollup() -> Dict:
+    """
+    Fold the faucet_quiz_answers rows added since the last run into the
+    persisted rollup and return a snapshot of its score buckets and weekday
+    counts. Rebuilt from scratch every QUIZ_ROLLUP_REBUILD_HOURS so deleted
+    answers (and rows without answered_at) eventually drop out / get counted.
+    """
+    global _quiz_rollup
+    with _quiz_rollup_lock:
+        rollup = _quiz_rollup or QuizAnswerRollup.from_state(load_indexer_state(QUIZ_ROLLUP_STATE_KEY))
+        rebuild = time.time() - rollup.built_at > QUIZ_ROLLUP_REBUILD_HOURS * 3600
+        if rebuild:
+            rollup = QuizAnswerRollup()
+        full = not rollup.watermark
+
+        # Read every page before folding: the fold moves the watermark, and
+        # rows sharing the last timestamp may straddle two pages
+        rows: List[Dict] = []
+        while True:
+            query = supabase.table("faucet_quiz_answers").select(
+                "quiz_id, wallet_address, is_correct, points_earned, answered_at"
+            )
+            if rollup.watermark:
+                query = query.gte("answered_at", rollup.watermark)
+            # id breaks answered_at ties so offsets stay stable across pages
+            page = query.order("answered_at").order("id")\
+                .range(len(rows), len(rows) + QUIZ_ANSWERS_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < QUIZ_ANSWERS_PAGE_SIZE:
+                break
+
+        quiz_chains = {str(q["id"]): q.get("chain_id") or 0 for q in _shared_rows("faucet_quizzes", QUIZ_COLUMNS)}
+        added = rollup.fold(rows, quiz_chains)
+        if added or full:
+            save_indexer_state(QUIZ_ROLLUP_STATE_KEY, rollup.to_state())
+        _quiz_rollup = rollup
+        print(f"   🧮 [quiz rollup] +{added} answers ({'full build' if full else 'incremental'}), "
+              f"{len(rollup)} quiz/wallet pairs, watermark {rollup.watermark or '-'}")
+        return {"buckets": list(rollup.buckets), "score_sum": rollup.score_sum, "days": dict(rollup.days)}
+
+
+def _current_quiz_rollup() -> QuizAnswerRollup:
+    global _quiz_rollup
+    # No lock once set: _update_quiz_answer_rollup holds it across its whole read
+    if _quiz_rollup is None:
+        loaded = QuizAnswerRollup.from_state(load_indexer_state(QUIZ_ROLLUP_STATE_KEY))
+        if _quiz_rollup is None:
+            _quiz_rollup = loaded
+    return _quiz_rollup
+
+
+def _update_quest_completion_rollup() -> int:
+    """
+    Fold approved submissions read from the watermark on into the persisted
+    quest completion rollup (the quest_completions time series). Rebuilt
+    every QUEST_ROLLUP_REBUILD_HOURS so deleted or un-approved submissions
+    drop out. Returns how many completions were added.
+    """
+    global _quest_rollup
+    with _quest_rollup_lock:
+        rollup = _quest_rollup or QuestCompletionRollup.from_state(load_indexer_state(QUEST_ROLLUP_STATE_KEY))
+        if time.time() - rollup.built_at > QUEST_ROLLUP_REBUILD_HOURS * 3600:
+            rollup = QuestCompletionRollup()
+        full = not rollup.watermark
+
+        rows: List[Dict] = []
+        while True:
+            query = supabase.table("submissions").select("faucet_address, wallet_address, status, submitted_at")
+            if rollup.watermark:
+                query = query.gte("submitted_at", rollup.watermark)
+            page = query.order("submitted_at").order("wallet_address")\
+                .range(len(rows), len(rows) + SUBMISSIONS_PAGE_SIZE - 1).execute().data or []
+            rows.extend(page)
+            if len(page) < SUBMISSIONS_PAGE_SIZE:
+                break
+
+        quest_chains = {q.get("faucet_address"): q.get("chain_id") or 0 for q in _shared_rows("quests")}
+        added = rollup.fold(rows, quest_chains)
+        save_indexer_state(QUEST_ROLLUP_STATE_KEY, rollup.to_state())
+        _quest_rollup = rollup
+        print(f"   🧮 [quest rollup] +{added} completions ({'full build' if full else 'incremental'}), "
+              f"{len(rows)} rows read, watermark {rollup.watermark or '-'}")
+        return added
+
+
+def _current_quest_rollup() -> Optional[QuestCompletionRollup]:
+    """The quest completion rollup, or None if it was never built."""
+    global _quest_rollup
+    if _quest_rollup is None:
+        state = load_indexer_state(QUEST_ROLLUP_STATE_KEY)
+        if state and _quest_rollup is None:
+            _quest_rollup = QuestCompletionRollup.from_state(state)
+    return _quest_rollup
+
+
+async def build_quiz_analytics(timings: Optional[Dict[str, Dict]] = None) -> dict:
     try:
-        quiz_rows = supabase.table("faucet_quizzes").select(
-            "id, code, title, status, chain_id, faucet_address, creator_address, "
-            "is_ai_generated, max_participants, time_per_question, created_at, "
-            "rewards_distributed"
-        ).execute().data or []
+        tables = await _read_tables("quiz", {
+            "faucet_quizzes": lambda: _shared_rows("faucet_quizzes", QUIZ_COLUMNS),
+            "faucet_quiz_participants": _select_all(
+                "faucet_quiz_participants", "quiz_id, wallet_address, final_rank, final_points, points"
+            ),
+            "faucet_quiz_answers": _update_quiz_answer_rollup,
+        }, timings)
+        quiz_rows = tables["faucet_quizzes"]
 
         total_quizzes = len(quiz_rows)
         quiz_id_map   = {q["id"]: q for q in quiz_rows}
 
-        participant_rows = supabase.table("faucet_quiz_participants").select(
-            "quiz_id, wallet_address, final_rank, final_points, points"
-        ).execute().data or []
+        participant_rows = tables["faucet_quiz_participants"]
 
         total_attempts = len(participant_rows)
 
-        answer_rows = supabase.table("faucet_quiz_answers").select(
-            "quiz_id, wallet_address, is_correct, points_earned, answered_at"
-        ).execute().data or []
+        # Per-(quiz, wallet) correct/total, score buckets and weekday counts
+        # are maintained incrementally by the quiz answer rollup
+        answers = tables["faucet_quiz_answers"]
 
         from collections import defaultdict
-        answer_map: dict = defaultdict(lambda: {"correct": 0, "total": 0})
-        for a in answer_rows:
-            key = (a["quiz_id"], a["wallet_address"])
-            answer_map[key]["total"] += 1
-            if a.get("is_correct"):
-                answer_map[key]["correct"] += 1
-
-        score_bucket: dict = {str(i): 0 for i in range(11)}
-        total_score_sum = 0
-        for stats in answer_map.values():
-            if stats["total"] == 0:
-                continue
-            raw_score = round((stats["correct"] / stats["total"]) * 10)
-            bucket = str(min(int(raw_score), 10))
-            score_bucket[bucket] = score_bucket.get(bucket, 0) + 1
-            total_score_sum += raw_score
+        score_bucket: dict = {str(i): count for i, count in enumerate(answers["buckets"])}
+        total_score_sum = answers["score_sum"]
 
         total_scored = sum(score_bucket.values())
         passes   = sum(score_bucket.get(str(i), 0) for i in range(6, 11))
@@ -1756,19 +2795,8 @@ async def build_quiz_analytics() -> dict:
         ]
 
         DAYS = ["Mon","Tue","Wed","Thu","Fri","Sat","Sun"]
-        daily_map: dict = {d: 0 for d in DAYS}
-        for a in answer_rows:
-            ts = a.get("answered_at")
-            if not ts:
-                continue
-            try:
-                dt  = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
-                day = dt.strftime("%a")
-                if day in daily_map:
-                    daily_map[day] += 1
-            except Exception:
-                continue
-        daily_attempts = [{"day": d, "value": daily_map[d]} for d in DAYS]
+        daily_map: dict = answers["days"]
+        daily_attempts = [{"day": d, "value": daily_map.get(d, 0)} for d in DAYS]
 
         category_map: dict = {}
         participant_counts_by_quiz: dict = defaultdict(int)
@@ -1818,20 +2846,45 @@ async def build_quiz_analytics() -> dict:
 _analytics_cache: Dict[str, Any] = {}
 _analytics_last_built: Optional[datetime] = None
 
+@timed_job("analytics")
 async def refresh_analytics_cache():
+    """
+    The three sections build concurrently (their table reads run in the
+    executor), so a rebuild takes about as long as the slowest table read.
+    build_times reports each section's wall time and its per-table reads.
+    """
     global _analytics_cache, _analytics_last_built
     print(f"🔄 [refresh_analytics_cache] started at {datetime.utcnow()}")
-    faucet_data = await build_faucet_analytics()
-    quest_data  = await build_quest_analytics()
-    quiz_data   = await build_quiz_analytics()
+    timings: Dict[str, Dict] = {}
+
+    async def _section(name: str, builder):
+        t0 = time.perf_counter()
+        with stage("analytics", name):
+            result = await builder(timings)
+        timings.setdefault(name, {})["total_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+        return result
+
+    t0 = time.perf_counter()
+    faucet_data, quest_data, quiz_data = await asyncio.gather(
+        _section("faucet", build_faucet_analytics),
+        _section("quest",  build_quest_analytics),
+        _section("quiz",   build_quiz_analytics),
+    )
+    build_times = {**timings, "total_ms": round((time.perf_counter() - t0) * 1000, 1)}
     _analytics_cache = {
         "faucet": faucet_data,
         "quest":  quest_data,
         "quiz":   quiz_data,
+        "build_times":  build_times,
         "last_updated": datetime.utcnow().isoformat(),
     }
     _analytics_last_built = datetime.utcnow()
-    print(f"✅ [refresh_analytics_cache] done")
+    reads = {table: ms for section in timings.values() for table, ms in section.get("reads", {}).items()}
+    slowest = max(reads, key=reads.get) if reads else None
+    print(f"✅ [refresh_analytics_cache] done in {build_times['total_ms']:.0f}ms "
+          f"(faucet {timings['faucet']['total_ms']:.0f}ms, quest {timings['quest']['total_ms']:.0f}ms, "
+          f"quiz {timings['quiz']['total_ms']:.0f}ms)"
+          + (f" | slowest read: {slowest} {reads[slowest]:.0f}ms" if slowest else ""))
 
 
 @app.get("/api/analytics")
@@ -1848,6 +2901,7 @@ async def get_analytics(background_tasks: BackgroundTasks):
         or _analytics_last_built is None
         or (datetime.utcnow() - _analytics_last_built).total_seconds() > CACHE_TTL_SECONDS
     )
+    cache_lookup("analytics", not cache_stale)
 
     if cache_stale and not _analytics_cache:
         await refresh_analytics_cache()
@@ -1857,21 +2911,163 @@ async def get_analytics(background_tasks: BackgroundTasks):
     return _analytics_cache
 
 
+# ── Time series over the bucket stores ──
+TIMESERIES_METRICS       = ("claims", "new_users", "quest_completions", "quiz_answers")
+TIMESERIES_MAX_BUCKETS   = 1000
+TIMESERIES_DEFAULT_SPAN  = {"day": 30, "week": 12 * 7, "month": 365}
+
+
+def _timeseries_sources(metric: str, chain: Optional[int]) -> List[BucketSeries]:
+    """The bucket series behind *metric*, restricted to *chain* when given."""
+    global _new_users_series
+    if metric == "claims":
+        return _current_claim_rollup().select(chain_id=chain)
+    if metric == "new_users":
+        if chain is not None:
+            raise HTTPException(status_code=400, detail="new_users is counted across chains; omit chain")
+        if _new_users_series is None:
+            first_seen = FirstSeenIndex.from_state(load_indexer_state(FIRST_SEEN_STATE_KEY))
+            _new_users_series = BucketSeries.from_state(first_seen.new_by_date)
+        return [_new_users_series]
+    if metric == "quest_completions":
+        rollup = _current_quest_rollup()
+        if rollup is None:
+            raise HTTPException(status_code=503, detail="Quest completion rollup not built yet")
+        by_chain = rollup.series
+    else:
+        by_chain = _current_quiz_rollup().daily
+    series = list(by_chain.items())
+    return [s for cid, s in series if chain is None or cid == str(chain)]
+
+
+@app.get("/api/analytics/timeseries")
+async def get_analytics_timeseries(
+    metric:      str           = Query(..., description="claims | new_users | quest_completions | quiz_answers"),
+    granularity: str           = Query("day", description="day | week (ISO, Monday) | month"),
+    chain:       Optional[int] = Query(None, description="chain id; all chains when omitted"),
+    start:       Optional[str] = Query(None, description="YYYY-MM-DD (UTC), inclusive"),
+    end:         Optional[str] = Query(None, description="YYYY-MM-DD (UTC), inclusive; defaults to today"),
+):
+    """
+    Counts per bucket for any window, answered from the pre-aggregated day /
+    week / month bucket stores (claim rollup, first-seen index, quiz answer
+    rollup, quest submissions) without reading raw rows. Buckets the window
+    only partly covers count just the covered days.
+    """
+    if metric not in TIMESERIES_METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of {', '.join(TIMESERIES_METRICS)}")
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail=f"granularity must be one of {', '.join(GRANULARITIES)}")
+    try:
+        end_day   = date.fromisoformat(end) if end else datetime.now(timezone.utc).date()
+        start_day = date.fromisoformat(start) if start else end_day - timedelta(days=TIMESERIES_DEFAULT_SPAN[granularity] - 1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start / end must be YYYY-MM-DD")
+    if start_day > end_day:
+        raise HTTPException(status_code=400, detail="start is after end")
+    n_buckets = {
+        "day":   (end_day - start_day).days + 1,
+        "week":  (bucket_span(bucket_of(end_day, "week"), "week")[0] - bucket_span(bucket_of(start_day, "week"), "week")[0]).days // 7 + 1,
+        "month": (end_day.year - start_day.year) * 12 + end_day.month - start_day.month + 1,
+    }[granularity]
+    if n_buckets > TIMESERIES_MAX_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"window spans {n_buckets} buckets (max {TIMESERIES_MAX_BUCKETS}); use a coarser granularity")
+
+    # Cold stores load from indexer_state; keep that off the event loop
+    loop = asyncio.get_event_loop()
+    points = await loop.run_in_executor(
+        None, lambda: sum_windows(_timeseries_sources(metric, chain), granularity, start_day, end_day)
+    )
+    return {
+        "metric":      metric,
+        "granularity": granularity,
+        "chain":       chain,
+        "start":       start_day.isoformat(),
+        "end":         end_day.isoformat(),
+        "points":      [{"bucket": bucket, "value": value} for bucket, value in points],
+        "total":       sum(value for _, value in points),
+    }
+
+
 # ====================== ROUTES ======================
 
 
 @app.get("/api/dashboard", response_model=DashboardResponse)
 async def get_dashboard():
+    # "hit" = served from the in-memory copy instead of the Supabase tables
     if supabase:
         try:
             data = load_from_supabase()
             if data:
+                cache_lookup("dashboard", False)
                 return data
         except Exception as e:
             print(f"⚠️  Supabase read failed, falling back to in-memory: {e}")
+    cache_lookup("dashboard", True)
     return dashboard_data
 
 
+def _epoch(naive_utc: Optional[datetime]) -> Optional[float]:
+    return naive_utc.replace(tzinfo=timezone.utc).timestamp() if naive_utc else None
+
+
+def _dashboard_built_at() -> Optional[float]:
+    try:
+        return _epoch(datetime.fromisoformat(dashboard_data["last_updated"]))
+    except Exception:
+        return None
+
+
+register_cache_age("dashboard",       _dashboard_built_at)
+register_cache_age("analytics",       lambda: _epoch(_analytics_last_built))
+register_cache_age("claims",          lambda: _epoch(claims_last_updated))
+register_cache_age("deleted_faucets", lambda: _deleted_faucets_cache["built_at"])
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus exposition: RPC, crawl stage, cache and Supabase query metrics."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/api/admin/runs")
+async def get_refresh_runs(sessionToken: str, job: Optional[str] = Query(None), limit: int = Query(20, ge=1, le=200)):
+    """
+    Recent refresh runs, newest first: duration, status, counts, per-chain
+    times (slowest first) and spans that regressed against the previous run.
+    """
+    if not is_valid_session(sessionToken):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return {"success": True, "runs": tracing.recent_runs(job, limit)}
+
+
+@app.get("/api/admin/runs/{run_id}")
+async def get_refresh_run(run_id: str, sessionToken: str):
+    """Full span tree (run → chain → factory → stage) of one refresh run."""
+    if not is_valid_session(sessionToken):
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    report = tracing.get_run(run_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Run not found (only the last runs are kept)")
+    return {"success": True, "run": report}
+
+
+@app.get("/api/users/unique")
+async def get_unique_users():
+    """
+    Unique-user totals per scope (chain id or quest_quiz). In hll mode also
+    per source and per UTC day / ISO week, all as HyperLogLog estimates.
+    """
+    if _unique_user_breakdown:
+        return _unique_user_breakdown
+    store_cls = SketchUserStore if UNIQUE_USERS_MODE == "hll" else UniqueUserStore
+    state = load_indexer_state(UNIQUE_USERS_STATE_KEY)
+    if not state:
+        raise HTTPException(status_code=503, detail="Unique-user store not built yet")
+    return store_cls.from_state(state).breakdown()
+
+
 @app.get("/api/network/{chain_id}/faucets")
 async def get_network_faucets(
     chain_id:     int,
@@ -1962,6 +3158,7 @@ async def force_sync_faucet(faucet_address: str):
         except Exception as e:
             return {"success": False, "error": f"RPC connection failed: {e}"}
 
+        invalidate_faucet_name(faucet_address)
         detail = fetch_faucet_details_sync(
             w3,
             faucet_address, 
@@ -1988,6 +3185,7 @@ async def force_sync_faucet(faucet_address: str):
         }, on_conflict="faucet_address").execute()
 
         supabase.table("faucet_details").upsert(detail, on_conflict="faucet_address").execute()
+        save_faucet_names()
 
         print(f"✅ [Force Sync] SUCCESS for {faucet_address} (chain {chain_id})")
         return {
@@ -2035,6 +3233,18 @@ async def get_all_faucets(
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
+@app.get("/api/tokens")
+async def get_tokens(chain_id: Optional[int] = Query(None)):
+    """Known ERC20 token metadata from the token registry."""
+    tokens = [
+        {"chainId": cid, "tokenAddress": addr, "symbol": meta["symbol"], "decimals": meta["decimals"]}
+        for (cid, addr), meta in _token_registry.items()
+        if chain_id is None or cid == chain_id
+    ]
+    tokens.sort(key=lambda t: (t["chainId"], t["symbol"]))
+    return {"success": True, "tokens": tokens, "count": len(tokens)}
+
+
 @app.get("/api/network/{chain_id}/faucets/refresh")
 async def refresh_network_endpoint(chain_id: int, background_tasks: BackgroundTasks):
     if chain_id not in CHAIN_CONFIGS:
@@ -2072,6 +3282,22 @@ async def refresh_analytics_endpoint():
     await refresh_analytics_cache()
     return {"status": "complete", "last_updated": _analytics_cache.get("last_updated")}
 
+@app.api_route("/api/refresh/quests", methods=["GET", "POST"])
+async def refresh_quest_list_endpoint():
+    """Drop the cached quest rows / list and rebuild. Point a Supabase webhook on quests here."""
+    _table_snapshots.invalidate("quests")
+    _list_cache.invalidate("quests")
+    data = await _list_cache.get("quests", _build_quest_list)
+    return {"status": "complete", "count": data["count"]}
+
+@app.api_route("/api/refresh/quizzes", methods=["GET", "POST"])
+async def refresh_quiz_list_endpoint():
+    """Drop the cached quiz rows / list and rebuild. Point a Supabase webhook on faucet_quizzes here."""
+    _table_snapshots.invalidate("faucet_quizzes")
+    _list_cache.invalidate("quizzes")
+    data = await _list_cache.get("quizzes", _build_quiz_list)
+    return {"status": "complete", "count": data["count"]}
+
 @app.get("/api/refresh/claims")
 async def refresh_claims_endpoint():
     """Refresh claims cache (faucet list page button)."""
@@ -2466,47 +3692,114 @@ async def create_blog_post(body: CreateBlogRequest):
         if not result.data:
             raise HTTPException(status_code=500, detail="Insert failed")
 
+        _blog_list_cache.invalidate()
         return {"success": True, "id": result.data[0]["id"], "slug": slug}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/blog/posts")
-async def get_blog_posts(page: int = 1, limit: int = 12, tag: str = None):
+# Listing pages per (page, limit, tag); dropped on create / delete / like
+BLOG_LIST_CACHE_TTL_SECONDS   = float(os.getenv("BLOG_LIST_CACHE_TTL_SECONDS", "30"))
+BLOG_LIST_CACHE_STALE_SECONDS = float(os.getenv("BLOG_LIST_CACHE_STALE_SECONDS", "300"))
+BLOG_LIST_COLUMNS = "id,slug,title,excerpt,cover_image_url,tags,author_name,author_avatar,author_handle,source_url,published_at"
+
+_blog_list_cache = ResponseCache("blog_list", BLOG_LIST_CACHE_TTL_SECONDS, BLOG_LIST_CACHE_STALE_SECONDS, max_entries=500)
+
+# Page views are counted in memory and added to each post's counter row in
+# batches; stored totals are reloaded after BLOG_COUNTS_TTL_SECONDS so views
+# counted by other instances show up
+BLOG_VIEW_FLUSH_SECONDS = int(os.getenv("BLOG_VIEW_FLUSH_SECONDS", "30"))
+BLOG_COUNTS_TTL_SECONDS = float(os.getenv("BLOG_COUNTS_TTL_SECONDS", "60"))
+_blog_counters = BlogCounters(ttl=BLOG_COUNTS_TTL_SECONDS)
+
+
+def _load_blog_counts(post_ids: List) -> Dict[str, Dict]:
+    return blog_post_counts(supabase, post_ids)
+
+
+# Post bodies by slug (posts are immutable once created); re-read after the
+# TTL so a post deleted through another instance stops being served
+BLOG_POST_CACHE_BYTES       = int(os.getenv("BLOG_POST_CACHE_BYTES", str(32 * 1024 * 1024)))
+BLOG_POST_CACHE_TTL_SECONDS = float(os.getenv("BLOG_POST_CACHE_TTL_SECONDS", "300"))
+_blog_post_cache = PostBodyCache(BLOG_POST_CACHE_BYTES, ttl=BLOG_POST_CACHE_TTL_SECONDS)
+
+
+def _load_blog_post(slug: str) -> Optional[Dict]:
+    result = supabase.table("blog_posts")\
+        .select("*")\
+        .eq("slug", slug)\
+        .eq("is_published", True)\
+        .maybe_single()\
+        .execute()
+    return result.data if result else None
+
+
+def _write_blog_views(post_id, views: int, flush_id: str) -> None:
+    increment_blog_post_views(supabase, post_id, views, flush_id)
+
+
+async def flush_blog_views():
+    """Scheduler job: add buffered page views to each post's counter."""
+    loop = asyncio.get_event_loop()
     try:
-        offset = (page - 1) * limit
+        written, failed = await loop.run_in_executor(None, _blog_counters.flush, _write_blog_views)
+        if written:
+            print(f"👁️  [blog views] flushed {written} views")
+        if failed:
+            post_id, err = next(iter(failed.items()))
+            print(f"⚠️  [blog views] {len(failed)} post(s) failed, retrying next run (post {post_id}: {err})")
+    except Exception as e:
+        print(f"⚠️  [blog views] flush failed, retrying next run: {e}")
+
 
+async def _build_blog_page(page: int, limit: int, tag: Optional[str]) -> dict:
+    loop   = asyncio.get_event_loop()
+    offset = (page - 1) * limit
+
+    def _page_rows():
         query = supabase.table("blog_posts")\
-            .select("id,slug,title,excerpt,cover_image_url,tags,author_name,author_avatar,author_handle,source_url,published_at")\
+            .select(BLOG_LIST_COLUMNS)\
             .eq("is_published", True)\
             .order("published_at", desc=True)\
             .range(offset, offset + limit - 1)
-
         if tag:
             query = query.contains("tags", [tag])
+        return query.execute().data or []
 
-        result = query.execute()
-        posts  = result.data or []
-
-        count_query = supabase.table("blog_posts").select("id", count="exact").eq("is_published", True)
+    def _total():
+        query = supabase.table("blog_posts").select("id", count="exact").eq("is_published", True)
         if tag:
-            count_query = count_query.contains("tags", [tag])
-        count_result = count_query.execute()
-        total = count_result.count or 0
+            query = query.contains("tags", [tag])
+        return query.execute().count or 0
 
+    async def _posts_with_counts():
+        posts  = await loop.run_in_executor(None, _page_rows)
+        counts = await loop.run_in_executor(None, blog_post_counts, supabase, [p["id"] for p in posts])
         for post in posts:
-            likes = supabase.table("blog_post_likes").select("id", count="exact").eq("post_id", post["id"]).execute()
-            views = supabase.table("blog_post_views").select("id", count="exact").eq("post_id", post["id"]).execute()
-            post["likes_count"] = likes.count or 0
-            post["views_count"] = views.count or 0
+            c = counts.get(str(post["id"]), {})
+            post["likes_count"] = c.get("likes", 0)
+            post["views_count"] = c.get("views", 0)
+        return posts
 
-        return {
-            "success": True,
-            "posts": posts,
-            "total": total,
-            "page": page,
-            "totalPages": max(1, -(-total // limit)),
-        }
+    posts, total = await asyncio.gather(_posts_with_counts(), loop.run_in_executor(None, _total))
+    return {
+        "success": True,
+        "posts": posts,
+        "total": total,
+        "page": page,
+        "totalPages": max(1, -(-total // limit)),
+    }
+
+
+@app.get("/api/blog/posts")
+async def get_blog_posts(page: int = 1, limit: int = 12, tag: str = None):
+    try:
+        listing = await _blog_list_cache.get((page, limit, tag or ""), functools.partial(_build_blog_page, page, limit, tag))
+        # Cached pages are shared; add buffered views to copies of the posts
+        return {**listing, "posts": [
+            {**post, "views_count": _blog_counters.views(post["id"], post["views_count"])}
+            for post in listing["posts"]
+        ]}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -2514,10 +3807,16 @@ async def get_blog_posts(page: int = 1, limit: int = 12, tag: str = None):
 global_claims_cache: List[Dict] = []
 claims_last_updated: Optional[datetime] = None
 
+# Raw claim txs per factory, grown from factory_tx_delta("claims", ...)
+_claims_raw: Dict[str, List] = {}
+
+@timed_job("claims")
 async def refresh_claims_cache():
     """
     Fetches all claims across all networks and enriches them with 
     Supabase metadata. FIX: Filters out deleted faucets.
+    Factory transactions come from the shared snapshot store; only the
+    claims appended since the previous run are added to _claims_raw.
     """
     global global_claims_cache, claims_last_updated
     print(f"🔄 [refresh_claims_cache] Fetching all claims from RPCs...")
@@ -2553,52 +3852,65 @@ async def refresh_claims_cache():
 
         for chain_id, cfg in CHAIN_CONFIGS.items():
             chain_name = cfg["name"]
-            try:
-                w3 = get_web3(cfg["rpcUrls"])
-            except Exception:
-                continue
-
-            for factory_addr in cfg.get("factoryAddresses", []):
-                if is_placeholder_address(factory_addr):
-                    continue
-                    
-                addr_checksum = safe_checksum(w3, factory_addr)
-                if not addr_checksum:
+            with tracing.span(chain_name, "chain", chain_id=chain_id):
+                try:
+                    w3 = get_web3(cfg["rpcUrls"])
+                except Exception as e:
+                    tracing.error(f"all RPCs failed: {e}")
                     continue
 
-                contract_type, factory_txs, _ = detect_and_call(w3, addr_checksum)
-
-                if contract_type in ("factory", "quest") and factory_txs:
-                    for tx in factory_txs:
-                        tx_type = str(tx[1]).lower()
-                        if "claim" in tx_type:
-                            faucet_addr = str(tx[0])
-                            addr_lower = faucet_addr.lower()
-
-                            # FIX: Skip claims from deleted faucets
-                            if addr_lower in deleted_set:
-                                continue
+                for factory_addr in cfg.get("factoryAddresses", []):
+                    if is_placeholder_address(factory_addr):
+                        continue
+                    
+                    addr_checksum = safe_checksum(w3, factory_addr)
+                    if not addr_checksum:
+                        continue
 
-                            meta = faucet_meta_map.get(addr_lower, {})
-                            
-                            fetched.append({
-                                "faucet": faucet_addr,
-                                "faucet_name": meta.get("name", f"Faucet {faucet_addr[:6]}"),
-                                "slug": meta.get("slug"),
-                                "claimer": str(tx[2]),
-                                "amount": str(tx[3]),
-                                "token_symbol": meta.get("symbol", "TOKEN"),
-                                "token_decimals": meta.get("decimals", 18),
-                                "is_ether": bool(tx[4]),
-                                "time": int(tx[5]),
-                                "network": chain_name,
-                                "chain_id": chain_id,
-                                "transaction_type": tx_type
-                            })
+                    with tracing.span(addr_checksum, "factory"):
+                        with stage("claims", "factory_snapshot"):
+                            key = f"{chain_id}:{addr_checksum.lower()}"
+                            contract_type, factory_txs, _ = fetch_factory_snapshot(
+                                w3, addr_checksum, chain_id, _factory_cursors["claims"].get(key, 0))
+
+                        if contract_type in ("factory", "quest") and factory_txs:
+                            delta, reset = factory_tx_delta("claims", key, factory_txs)
+                            raw = _claims_raw.setdefault(key, [])
+                            if reset:
+                                raw.clear()
+                            raw.extend(tx for tx in delta if "claim" in str(tx[1]).lower())
+                            release_factory_snapshot(key)
+                            tracing.count("claims", len(raw))
+
+                            for tx in raw:
+                                tx_type = str(tx[1]).lower()
+                                faucet_addr = str(tx[0])
+                                addr_lower = faucet_addr.lower()
+
+                                # FIX: Skip claims from deleted faucets
+                                if addr_lower in deleted_set:
+                                    continue
+
+                                meta = faucet_meta_map.get(addr_lower, {})
+                        
+                                fetched.append({
+                                    "faucet": faucet_addr,
+                                    "faucet_name": meta.get("name", f"Faucet {faucet_addr[:6]}"),
+                                    "slug": meta.get("slug"),
+                                    "claimer": str(tx[2]),
+                                    "amount": str(tx[3]),
+                                    "token_symbol": meta.get("symbol", "TOKEN"),
+                                    "token_decimals": meta.get("decimals", 18),
+                                    "is_ether": bool(tx[4]),
+                                    "time": int(tx[5]),
+                                    "network": chain_name,
+                                    "chain_id": chain_id,
+                                    "transaction_type": tx_type
+                                })
         return fetched
 
     try:
-        new_claims = await loop.run_in_executor(None, _fetch_claims_sync)
+        new_claims = await loop.run_in_executor(None, tracing.bind(_fetch_claims_sync))
         new_claims.sort(key=lambda x: x["time"], reverse=True)
         global_claims_cache = new_claims
         claims_last_updated = datetime.utcnow()
@@ -2620,6 +3932,7 @@ async def get_all_claims(
         or claims_last_updated is None
         or (datetime.utcnow() - claims_last_updated).total_seconds() > CACHE_TTL_SECONDS
     )
+    cache_lookup("claims", not cache_stale)
 
     if cache_stale:
         if not global_claims_cache:
@@ -2637,32 +3950,29 @@ async def get_all_claims(
     }
 
 @app.get("/api/blog/posts/{slug}")
-async def get_blog_post(slug: str):
+async def get_blog_post(slug: str, request: Request):
     try:
-        result = supabase.table("blog_posts")\
-            .select("*")\
-            .eq("slug", slug)\
-            .eq("is_published", True)\
-            .single()\
-            .execute()
-
-        if not result.data:
+        # Hits are served on the loop; misses and expired entries load in a thread
+        loop = asyncio.get_event_loop()
+        cached = _blog_post_cache.peek(slug) or \
+            await loop.run_in_executor(None, _blog_post_cache.get, slug, _load_blog_post)
+        if cached is None:
             raise HTTPException(status_code=404, detail="Post not found")
 
-        post = result.data
-        post_id = post["id"]
-
-        try:
-            supabase.table("blog_post_views").insert({"post_id": post_id}).execute()
-        except Exception:
-            pass
-
-        likes = supabase.table("blog_post_likes").select("id", count="exact").eq("post_id", post_id).execute()
-        views = supabase.table("blog_post_views").select("id", count="exact").eq("post_id", post_id).execute()
-        post["likes_count"] = likes.count or 0
-        post["views_count"] = views.count or 0
-
-        return {"success": True, "post": post}
+        _blog_counters.view(cached.post_id)
+        counts = _blog_counters.peek(cached.post_id) or \
+            await loop.run_in_executor(None, _blog_counters.get, cached.post_id, _load_blog_counts)
+        etag = cached.etag_for(counts["likes"])
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+
+        if "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            body = cached.gzip_body(counts["likes"], counts["views"])
+        else:
+            body = cached.body(counts["likes"], counts["views"])
+        return Response(content=body, media_type="application/json", headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -2678,6 +3988,9 @@ async def delete_blog_post(slug: str, body: DeleteBlogRequest):
         if not result.data:
             raise HTTPException(status_code=404, detail="Post not found")
         supabase.table("blog_posts").delete().eq("id", result.data["id"]).execute()
+        _blog_counters.forget(result.data["id"])
+        _blog_post_cache.invalidate(slug)
+        _blog_list_cache.invalidate()
         return {"success": True}
     except HTTPException:
         raise
@@ -2708,7 +4021,9 @@ async def like_blog_post(slug: str, fingerprint: str):
             }).execute()
             liked = True
 
+        _blog_list_cache.invalidate()
         fresh = supabase.table("blog_post_likes").select("id", count="exact").eq("post_id", post_id).execute()
+        _blog_counters.set_likes(post_id, fresh.count or 0)
         return {"success": True, "liked": liked, "likes_count": fresh.count or 0}
 
     except HTTPException:
@@ -2723,6 +4038,7 @@ scheduler.add_job(refresh_all_data,        "interval", hours=3)
 scheduler.add_job(refresh_analytics_cache, "interval", hours=3)
 scheduler.add_job(refresh_claims_cache,    "interval", minutes=15)
 scheduler.add_job(refresh_network_faucets, "interval", hours=3)
+scheduler.add_job(flush_blog_views,        "interval", seconds=BLOG_VIEW_FLUSH_SECONDS)
 scheduler.start()
 
 
@@ -2733,6 +4049,10 @@ async def startup():
     global dashboard_data
     print("🚀 [Startup] API is coming online...")
 
+    loop = asyncio.get_running_loop()
+    token_count = await loop.run_in_executor(None, load_token_registry)
+    print(f"🪙  [Startup] Token registry: {token_count} tokens")
+
     if supabase:
         try:
             cached = load_from_supabase()
@@ -2746,6 +4066,11 @@ async def startup():
     #asyncio.create_task(refresh_analytics_cache())
     #asyncio.create_task(refresh_claims_cache())
 
+
+@app.on_event("shutdown")
+async def shutdown():
+    await flush_blog_views()
+
 # ====================== RENDER.COM COMPATIBLE RUN ======================
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,321 @@
+import json
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from postgrest.exceptions import APIError
+
+# Column defaults Postgres would fill in on insert
+_TABLE_DEFAULTS: Dict[str, Dict[str, Callable[[], Any]]] = {
+    "*":          {"created_at": lambda: datetime.now(timezone.utc).isoformat()},
+    "blog_posts": {"published_at": lambda: datetime.now(timezone.utc).isoformat()},
+}
+
+
+class MemoryResponse:
+    """Shape of postgrest's APIResponse that the app reads: .data and .count."""
+
+    __slots__ = ("data", "count")
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data  = data
+        self.count = count
+
+
+class _Table:
+    def __init__(self, name: str):
+        self.name = name
+        self.rows: List[Dict] = []
+        self.next_id = 1
+
+    def with_defaults(self, row: Dict) -> Dict:
+        row = dict(row)
+        if "id" not in row:
+            row["id"] = self.next_id
+        if isinstance(row["id"], int):
+            self.next_id = max(self.next_id, row["id"] + 1)
+        for table in ("*", self.name):
+            for col, default in _TABLE_DEFAULTS.get(table, {}).items():
+                row.setdefault(col, default())
+        return row
+
+
+def _sort_key(value):
+    # NULLs sort last ascending / first descending, as in Postgres
+    return (value is None, value if value is not None else 0)
+
+
+def _columns(spec: str) -> Optional[List[str]]:
+    cols = [c.strip() for c in (spec or "*").split(",") if c.strip()]
+    return None if not cols or "*" in cols else cols
+
+
+class MemoryQuery:
+    """
+    Chainable stand-in for postgrest's request builder covering the calls the
+    app makes: select / insert / upsert / update / delete, the eq-style
+    filters, order / range / limit, single / maybe_single and execute.
+    """
+
+    def __init__(self, client: "MemoryClient", table: str):
+        self._client  = client
+        self._table   = table
+        self._op      = "select"
+        self._columns: Optional[List[str]] = None
+        self._count: Optional[str] = None
+        self._payload: Any = None
+        self._on_conflict: Optional[List[str]] = None
+        self._ignore_duplicates = False
+        self._filters: List[Callable[[Dict], bool]] = []
+        self._order: List[tuple] = []
+        self._range: Optional[tuple] = None
+        self._single: Optional[str] = None
+
+    # ── operations ──
+
+    def select(self, columns: str = "*", count: Optional[str] = None, **_):
+        self._op, self._columns, self._count = "select", _columns(columns), count
+        return self
+
+    def insert(self, rows, **_):
+        self._op, self._payload = "insert", rows
+        return self
+
+    def upsert(self, rows, on_conflict: str = "", ignore_duplicates: bool = False, **_):
+        self._op, self._payload = "upsert", rows
+        self._on_conflict = [c.strip() for c in on_conflict.split(",") if c.strip()] or ["id"]
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: Dict, **_):
+        self._op, self._payload = "update", values
+        return self
+
+    def delete(self, **_):
+        self._op = "delete"
+        return self
+
+    # ── filters ──
+
+    def _where(self, pred: Callable[[Dict], bool]):
+        self._filters.append(pred)
+        return self
+
+    def eq(self, col, value):
+        return self._where(lambda r: r.get(col) == value)
+
+    def neq(self, col, value):
+        return self._where(lambda r: r.get(col) != value)
+
+    def gt(self, col, value):
+        return self._where(lambda r: r.get(col) is not None and r[col] > value)
+
+    def gte(self, col, value):
+        return self._where(lambda r: r.get(col) is not None and r[col] >= value)
+
+    def lt(self, col, value):
+        return self._where(lambda r: r.get(col) is not None and r[col] < value)
+
+    def lte(self, col, value):
+        return self._where(lambda r: r.get(col) is not None and r[col] <= value)
+
+    def in_(self, col, values: Iterable):
+        wanted = set(values)
+        return self._where(lambda r: r.get(col) in wanted)
+
+    def is_(self, col, value):
+        value = None if value in (None, "null") else value
+        return self._where(lambda r: r.get(col) is value or r.get(col) == value)
+
+    def contains(self, col, values):
+        if isinstance(values, dict):
+            return self._where(lambda r: all((r.get(col) or {}).get(k) == v for k, v in values.items()))
+        wanted = list(values)
+        return self._where(lambda r: all(v in (r.get(col) or []) for v in wanted))
+
+    def ilike(self, col, pattern: str):
+        needle = pattern.replace("%", "").lower()
+        return self._where(lambda r: needle in str(r.get(col) or "").lower())
+
+    # ── modifiers ──
+
+    def order(self, col, desc: bool = False, **_):
+        self._order.append((col, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end + 1)
+        return self
+
+    def limit(self, n: int, **_):
+        start = self._range[0] if self._range else 0
+        self._range = (start, start + n)
+        return self
+
+    def single(self):
+        self._single = "single"
+        return self
+
+    def maybe_single(self):
+        self._single = "maybe"
+        return self
+
+    # ── execution ──
+
+    def _project(self, row: Dict) -> Dict:
+        if self._columns is None:
+            return dict(row)
+        return {c: row.get(c) for c in self._columns}
+
+    def execute(self) -> MemoryResponse:
+        with self._client._lock:
+            table = self._client._table(self._table)
+            return getattr(self, f"_exec_{self._op}")(table)
+
+    def _exec_select(self, table: _Table) -> MemoryResponse:
+        rows = [r for r in table.rows if all(f(r) for f in self._filters)]
+        total = len(rows)
+        for col, desc in reversed(self._order):
+            rows.sort(key=lambda r: _sort_key(r.get(col)), reverse=desc)
+        if self._range:
+            rows = rows[self._range[0] : self._range[1]]
+        data = [self._project(r) for r in rows]
+        count = total if self._count else None
+        if self._single:
+            if len(data) == 1:
+                return MemoryResponse(data[0], count)
+            if self._single == "maybe" and not data:
+                return MemoryResponse(None, count)
+            raise APIError({
+                "message": "JSON object requested, multiple (or no) rows returned",
+                "code":    "PGRST116",
+                "details": f"The result contains {len(data)} rows",
+            })
+        return MemoryResponse(data, count)
+
+    def _exec_insert(self, table: _Table) -> MemoryResponse:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        added = [table.with_defaults(r) for r in rows]
+        table.rows.extend(added)
+        return MemoryResponse([dict(r) for r in added])
+
+    def _exec_upsert(self, table: _Table) -> MemoryResponse:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+        keys = self._on_conflict
+        index = {tuple(r.get(k) for k in keys): r for r in table.rows}
+        out: List[Dict] = []
+        for row in rows:
+            existing = index.get(tuple(row.get(k) for k in keys))
+            if existing is not None:
+                if not self._ignore_duplicates:
+                    existing.update(row)
+                    out.append(dict(existing))
+                continue
+            new = table.with_defaults(row)
+            table.rows.append(new)
+            index[tuple(new.get(k) for k in keys)] = new
+            out.append(dict(new))
+        return MemoryResponse(out)
+
+    def _exec_update(self, table: _Table) -> MemoryResponse:
+        out: List[Dict] = []
+        for row in table.rows:
+            if all(f(row) for f in self._filters):
+                row.update(self._payload)
+                out.append(dict(row))
+        return MemoryResponse(out)
+
+    def _exec_delete(self, table: _Table) -> MemoryResponse:
+        keep, gone = [], []
+        for row in table.rows:
+            (gone if all(f(row) for f in self._filters) else keep).append(row)
+        table.rows = keep
+        return MemoryResponse([dict(r) for r in gone])
+
+
+class _RpcCall:
+    def __init__(self, client: "MemoryClient", fn: str, params: Dict):
+        self._client, self._fn, self._params = client, fn, params or {}
+
+    def execute(self) -> MemoryResponse:
+        handler = self._client._rpcs.get(self._fn)
+        if handler is None:
+            raise APIError({"message": f"Could not find the function public.{self._fn}", "code": "PGRST202"})
+        with self._client._lock:
+            return MemoryResponse(handler(self._client, **self._params))
+
+
+class _MemoryBucket:
+    def __init__(self, objects: Dict[str, bytes]):
+        self._objects = objects
+
+    def upload(self, path: str, file: bytes, file_options: Optional[Dict] = None):
+        upsert = str((file_options or {}).get("upsert", "false")).lower() == "true"
+        if path in self._objects and not upsert:
+            raise APIError({"message": "The resource already exists", "code": "409"})
+        self._objects[path] = bytes(file)
+        return {"path": path}
+
+    def download(self, path: str) -> bytes:
+        return self._objects[path]
+
+    def remove(self, paths: List[str]):
+        return [{"name": p} for p in paths if self._objects.pop(p, None) is not None]
+
+
+class _MemoryStorage:
+    def __init__(self):
+        self._buckets: Dict[str, Dict[str, bytes]] = {}
+
+    def from_(self, bucket: str) -> _MemoryBucket:
+        return _MemoryBucket(self._buckets.setdefault(bucket, {}))
+
+
+class MemoryClient:
+    """
+    In-process stand-in for the supabase Client (STORAGE_BACKEND=memory).
+    Tables are plain lists of dicts created on first use; rpc() dispatches
+    to Python functions registered with register_rpc().
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict]]] = None):
+        self._lock = threading.RLock()
+        self._tables: Dict[str, _Table] = {}
+        self._rpcs: Dict[str, Callable] = {}
+        self.storage = _MemoryStorage()
+        if tables:
+            self.seed(tables)
+
+    def _table(self, name: str) -> _Table:
+        if name not in self._tables:
+            self._tables[name] = _Table(name)
+        return self._tables[name]
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, fn: str, params: Optional[Dict] = None) -> _RpcCall:
+        return _RpcCall(self, fn, params)
+
+    def register_rpc(self, fn: str, handler: Callable) -> None:
+        """*handler(client, **params)* returns the function's result rows."""
+        self._rpcs[fn] = handler
+
+    def rows(self, name: str) -> List[Dict]:
+        """Live rows of *name*, for rpc handlers and seeding helpers."""
+        return self._table(name).rows
+
+    def seed(self, tables: Dict[str, List[Dict]]) -> None:
+        with self._lock:
+            for name, rows in tables.items():
+                table = self._table(name)
+                table.rows.extend(table.with_defaults(r) for r in rows)
+
+    @classmethod
+    def from_seed_file(cls, path: Optional[str]) -> "MemoryClient":
+        if not path:
+            return cls()
+        with open(path) as f:
+            return cls(json.load(f))
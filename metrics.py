@@ -0,0 +1,178 @@
+import functools
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+import tracing
+
+# Buckets sized for JSON-RPC / PostgREST round trips and for whole crawl stages
+_CALL_BUCKETS  = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+_STAGE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+RPC_CALLS = Counter(
+    "faucetdrops_rpc_calls_total", "JSON-RPC requests", ["chain", "endpoint", "method", "outcome"],
+)
+RPC_LATENCY = Histogram(
+    "faucetdrops_rpc_latency_seconds", "JSON-RPC request latency", ["chain", "endpoint", "method"],
+    buckets=_CALL_BUCKETS,
+)
+STAGE_DURATION = Histogram(
+    "faucetdrops_stage_duration_seconds", "Crawl / refresh stage duration", ["job", "stage"],
+    buckets=_STAGE_BUCKETS,
+)
+CACHE_LOOKUPS = Counter(
+    "faucetdrops_cache_lookups_total", "Cache lookups by result", ["cache", "result"],
+)
+CACHE_AGE = Gauge(
+    "faucetdrops_cache_age_seconds", "Seconds since the cache was last rebuilt", ["cache"],
+)
+DB_LATENCY = Histogram(
+    "faucetdrops_db_query_latency_seconds", "Supabase query latency", ["table", "op", "outcome"],
+    buckets=_CALL_BUCKETS,
+)
+
+
+# ── Hooks ────────────────────────────────────────────────────────────────────
+
+def endpoint_label(url: str) -> str:
+    # Host only: RPC paths often embed API keys
+    return urlparse(url).hostname or "unknown"
+
+
+@contextmanager
+def stage(job: str, name: str):
+    t0 = time.perf_counter()
+    try:
+        with tracing.span(name, "stage"):
+            yield
+    finally:
+        STAGE_DURATION.labels(job, name).observe(time.perf_counter() - t0)
+
+
+def timed_job(job: str):
+    """
+    Decorator for the async refresh jobs: records their whole run as stage
+    "total" and traces it (see tracing.py).
+    """
+    def wrap(fn):
+        @functools.wraps(fn)
+        async def run(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                with tracing.run(job):
+                    return await fn(*args, **kwargs)
+            finally:
+                STAGE_DURATION.labels(job, "total").observe(time.perf_counter() - t0)
+        return run
+    return wrap
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def register_cache_age(cache: str, last_built: Callable[[], Optional[float]]) -> None:
+    """*last_built* returns the epoch seconds of the last rebuild (or None); read at scrape time."""
+    def age() -> float:
+        ts = last_built()
+        return time.time() - ts if ts else float("nan")
+    CACHE_AGE.labels(cache).set_function(age)
+
+
+def render() -> tuple:
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# ── RPC: provider wrapper ────────────────────────────────────────────────────
+
+def instrument_provider(provider: Any, chain: str) -> Any:
+    """
+    Time every request the provider sends. Patches the instance so web3's
+    request pipeline (which binds provider.make_request) picks it up.
+    """
+    endpoint = endpoint_label(getattr(provider, "endpoint_uri", "") or "")
+    inner = provider.make_request
+    inner_batch = getattr(provider, "make_batch_request", None)
+
+    def make_request(method, params):
+        t0 = time.perf_counter()
+        outcome = "error"
+        try:
+            response = inner(method, params)
+            outcome = "error" if isinstance(response, dict) and "error" in response else "ok"
+            return response
+        finally:
+            RPC_LATENCY.labels(chain, endpoint, method).observe(time.perf_counter() - t0)
+            RPC_CALLS.labels(chain, endpoint, method, outcome).inc()
+
+    def make_batch_request(requests):
+        t0 = time.perf_counter()
+        outcome = "error"
+        try:
+            responses = inner_batch(requests)
+            outcome = "ok"
+            return responses
+        finally:
+            RPC_LATENCY.labels(chain, endpoint, "batch").observe(time.perf_counter() - t0)
+            RPC_CALLS.labels(chain, endpoint, "batch", outcome).inc(len(requests) or 1)
+
+    provider.make_request = make_request
+    if inner_batch is not None:
+        provider.make_batch_request = make_batch_request
+    return provider
+
+
+# ── Supabase: client wrapper ─────────────────────────────────────────────────
+
+class _TimedQuery:
+    """Proxies a postgrest request builder; times execute() against its table."""
+
+    __slots__ = ("_inner", "_table", "_op")
+
+    def __init__(self, inner: Any, table: str, op: str = "select"):
+        self._inner = inner
+        self._table = table
+        self._op    = op
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._inner, name)
+        if not callable(attr):
+            return attr
+        op = name if name in ("select", "insert", "upsert", "update", "delete") else self._op
+
+        def call(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _TimedQuery(result, self._table, op) if hasattr(result, "execute") else result
+        return call
+
+    def execute(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        outcome = "error"
+        try:
+            result = self._inner.execute(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            DB_LATENCY.labels(self._table, self._op, outcome).observe(time.perf_counter() - t0)
+
+
+class InstrumentedClient:
+    """Wraps the supabase (or memory) client; everything but table()/rpc() passes through."""
+
+    def __init__(self, inner: Any):
+        self.wrapped = inner
+
+    def table(self, name: str) -> _TimedQuery:
+        return _TimedQuery(self.wrapped.table(name), name)
+
+    def from_(self, name: str) -> _TimedQuery:
+        return self.table(name)
+
+    def rpc(self, fn: str, params: Optional[Dict] = None, **kwargs) -> _TimedQuery:
+        return _TimedQuery(self.wrapped.rpc(fn, params, **kwargs), f"rpc:{fn}", "rpc")
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+# gzip member header: magic, deflate, no flags, no mtime, no extra flags, unknown OS
+_GZIP_HEADER = b"\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff"
+
+
+class CachedPost:
+    """
+    One post's response body, split into a static prefix (everything up to
+    the counts) and a tiny per-request suffix with likes / views.
+
+    The prefix is also kept as raw deflate data ending in a full flush, so
+    nothing after it refers back into it: a gzip response is the stored
+    prefix plus the freshly compressed suffix, and the CRC is extended from
+    the prefix's instead of recomputed. Compressing a page view costs the
+    suffix, not the post.
+    """
+
+    __slots__ = ("post_id", "etag", "prefix", "gz_prefix", "crc", "nbytes", "loaded_at")
+
+    def __init__(self, post: Dict):
+        self.post_id   = post["id"]
+        self.loaded_at = time.monotonic()
+        body = json.dumps({"success": True, "post": post}, ensure_ascii=False, separators=(",", ":"), default=str)
+        # '...,"last":v}}' -> '...,"last":v,' so the counts land at the end of "post"
+        self.prefix = (body[:-2] + ",").encode()
+        self.etag   = hashlib.blake2b(self.prefix, digest_size=12).hexdigest()
+
+        deflate = zlib.compressobj(6, zlib.DEFLATED, -15)
+        self.gz_prefix = deflate.compress(self.prefix) + deflate.flush(zlib.Z_FULL_FLUSH)
+        self.crc       = zlib.crc32(self.prefix)
+        self.nbytes    = len(self.prefix) + len(self.gz_prefix)
+
+    def etag_for(self, likes: int) -> str:
+        # Weak: views move on every read and are not part of the validator
+        return f'W/"{self.etag}-{likes}"'
+
+    def _suffix(self, likes: int, views: int) -> bytes:
+        return f'"likes_count":{likes},"views_count":{views}}}}}'.encode()
+
+    def body(self, likes: int, views: int) -> bytes:
+        return self.prefix + self._suffix(likes, views)
+
+    def gzip_body(self, likes: int, views: int) -> bytes:
+        suffix = self._suffix(likes, views)
+        tail = zlib.compressobj(6, zlib.DEFLATED, -9, 1)
+        return b"".join((
+            _GZIP_HEADER,
+            self.gz_prefix,
+            tail.compress(suffix) + tail.flush(),
+            struct.pack("<II", zlib.crc32(suffix, self.crc), (len(self.prefix) + len(suffix)) & 0xFFFFFFFF),
+        ))
+
+
+class PostBodyCache:
+    """
+    LRU of CachedPost by slug, bounded by the bytes the entries hold. Posts
+    do not change after creation, but may be deleted through another
+    instance: entries are re-read after *ttl* seconds, and dropped if the
+    post is gone. invalidate() removes one at once. Missing posts are not
+    cached.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float = 300.0):
+        self.max_bytes = max_bytes
+        self.ttl       = ttl
+        self.nbytes    = 0
+        self._entries: "OrderedDict[str, CachedPost]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, slug: str) -> Optional[CachedPost]:
+        """The entry for *slug* if cached and younger than ttl; never loads."""
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is None or time.monotonic() - entry.loaded_at > self.ttl:
+                return None
+            self._entries.move_to_end(slug)
+            return entry
+
+    def get(self, slug: str, load: Callable[[str], Optional[Dict]]) -> Optional[CachedPost]:
+        entry = self.peek(slug)
+        if entry is not None:
+            return entry
+        post = load(slug)
+        if not post:
+            self.invalidate(slug)
+            return None
+        entry = CachedPost(post)
+        if entry.nbytes > self.max_bytes:
+            return entry
+        with self._lock:
+            old = self._entries.pop(slug, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._entries[slug] = entry
+            self.nbytes += entry.nbytes
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return entry
+
+    def invalidate(self, slug: Optional[str] = None) -> None:
+        with self._lock:
+            if slug is None:
+                self._entries.clear()
+                self.nbytes = 0
+            else:
+                old = self._entries.pop(slug, None)
+                if old is not None:
+                    self.nbytes -= old.nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ── Check: python -m post_cache ──────────────────────────────────────────────
+
+def _verify() -> None:
+    import gzip
+    import random
+    import time
+
+    rng = random.Random(9)
+    words = ["faucet", "drop", "quest", "claim", "chain", "token", "ünïcode", "\"quoted\"", "<b>"]
+    posts = {
+        f"post-{i}": {"id": i, "slug": f"post-{i}", "title": f"Post {i}",
+                      "content": " ".join(rng.choice(words) for _ in range(rng.randrange(50, 6000))),
+                      "tags": ["a", "b"], "cover_image_url": None}
+        for i in range(200)
+    }
+    loads = []
+
+    def load(slug):
+        loads.append(slug)
+        return dict(posts[slug]) if slug in posts else None
+
+    cache = PostBodyCache(max_bytes=400_000)
+    for _ in range(2_000):
+        slug = f"post-{int(rng.paretovariate(1.2)) % 220}"
+        entry = cache.get(slug, load)
+        if entry is None:
+            assert slug not in posts
+            continue
+        likes, views = rng.randrange(1000), rng.randrange(10**7)
+        want = {"success": True, "post": {**posts[slug], "likes_count": likes, "views_count": views}}
+        assert json.loads(entry.body(likes, views)) == want
+        assert json.loads(gzip.decompress(entry.gzip_body(likes, views))) == want
+        assert cache.nbytes <= cache.max_bytes
+    assert cache.nbytes == sum(e.nbytes for e in cache._entries.values())
+
+    # A post deleted elsewhere is served until its entry expires, then dropped
+    gone = next(iter(cache._entries))
+    del posts[gone]
+    assert cache.get(gone, load) is not None
+    cache.ttl = 0
+    assert cache.peek(gone) is None and cache.get(gone, load) is None and gone not in cache._entries
+    assert cache.nbytes == sum(e.nbytes for e in cache._entries.values())
+    cache.ttl = 300.0
+
+    big = CachedPost(posts[max(posts, key=lambda s: len(posts[s]["content"]))])
+    t0 = time.perf_counter()
+    for _ in range(200):
+        big.gzip_body(5, 123)
+    cached_ms = (time.perf_counter() - t0) / 200 * 1000
+    t0 = time.perf_counter()
+    for _ in range(200):
+        gzip.compress(big.body(5, 123), 6)
+    full_ms = (time.perf_counter() - t0) / 200 * 1000
+    print(f"2,000 reads: {len(loads)} loads, {len(cache)} cached posts in {cache.nbytes:,} bytes; bodies round-trip")
+    print(f"  gzip of a {len(big.prefix):,}-byte post: {cached_ms:.3f} ms from the cached prefix vs {full_ms:.3f} ms in full")
+
+
+if __name__ == "__main__":
+    _verify()
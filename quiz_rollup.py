@@ -0,0 +1,210 @@
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from timeseries import BucketSeries
+
+DAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+SCORE_BUCKETS = 11  # 0..10
+
+
+def _score(correct: int, total: int) -> int:
+    return min(int(round((correct / total) * 10)), 10)
+
+
+def _fingerprint(row: Dict) -> str:
+    return f"{row.get('quiz_id')}|{row.get('wallet_address')}|{bool(row.get('is_correct'))}|{row.get('points_earned')}"
+
+
+def _parse(ts: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except Exception:
+        return None
+
+
+def _weekday(ts: str) -> Optional[str]:
+    dt = _parse(ts)
+    return dt.strftime("%a") if dt else None
+
+
+class QuizAnswerRollup:
+    """
+    Running aggregate of faucet_quiz_answers: correct/total per (quiz, wallet),
+    the 0-10 score histogram over those pairs, answers per weekday and
+    answers per UTC day for each chain (the quiz_answers time series).
+
+    New answers are read with answered_at >= watermark; the rows already
+    folded at exactly the watermark are remembered by fingerprint (with
+    multiplicity) so the inclusive boundary is not counted twice. When a
+    pair's counts change its old score leaves its bucket and the new one
+    enters, so the histogram never needs a pass over all pairs.
+    """
+
+    def __init__(self):
+        self.pairs: Dict[str, List[int]] = {}
+        self.buckets: List[int] = [0] * SCORE_BUCKETS
+        self.score_sum = 0
+        self.days: Dict[str, int] = {d: 0 for d in DAYS}
+        self.daily: Dict[str, BucketSeries] = {}
+        self.watermark = ""
+        self.boundary: Dict[str, int] = {}
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    def _add(self, row: Dict, chain: str) -> None:
+        key = f"{row.get('quiz_id')}|{row.get('wallet_address')}"
+        stats = self.pairs.get(key)
+        if stats is None:
+            stats = self.pairs[key] = [0, 0]
+        elif stats[1]:
+            old = _score(*stats)
+            self.buckets[old] -= 1
+            self.score_sum -= old
+        stats[1] += 1
+        if row.get("is_correct"):
+            stats[0] += 1
+        new = _score(*stats)
+        self.buckets[new] += 1
+        self.score_sum += new
+
+        ts = row.get("answered_at")
+        dt = _parse(str(ts)) if ts else None
+        if dt is None:
+            return
+        day = dt.strftime("%a")
+        if day in self.days:
+            self.days[day] += 1
+        utc = dt.astimezone(timezone.utc) if dt.tzinfo else dt
+        self.daily.setdefault(chain, BucketSeries()).add(utc.date())
+
+    def fold(self, rows: Iterable[Dict], quiz_chains: Optional[Dict[str, int]] = None) -> int:
+        """
+        Fold rows read from the watermark onwards; returns how many were new.
+        *quiz_chains* maps str(quiz_id) to its chain id (unknown quizzes: "0").
+        """
+        quiz_chains = quiz_chains or {}
+        seen = dict(self.boundary)
+        watermark, boundary = self.watermark, dict(self.boundary)
+        added = 0
+        for row in rows:
+            ts = str(row.get("answered_at") or "")
+            fp = _fingerprint(row)
+            if ts and ts == self.watermark and seen.get(fp, 0) > 0:
+                seen[fp] -= 1
+                continue
+            self._add(row, str(quiz_chains.get(str(row.get("quiz_id")), 0)))
+            added += 1
+            if ts > watermark:
+                watermark, boundary = ts, {fp: 1}
+            elif ts and ts == watermark:
+                boundary[fp] = boundary.get(fp, 0) + 1
+        self.watermark, self.boundary = watermark, boundary
+        return added
+
+    def scored(self) -> int:
+        return sum(self.buckets)
+
+    def to_state(self) -> Dict:
+        return {
+            "pairs":     self.pairs,
+            "days":      self.days,
+            "daily":     {chain: s.to_state() for chain, s in self.daily.items()},
+            "watermark": self.watermark,
+            "boundary":  self.boundary,
+            "built_at":  self.built_at,
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "QuizAnswerRollup":
+        rollup = cls()
+        # State written before the per-day series existed: start over with a full build
+        if not state or "daily" not in state:
+            return rollup
+        rollup.pairs     = {k: [int(c), int(t)] for k, (c, t) in (state.get("pairs") or {}).items()}
+        rollup.days      = {d: int((state.get("days") or {}).get(d, 0)) for d in DAYS}
+        rollup.daily     = {chain: BucketSeries.from_state(days) for chain, days in (state.get("daily") or {}).items()}
+        rollup.watermark = str(state.get("watermark") or "")
+        rollup.boundary  = {k: int(v) for k, v in (state.get("boundary") or {}).items()}
+        rollup.built_at  = float(state.get("built_at") or time.time())
+        # The histogram is derived; rebuilding it from the pairs is one cheap pass
+        for correct, total in rollup.pairs.values():
+            if total:
+                score = _score(correct, total)
+                rollup.buckets[score] += 1
+                rollup.score_sum += score
+        return rollup
+
+
+# ── Check: python -m quiz_rollup [n_answers] ────────────────────────────────
+
+def _full_recompute(rows: List[Dict]) -> tuple:
+    """The original build_quiz_analytics loops, for comparison."""
+    pairs: Dict[tuple, List[int]] = {}
+    for a in rows:
+        stats = pairs.setdefault((a["quiz_id"], a["wallet_address"]), [0, 0])
+        stats[1] += 1
+        if a.get("is_correct"):
+            stats[0] += 1
+    buckets = [0] * SCORE_BUCKETS
+    score_sum = 0
+    for correct, total in pairs.values():
+        raw = round((correct / total) * 10)
+        buckets[min(int(raw), 10)] += 1
+        score_sum += raw
+    days = {d: 0 for d in DAYS}
+    for a in rows:
+        day = _weekday(str(a["answered_at"])) if a.get("answered_at") else None
+        if day in days:
+            days[day] += 1
+    return buckets, score_sum, days
+
+
+def _verify(n: int = 300_000, batches: int = 30) -> None:
+    import random
+    from datetime import timedelta
+
+    rng = random.Random(3)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(n):
+        # Coarse timestamps so many answers share one; exercises the boundary
+        ts = (start + timedelta(seconds=(i * 7) // 5)).isoformat() + "+00:00"
+        rows.append({
+            "quiz_id":        rng.randrange(200),
+            "wallet_address": f"0x{rng.randrange(5_000):040x}",
+            "is_correct":     rng.random() < 0.6,
+            "points_earned":  rng.choice((0, 10)),
+            "answered_at":    ts,
+        })
+
+    t0 = time.perf_counter()
+    expected = _full_recompute(rows)
+    full_s = time.perf_counter() - t0
+
+    rollup = QuizAnswerRollup()
+    step = n // batches
+    delta_s = []
+    for b in range(batches):
+        upto = n if b == batches - 1 else (b + 1) * step
+        # What the query returns: everything at or after the watermark that exists so far
+        page = [r for r in rows[:upto] if str(r["answered_at"]) >= rollup.watermark]
+        rollup = QuizAnswerRollup.from_state(rollup.to_state())
+        t0 = time.perf_counter()
+        rollup.fold(page)
+        delta_s.append(time.perf_counter() - t0)
+
+    got = (rollup.buckets, rollup.score_sum, rollup.days)
+    assert got == expected, (got, expected)
+    assert sum(series.total() for series in rollup.daily.values()) == n
+    print(f"{n:,} answers in {batches} batches: rollup matches full recompute")
+    print(f"  full recompute : {full_s * 1000:8.1f} ms per rebuild")
+    print(f"  incremental    : {sum(delta_s) / len(delta_s) * 1000:8.1f} ms per rebuild ({step:,} new answers)")
+
+
+if __name__ == "__main__":
+    import sys
+
+    _verify(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import cache_lookup, register_cache_age
+
+
+class ResponseCache:
+    """
+    Keyed cache for endpoint payloads with a TTL and stale-while-revalidate.
+
+    Fresh entries (younger than *ttl*) are served as is. Stale entries (up to
+    *ttl* + *stale_ttl*) are served immediately while one background rebuild
+    runs. Anything older, or missing, is built inline; concurrent requests
+    for the same key share a single build. Blocking builders run in the
+    default executor; coroutine functions are awaited on the loop. With
+    *max_entries* set, the least recently built entries are dropped first.
+
+    invalidate() drops entries and bumps a generation counter, so a build
+    that started before the invalidation does not store its (older) result.
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0.0, max_entries: Optional[int] = None):
+        self.name        = name
+        self.ttl         = ttl
+        self.stale_ttl   = stale_ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Hashable, Tuple[Any, float, float]] = {}  # key -> (value, built_monotonic, built_epoch)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        register_cache_age(name, self._last_built)
+
+    def _last_built(self) -> Optional[float]:
+        return max((epoch for _, _, epoch in list(self._entries.values())), default=None)
+
+    async def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        age = time.monotonic() - entry[1] if entry else None
+        if age is not None and age < self.ttl + self.stale_ttl:
+            cache_lookup(self.name, True)
+            if age >= self.ttl and key not in self._inflight:
+                self._start(key, build)
+            return entry[0]
+        cache_lookup(self.name, False)
+        future = self._inflight.get(key) or self._start(key, build)
+        return await asyncio.shield(future)
+
+    def _start(self, key: Hashable, build: Callable[[], Any]) -> asyncio.Future:
+        generation = self._generation
+        loop = asyncio.get_running_loop()
+
+        async def _run():
+            try:
+                if asyncio.iscoroutinefunction(build):
+                    value = await build()
+                else:
+                    value = await loop.run_in_executor(None, build)
+                if generation == self._generation:
+                    self._entries.pop(key, None)
+                    self._entries[key] = (value, time.monotonic(), time.time())
+                    if self.max_entries is not None and len(self._entries) > self.max_entries:
+                        del self._entries[next(iter(self._entries))]
+                return value
+            except Exception as e:
+                print(f"⚠️  [{self.name} cache] rebuild of {key!r} failed: {e}")
+                raise
+            finally:
+                if self._inflight.get(key) is future:
+                    del self._inflight[key]
+
+        future = asyncio.ensure_future(_run())
+        # Background revalidations have no awaiter; keep their failures out of the loop's error log
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        return future
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        self._generation += 1
+        if key is None:
+            self._entries.clear()
+            self._inflight.clear()
+        else:
+            self._entries.pop(key, None)
+            self._inflight.pop(key, None)
+
+
+class TableSnapshots:
+    """
+    Recently read table rows, keyed by (table, columns), so readers that run
+    close together (an analytics rebuild and a list endpoint) share one
+    fetch. Concurrent misses on one key wait for a single load. Rows are
+    shared, not copied: callers must not mutate them.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._rows: Dict[Tuple[str, str], Tuple[Any, float]] = {}
+        self._loading: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, key: Tuple[str, str]) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._rows.get(key)
+        return entry if entry and time.monotonic() - entry[1] < self.ttl else None
+
+    def get(self, table: str, columns: str, load: Callable[[], Any]) -> Any:
+        key = (table, columns)
+        entry = self._fresh(key)
+        if entry is None:
+            with self._lock:
+                loading = self._loading.setdefault(key, threading.Lock())
+            with loading:
+                entry = self._fresh(key)
+                if entry is None:
+                    cache_lookup("table_snapshot", False)
+                    rows = load()
+                    with self._lock:
+                        self._rows[key] = (rows, time.monotonic())
+                    return rows
+        cache_lookup("table_snapshot", True)
+        return entry[0]
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._rows if table is None or k[0] == table]:
+                del self._rows[key]
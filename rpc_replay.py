@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from eth_abi import decode as abi_decode, encode as abi_encode
+from eth_utils import function_signature_to_4byte_selector
+from web3 import HTTPProvider
+from web3._utils.encoding import Web3JsonEncoder
+from web3.providers.base import JSONBaseProvider
+
+# "" (live RPC), "record" (live RPC, responses saved) or "replay" (fixtures only)
+RPC_REPLAY_MODE  = os.getenv("RPC_REPLAY_MODE", "").lower()
+RPC_FIXTURE_DIR  = os.getenv("RPC_FIXTURE_DIR", "fixtures/rpc")
+RPC_REPLAY_SCALE = int(os.getenv("RPC_REPLAY_SCALE", "1"))
+
+
+# ── Call accounting ──────────────────────────────────────────────────────────
+
+class RpcStats:
+    """Thread-safe JSON-RPC call counts, by method and by eth_call function."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.methods:   Counter = Counter()
+        self.functions: Counter = Counter()
+        self.misses = 0
+
+    def count(self, method: str, params: Any) -> None:
+        fn = _function_name(method, params)
+        with self._lock:
+            self.methods[method] += 1
+            if fn:
+                self.functions[fn] += 1
+
+    def miss(self) -> None:
+        with self._lock:
+            self.misses += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "total":     sum(self.methods.values()),
+                "methods":   dict(self.methods),
+                "functions": dict(self.functions),
+                "misses":    self.misses,
+            }
+
+
+rpc_stats = RpcStats()
+
+_SELECTOR_NAMES: Dict[str, str] = {}
+
+
+def _function_name(method: str, params: Any) -> Optional[str]:
+    if method != "eth_call" or not params or not isinstance(params[0], dict):
+        return None
+    data = str(params[0].get("data") or params[0].get("input") or "")
+    return _SELECTOR_NAMES.get(data[:10].lower())
+
+
+# ── Fixture files ────────────────────────────────────────────────────────────
+
+def _normalize(obj: Any) -> Any:
+    # Hex is case-insensitive; checksummed and lowercase forms share a key
+    if isinstance(obj, dict):
+        return {k: _normalize(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_normalize(v) for v in obj]
+    if isinstance(obj, str) and obj[:2] == "0x":
+        return obj.lower()
+    return obj
+
+
+def _request_key(method: str, params: Any) -> str:
+    params = json.loads(json.dumps(params or [], cls=Web3JsonEncoder))
+    return json.dumps([method, _normalize(params)], sort_keys=True, separators=(",", ":"))
+
+
+def _fixture_path(endpoint: str) -> str:
+    host = re.sub(r"[^a-zA-Z0-9]+", "-", endpoint.split("://", 1)[-1].split("/", 1)[0]).strip("-")
+    digest = hashlib.sha1(endpoint.encode()).hexdigest()[:10]
+    return os.path.join(RPC_FIXTURE_DIR, f"{host}-{digest}.json")
+
+
+class FixtureStore:
+    """Recorded responses for one RPC endpoint, keyed by (method, params)."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.path = _fixture_path(endpoint)
+        self.responses: Dict[str, Dict] = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.responses = json.load(f).get("responses", {})
+            self.loaded = True
+
+    def get(self, method: str, params: Any) -> Optional[Dict]:
+        return self.responses.get(_request_key(method, params))
+
+    def put(self, method: str, params: Any, response: Dict) -> None:
+        body = {k: v for k, v in dict(response).items() if k != "id"}
+        with self._lock:
+            self.responses[_request_key(method, params)] = json.loads(json.dumps(body, cls=Web3JsonEncoder))
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            payload = {
+                "endpoint":    self.endpoint,
+                "recorded_at": datetime.utcnow().isoformat(),
+                "responses":   self.responses,
+            }
+        with open(self.path, "w") as f:
+            json.dump(payload, f)
+
+
+_stores: Dict[str, FixtureStore] = {}
+_stores_lock = threading.Lock()
+
+
+def _store(endpoint: str) -> FixtureStore:
+    with _stores_lock:
+        if endpoint not in _stores:
+            _stores[endpoint] = FixtureStore(endpoint)
+        return _stores[endpoint]
+
+
+def flush_fixtures() -> int:
+    """Write every recorded endpoint to RPC_FIXTURE_DIR. Returns the number of responses saved."""
+    saved = 0
+    for store in list(_stores.values()):
+        if store.responses:
+            store.save()
+            saved += len(store.responses)
+    return saved
+
+
+# ── Synthetic scale-up ───────────────────────────────────────────────────────
+# Array-returning getters are re-encoded with (factor - 1) extra copies of
+# every element, addresses in the copies replaced by derived synthetic ones.
+# Calls later made *to* a synthetic address are mapped back to the original
+# before lookup, so a copied faucet answers with its original's recording.
+
+_SCALED_ARRAYS = {
+    "getAllFaucets()":         "address[]",
+    "getAllQuests()":          "address[]",
+    "getAllQuizzes()":         "address[]",
+    "getAllParticipants()":    "address[]",
+    "getUniqueParticipants()": "address[]",
+    "getAllTransactions()":    "(address,string,address,uint256,bool,uint256)[]",
+}
+_SCALED_COUNTS = ("getTotalFaucets()", "getTotalTransactions()", "getUniqueParticipantCount()")
+
+for _sig in list(_SCALED_ARRAYS) + list(_SCALED_COUNTS):
+    _SELECTOR_NAMES["0x" + function_signature_to_4byte_selector(_sig).hex()] = _sig.split("(")[0]
+for _sig in ("name()", "symbol()", "decimals()", "owner()", "deleted()", "endTime()",
+             "getFaucetDetails()", "getDetails()", "token()"):
+    _SELECTOR_NAMES["0x" + function_signature_to_4byte_selector(_sig).hex()] = _sig.split("(")[0]
+
+_ARRAY_SELECTORS = {"0x" + function_signature_to_4byte_selector(s).hex(): t for s, t in _SCALED_ARRAYS.items()}
+_COUNT_SELECTORS = {"0x" + function_signature_to_4byte_selector(s).hex() for s in _SCALED_COUNTS}
+
+
+class Scaler:
+    def __init__(self, factor: int):
+        self.factor = max(1, factor)
+        self.origin: Dict[str, str] = {}   # synthetic lower-hex (no 0x) -> original
+        self._lock = threading.Lock()
+
+    def synth(self, addr: str, copy: int) -> str:
+        if copy == 0:
+            return addr
+        body = hashlib.sha256(f"{addr.lower()}:{copy}".encode()).hexdigest()[:40]
+        with self._lock:
+            self.origin[body] = addr.lower()[2:]
+        return "0x" + body
+
+    def unmap(self, obj: Any) -> Any:
+        """Replace synthetic addresses (and calldata words) in request params with their originals."""
+        if not self.origin:
+            return obj
+        if isinstance(obj, dict):
+            return {k: self.unmap(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self.unmap(v) for v in obj]
+        if isinstance(obj, str) and obj[:2] == "0x":
+            body = obj[2:].lower()
+            if len(body) == 40:
+                orig = self.origin.get(body)
+                return "0x" + orig if orig else obj
+            if len(body) > 8 and (len(body) - 8) % 64 == 0:
+                words = [body[8 + i : 8 + i + 64] for i in range(0, len(body) - 8, 64)]
+                words = [w[:24] + self.origin.get(w[24:], w[24:]) if w[:24] == "0" * 24 else w for w in words]
+                return "0x" + body[:8] + "".join(words)
+        return obj
+
+    def scale_result(self, params: Any, result: Any) -> Any:
+        if self.factor == 1 or not isinstance(result, str) or not params or not isinstance(params[0], dict):
+            return result
+        selector = str(params[0].get("data") or params[0].get("input") or "")[:10].lower()
+        raw = bytes.fromhex(result[2:]) if result[:2] == "0x" else b""
+        try:
+            if selector in _COUNT_SELECTORS:
+                (value,) = abi_decode(["uint256"], raw)
+                return "0x" + abi_encode(["uint256"], [value * self.factor]).hex()
+            out_type = _ARRAY_SELECTORS.get(selector)
+            if out_type is None:
+                return result
+            (items,) = abi_decode([out_type], raw)
+        except Exception:
+            return result
+        scaled: List = []
+        for copy in range(self.factor):
+            if out_type == "address[]":
+                scaled.extend(self.synth(a, copy) for a in items)
+            else:
+                scaled.extend(
+                    (self.synth(t[0], copy), t[1], self.synth(t[2], copy), t[3], t[4], t[5]) for t in items
+                )
+        return "0x" + abi_encode([out_type], [scaled]).hex()
+
+
+_scaler = Scaler(RPC_REPLAY_SCALE)
+
+
+# ── Providers ────────────────────────────────────────────────────────────────
+
+class RecordingProvider(HTTPProvider):
+    """HTTPProvider that also stores every response in the endpoint's fixture file."""
+
+    def __init__(self, endpoint_uri: str, **kwargs):
+        super().__init__(endpoint_uri, **kwargs)
+        self._fixtures = _store(endpoint_uri)
+
+    def make_request(self, method, params):
+        rpc_stats.count(method, params)
+        response = super().make_request(method, params)
+        self._fixtures.put(method, params, response)
+        return response
+
+    def make_batch_request(self, batch_requests):
+        for method, params in batch_requests:
+            rpc_stats.count(method, params)
+        responses = super().make_batch_request(batch_requests)
+        for (method, params), response in zip(batch_requests, responses):
+            self._fixtures.put(method, params, response)
+        return responses
+
+
+class ReplayProvider(JSONBaseProvider):
+    """Answers from the endpoint's fixture file; unrecorded requests get a JSON-RPC error."""
+
+    def __init__(self, endpoint_uri: str, scaler: Optional[Scaler] = None):
+        super().__init__()
+        self.endpoint_uri = endpoint_uri
+        self._fixtures = _store(endpoint_uri)
+        self._scaler = scaler or _scaler
+
+    def __str__(self) -> str:
+        return f"ReplayProvider {self.endpoint_uri}"
+
+    def is_connected(self, show_traceback: bool = False) -> bool:
+        return self._fixtures.loaded and super().is_connected(show_traceback)
+
+    def make_request(self, method, params):
+        rpc_stats.count(method, params)
+        lookup = self._scaler.unmap(params)
+        recorded = self._fixtures.get(method, lookup)
+        response = {"jsonrpc": "2.0", "id": next(self.request_counter)}
+        if recorded is None:
+            rpc_stats.miss()
+            response["error"] = {"code": -32000, "message": f"not recorded: {method}"}
+            return response
+        response.update(recorded)
+        if "result" in response:
+            response["result"] = self._scaler.scale_result(lookup, response["result"])
+        return response
+
+    def make_batch_request(self, batch_requests):
+        return [self.make_request(method, params) for method, params in batch_requests]
+
+
+def make_provider(endpoint_uri: str):
+    if RPC_REPLAY_MODE == "replay":
+        return ReplayProvider(endpoint_uri)
+    if RPC_REPLAY_MODE == "record":
+        return RecordingProvider(endpoint_uri)
+    return HTTPProvider(endpoint_uri)
+
+
+# ── Benchmark CLI ────────────────────────────────────────────────────────────
+#   RPC_REPLAY_MODE=record python -m rpc_replay record
+#   python -m rpc_replay bench --scale 1 10 100
+# Each (job, scale) runs in its own interpreter so in-process caches and
+# peak memory do not leak between measurements.
+
+JOBS = ("refresh_all_data", "refresh_network_faucets", "refresh_claims_cache",
+        "collect_quest_quiz_unique_participants")
+
+
+def _run_job(job: str, trace_memory: bool) -> Dict:
+    import main  # imported here so RPC_REPLAY_* is already in the environment
+
+    if trace_memory:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t0 = time.perf_counter()
+    error = None
+    try:
+        asyncio.run(getattr(main, job)())
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - t0
+    report = {
+        "job":       job,
+        "scale":     RPC_REPLAY_SCALE,
+        "wall_s":    round(wall, 3),
+        "rpc":       rpc_stats.snapshot(),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rss_growth_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        "error":     error,
+    }
+    if trace_memory:
+        report["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+        tracemalloc.stop()
+    return report
+
+
+def _bench(jobs: List[str], scales: List[int], trace_memory: bool) -> None:
+    rows: List[Dict] = []
+    for scale in scales:
+        for job in jobs:
+            env = {**os.environ, "RPC_REPLAY_MODE": "replay", "RPC_REPLAY_SCALE": str(scale),
+                   "RPC_FIXTURE_DIR": RPC_FIXTURE_DIR}
+            env.setdefault("SUPABASE_URL", "")
+            cmd = [sys.executable, "-m", "rpc_replay", "run", job] + (["--trace-memory"] if trace_memory else [])
+            proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+            lines = [l for l in proc.stdout.splitlines() if l.startswith("{")]
+            if not lines:
+                print(f"❌ {job} x{scale} produced no report:\n{proc.stderr[-2000:]}")
+                continue
+            rows.append(json.loads(lines[-1]))
+
+    mem_col = "py_peak_mb" if trace_memory else "max_rss_mb"
+    print(f"\n{'job':<40} {'scale':>5} {'wall s':>8} {'rpc':>7} {'miss':>6} {mem_col:>11}")
+    for r in rows:
+        print(f"{r['job']:<40} {r['scale']:>5} {r['wall_s']:>8.2f} {r['rpc']['total']:>7} "
+              f"{r['rpc']['misses']:>6} {r.get(mem_col, 0):>11.1f}" + (f"  ⚠️ {r['error']}" if r["error"] else ""))
+
+
+def _record(jobs: List[str]) -> None:
+    if RPC_REPLAY_MODE != "record":
+        sys.exit("set RPC_REPLAY_MODE=record to capture fixtures")
+    for job in jobs:
+        report = _run_job(job, trace_memory=False)
+        print(f"📼 {job}: {report['rpc']['total']} RPC calls in {report['wall_s']}s"
+              + (f" ⚠️ {report['error']}" if report["error"] else ""))
+    print(f"💾 {flush_fixtures()} responses saved to {RPC_FIXTURE_DIR}")
+
+
+def _cli() -> None:
+    parser = argparse.ArgumentParser(prog="python -m rpc_replay")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_rec = sub.add_parser("record", help="run jobs against live RPCs and save fixtures")
+    p_rec.add_argument("jobs", nargs="*", default=list(JOBS))
+    p_bench = sub.add_parser("bench", help="replay fixtures at each scale and report")
+    p_bench.add_argument("jobs", nargs="*", default=list(JOBS))
+    p_bench.add_argument("--scale", nargs="+", type=int, default=[1, 10, 100])
+    p_bench.add_argument("--trace-memory", action="store_true", help="tracemalloc peak instead of max RSS")
+    p_run = sub.add_parser("run", help="(internal) one replayed job, JSON report on stdout")
+    p_run.add_argument("job", choices=JOBS)
+    p_run.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+
+    if args.cmd == "record":
+        _record(args.jobs)
+    elif args.cmd == "bench":
+        _bench(args.jobs, args.scale, args.trace_memory)
+    else:
+        print(json.dumps(_run_job(args.job, args.trace_memory)))
+
+
+if __name__ == "__main__":
+    # main.py imports this module by name; run the CLI from that instance so
+    # the providers it builds and the counters reported here are the same.
+    import rpc_replay
+    rpc_replay._cli()
@@ -0,0 +1,331 @@
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+GRANULARITIES = ("day", "week", "month")
+
+
+# ── Buckets ──────────────────────────────────────────────────────────────────
+# Keys: day "YYYY-MM-DD", week = its Monday "YYYY-MM-DD", month "YYYY-MM" (UTC)
+
+def bucket_of(day: date, granularity: str) -> str:
+    if granularity == "day":
+        return day.isoformat()
+    if granularity == "week":
+        return (day - timedelta(days=day.weekday())).isoformat()
+    return day.isoformat()[:7]
+
+
+def bucket_span(key: str, granularity: str) -> Tuple[date, date]:
+    """First and last day covered by bucket *key*."""
+    if granularity == "month":
+        first = date.fromisoformat(key + "-01")
+        nxt = date(first.year + first.month // 12, first.month % 12 + 1, 1)
+        return first, nxt - timedelta(days=1)
+    first = date.fromisoformat(key)
+    return first, first + timedelta(days=6 if granularity == "week" else 0)
+
+
+def utc_day(ts: int) -> date:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).date()
+
+
+class BucketSeries:
+    """
+    Counts per UTC day, with ISO-week and month tiers kept in step on every
+    add. A window query reads whole buckets from their own tier and only
+    sums days for the (at most two) buckets the window cuts, so its cost
+    follows the number of buckets returned, not the rows behind them.
+    Only the daily tier is persisted; the others are derived on load.
+    """
+
+    __slots__ = ("tiers",)
+
+    def __init__(self):
+        self.tiers: Dict[str, Dict[str, int]] = {g: {} for g in GRANULARITIES}
+
+    def add(self, day: date, n: int = 1) -> None:
+        if not n:
+            return
+        for g in GRANULARITIES:
+            tier = self.tiers[g]
+            key = bucket_of(day, g)
+            tier[key] = tier.get(key, 0) + n
+
+    def total(self) -> int:
+        return sum(self.tiers["month"].values())
+
+    def first_day(self) -> Optional[date]:
+        days = self.tiers["day"]
+        return date.fromisoformat(min(days)) if days else None
+
+    def _days_sum(self, first: date, last: date) -> int:
+        days = self.tiers["day"]
+        total, d = 0, first
+        while d <= last:
+            total += days.get(d.isoformat(), 0)
+            d += timedelta(days=1)
+        return total
+
+    def window(self, granularity: str, start: date, end: date) -> List[Tuple[str, int]]:
+        """[(bucket, count)] for every bucket overlapping [start, end], zeros included."""
+        tier = self.tiers[granularity]
+        out: List[Tuple[str, int]] = []
+        key = bucket_of(start, granularity)
+        while True:
+            first, last = bucket_span(key, granularity)
+            if first > end:
+                break
+            if first >= start and last <= end:
+                out.append((key, tier.get(key, 0)))
+            else:
+                out.append((key, self._days_sum(max(first, start), min(last, end))))
+            key = bucket_of(last + timedelta(days=1), granularity)
+        return out
+
+    def to_state(self) -> Dict[str, int]:
+        return {day: n for day, n in self.tiers["day"].items() if n}
+
+    @classmethod
+    def from_state(cls, days: Optional[Dict[str, int]]) -> "BucketSeries":
+        series = cls()
+        for day, n in (days or {}).items():
+            series.add(date.fromisoformat(day), int(n))
+        return series
+
+
+def sum_windows(series: Iterable[BucketSeries], granularity: str, start: date, end: date) -> List[Tuple[str, int]]:
+    """Bucket-wise sum of several series over the same window."""
+    totals: Optional[List[List]] = None
+    for s in series:
+        rows = s.window(granularity, start, end)
+        if totals is None:
+            totals = [[k, v] for k, v in rows]
+        else:
+            for row, (_, v) in zip(totals, rows):
+                row[1] += v
+    if totals is None:
+        return BucketSeries().window(granularity, start, end)
+    return [(k, v) for k, v in totals]
+
+
+# ── Claims by day × chain × faucet type ──────────────────────────────────────
+
+class ClaimRollup:
+    """
+    Claim counts per UTC day for each (chain, faucet type), folded in from
+    the factory transactions appended since the previous run (cursors work
+    like the unique-user store's). When a faucet is deleted, the claims
+    already folded for it are subtracted again (remove_daily); *retired*
+    records per factory which deleted faucets have been taken out.
+    """
+
+    def __init__(self):
+        self.series: Dict[str, BucketSeries] = {}
+        self.cursors: Dict[str, int] = {}
+        self.retired: Dict[str, set] = {}
+        # State written before per-factory retirement: the deleted set then in
+        # force, whose claims were never folded in
+        self.deleted: set = set()
+
+    def cursor(self, key: str) -> int:
+        return self.cursors.get(key, 0)
+
+    def advance(self, key: str, position: int) -> None:
+        self.cursors[key] = position
+
+    def add_daily(self, chain_id: int, faucet_type: str, daily: Dict[str, int]) -> None:
+        series = self.series.setdefault(f"{chain_id}:{faucet_type}", BucketSeries())
+        for day, n in daily.items():
+            series.add(date.fromisoformat(day), n)
+
+    def remove_daily(self, chain_id: int, faucet_type: str, daily: Dict[str, int]) -> None:
+        self.add_daily(chain_id, faucet_type, {day: -n for day, n in daily.items()})
+
+    def retired_for(self, key: str) -> set:
+        return self.retired.get(key, self.deleted)
+
+    def select(self, chain_id: Optional[int] = None, faucet_type: Optional[str] = None) -> List[BucketSeries]:
+        out = []
+        for key, series in self.series.items():
+            cid, ftype = key.split(":", 1)
+            if (chain_id is None or int(cid) == chain_id) and (faucet_type is None or ftype == faucet_type):
+                out.append(series)
+        return out
+
+    def total(self) -> int:
+        return sum(s.total() for s in self.series.values())
+
+    def to_state(self) -> Dict:
+        return {
+            "series":  {k: s.to_state() for k, s in self.series.items()},
+            "cursors": dict(self.cursors),
+            "retired": {k: sorted(v) for k, v in self.retired.items()},
+            "deleted": sorted(self.deleted),
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "ClaimRollup":
+        rollup = cls()
+        if not state:
+            return rollup
+        rollup.series  = {k: BucketSeries.from_state(days) for k, days in (state.get("series") or {}).items()}
+        rollup.cursors = {k: int(v) for k, v in (state.get("cursors") or {}).items()}
+        rollup.retired = {k: set(v) for k, v in (state.get("retired") or {}).items()}
+        rollup.deleted = set(state.get("deleted") or [])
+        return rollup
+
+
+# ── Approved quest submissions by day × chain ────────────────────────────────
+
+QUEST_PENDING_WINDOW_DAYS = 30  # pending submissions older than this stop holding the watermark back
+
+
+class QuestCompletionRollup:
+    """
+    Approved submissions per UTC day of submitted_at, per chain. Rows are
+    read from the watermark on. Submissions are approved after they are
+    submitted, so the watermark stays at the oldest submission still
+    awaiting review (within QUEST_PENDING_WINDOW_DAYS); rows from the
+    watermark on that were already counted are remembered by key and
+    skipped when re-read.
+    """
+
+    TERMINAL = ("approved", "rejected")
+
+    def __init__(self):
+        self.series: Dict[str, BucketSeries] = {}
+        self.watermark = ""
+        self.counted: set = set()   # keys of approved rows at or after the watermark
+        self.built_at = time.time()
+
+    @staticmethod
+    def _key(row: Dict) -> str:
+        return f"{row.get('faucet_address')}|{row.get('wallet_address')}|{row.get('submitted_at')}"
+
+    def fold(self, rows: Iterable[Dict], quest_chains: Dict[str, int], now: Optional[datetime] = None) -> int:
+        """Fold rows read from the watermark onwards; returns how many completions were new."""
+        cutoff = ((now or datetime.now(timezone.utc)) - timedelta(days=QUEST_PENDING_WINDOW_DAYS)).isoformat()
+        latest, oldest_open = self.watermark, None
+        added = 0
+        for row in rows:
+            ts = str(row.get("submitted_at") or "")
+            if not ts:
+                continue
+            latest = max(latest, ts)
+            status = row.get("status")
+            if status not in self.TERMINAL and ts >= cutoff:
+                oldest_open = ts if oldest_open is None else min(oldest_open, ts)
+            if status != "approved":
+                continue
+            key = self._key(row)
+            if key in self.counted:
+                continue
+            try:
+                dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            day = (dt.astimezone(timezone.utc) if dt.tzinfo else dt).date()
+            chain = str(quest_chains.get(row.get("faucet_address"), 0))
+            self.series.setdefault(chain, BucketSeries()).add(day)
+            self.counted.add(key)
+            added += 1
+        self.watermark = min(oldest_open, latest) if oldest_open is not None else latest
+        self.counted = {k for k in self.counted if k.rsplit("|", 1)[1] >= self.watermark}
+        return added
+
+    def to_state(self) -> Dict:
+        return {
+            "series":    {k: s.to_state() for k, s in self.series.items()},
+            "watermark": self.watermark,
+            "counted":   sorted(self.counted),
+            "built_at":  self.built_at,
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "QuestCompletionRollup":
+        rollup = cls()
+        if not state:
+            return rollup
+        rollup.series    = {k: BucketSeries.from_state(days) for k, days in (state.get("series") or {}).items()}
+        rollup.watermark = str(state.get("watermark") or "")
+        rollup.counted   = set(state.get("counted") or [])
+        rollup.built_at  = float(state.get("built_at") or time.time())
+        return rollup
+
+
+# ── Check: python -m timeseries ──────────────────────────────────────────────
+
+def _verify(n: int = 50_000, queries: int = 200) -> None:
+    import random
+    import time
+
+    rng = random.Random(11)
+    origin = date(2023, 1, 1)
+    days = [origin + timedelta(days=int(rng.betavariate(2, 1) * 900)) for _ in range(n)]
+
+    series = BucketSeries.from_state(BucketSeries().to_state())
+    for d in days:
+        series.add(d)
+    series = BucketSeries.from_state(series.to_state())
+    assert series.total() == n
+
+    t_fast = t_raw = 0.0
+    for _ in range(queries):
+        g = rng.choice(GRANULARITIES)
+        start = origin + timedelta(days=rng.randrange(-30, 900))
+        end = start + timedelta(days=rng.randrange(0, 400 if g != "day" else 60))
+        t0 = time.perf_counter()
+        got = series.window(g, start, end)
+        t_fast += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        want: Dict[str, int] = {}
+        for d in days:
+            if start <= d <= end:
+                k = bucket_of(d, g)
+                want[k] = want.get(k, 0) + 1
+        t_raw += time.perf_counter() - t0
+        assert {k: v for k, v in got if v} == want, (g, start, end)
+        assert got[0][0] == bucket_of(start, g) and got[-1][0] == bucket_of(end, g)
+
+    print(f"{queries} random windows over {n:,} events: bucket answers match a raw scan")
+    print(f"  buckets  : {t_fast / queries * 1e6:9.1f} µs per query")
+    print(f"  raw scan : {t_raw / queries * 1e6:9.1f} µs per query")
+    _verify_quest_completions(rng)
+
+
+
+def _verify_quest_completions(rng, n: int = 5_000, runs: int = 12) -> None:
+    """Submissions arrive pending and get reviewed later; each run reads rows >= watermark."""
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    subs: List[Dict] = []
+    rollup = QuestCompletionRollup()
+    reread = 0
+    for run in range(runs):
+        t = now + timedelta(days=run)
+        for i in range(n // runs):
+            ts = (t - timedelta(hours=rng.randrange(24))).isoformat()
+            subs.append({"faucet_address": f"q{rng.randrange(20)}", "wallet_address": f"w{len(subs)}",
+                         "status": "pending", "submitted_at": ts})
+        for sub in subs:
+            if sub["status"] == "pending" and rng.random() < 0.5:
+                sub["status"] = rng.choice(("approved", "approved", "rejected"))
+        rows = sorted((s for s in subs if s["submitted_at"] >= rollup.watermark), key=lambda s: s["submitted_at"])
+        reread += len(rows)
+        rollup = QuestCompletionRollup.from_state(rollup.to_state())
+        rollup.fold([dict(r) for r in rows], {f"q{i}": i % 3 for i in range(20)}, now=t)
+
+    want: Dict[str, int] = {}
+    for sub in subs:
+        if sub["status"] == "approved":
+            k = str(int(sub["faucet_address"][1:]) % 3)
+            want[k] = want.get(k, 0) + 1
+    got = {k: s.total() for k, s in rollup.series.items()}
+    assert got == want, (got, want)
+    print(f"{len(subs):,} submissions over {runs} runs with late approvals: completions match "
+          f"({reread:,} rows read in total)")
+
+
+if __name__ == "__main__":
+    _verify()
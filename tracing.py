@@ -0,0 +1,256 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+TRACE_HISTORY = int(os.getenv("TRACE_HISTORY", "50"))
+
+# A span is flagged as a regression when it took this much longer than the
+# same span (same path) in the previous run of the same job
+REGRESSION_RATIO   = 1.5
+REGRESSION_MIN_SEC = 0.5
+
+
+class Span:
+    """
+    Node of a run trace. Re-entering a span with the same kind and name under
+    the same parent (e.g. the per-faucet "details" stage) accumulates into one
+    node, so the tree stays chain → factory → stage sized.
+    """
+
+    __slots__ = ("name", "kind", "attrs", "counts", "errors", "children", "elapsed", "calls", "_open", "_lock")
+
+    def __init__(self, name: str, kind: str, attrs: Optional[Dict] = None):
+        self.name     = name
+        self.kind     = kind
+        self.attrs    = attrs or {}
+        self.counts: Dict[str, int] = {}
+        self.errors: List[str] = []
+        self.children: Dict[str, "Span"] = {}
+        self.elapsed  = 0.0
+        self.calls    = 0
+        self._open: List[float] = []
+        self._lock    = threading.Lock()
+
+    @property
+    def label(self) -> str:
+        return f"{self.kind}:{self.name}"
+
+    @property
+    def duration(self) -> float:
+        # Includes the time spent so far by entries still running
+        now = time.perf_counter()
+        return self.elapsed + sum(now - t0 for t0 in list(self._open))
+
+    def child(self, name: str, kind: str, attrs: Dict) -> "Span":
+        with self._lock:
+            node = self.children.get(f"{kind}:{name}")
+            if node is None:
+                node = self.children[f"{kind}:{name}"] = Span(name, kind, attrs)
+            return node
+
+    def enter(self) -> float:
+        t0 = time.perf_counter()
+        with self._lock:
+            self.calls += 1
+            self._open.append(t0)
+        return t0
+
+    def exit(self, t0: float) -> None:
+        with self._lock:
+            self._open.remove(t0)
+            self.elapsed += time.perf_counter() - t0
+
+    def count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def error(self, message: str) -> None:
+        with self._lock:
+            self.errors.append(message)
+
+    def walk(self, path: str = ""):
+        path = f"{path}/{self.label}" if path else self.label
+        yield path, self
+        for child in list(self.children.values()):
+            yield from child.walk(path)
+
+    def to_dict(self) -> Dict:
+        out: Dict[str, Any] = {"name": self.name, "kind": self.kind, "duration_ms": round(self.duration * 1000, 1)}
+        if self.calls > 1:
+            out["calls"] = self.calls
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.counts:
+            out["counts"] = dict(self.counts)
+        if self.errors:
+            out["errors"] = list(self.errors)
+        if self.children:
+            out["children"] = [c.to_dict() for c in list(self.children.values())]
+        return out
+
+
+class RunTrace:
+    def __init__(self, job: str):
+        self.run_id     = uuid.uuid4().hex[:12]
+        self.job        = job
+        self.started_at = datetime.utcnow().isoformat()
+        self.root       = Span(job, "run")
+        self.running    = True
+        self.failed: Optional[str] = None
+        self.regressions: List[Dict] = []
+
+    def durations(self) -> Dict[str, float]:
+        return {path: span.duration for path, span in self.root.walk()}
+
+    def summary(self) -> Dict:
+        counts: Dict[str, int] = {}
+        errors = 0
+        # A chain can appear under several stages; its row sums all of them
+        chains: Dict[str, Dict] = {}
+        for _, span in self.root.walk():
+            for k, v in span.counts.items():
+                counts[k] = counts.get(k, 0) + v
+            errors += len(span.errors)
+            if span.kind == "chain":
+                row = chains.setdefault(span.name, {"name": span.name, "duration_ms": 0.0, "counts": {}, "errors": 0})
+                row["duration_ms"] = round(row["duration_ms"] + span.duration * 1000, 1)
+                row["errors"] += sum(len(s.errors) for _, s in span.walk())
+                for _, s in span.walk():
+                    for k, v in s.counts.items():
+                        row["counts"][k] = row["counts"].get(k, 0) + v
+        chain_rows = sorted(chains.values(), key=lambda c: c["duration_ms"], reverse=True)
+        return {
+            "run_id":      self.run_id,
+            "job":         self.job,
+            "started_at":  self.started_at,
+            "duration_ms": round(self.root.duration * 1000, 1),
+            "status":      "running" if self.running else "failed" if self.failed else ("errors" if errors else "ok"),
+            "failure":     self.failed,
+            "error_count": errors,
+            "counts":      counts,
+            "chains":      chain_rows,
+            "regressions": self.regressions,
+        }
+
+    def report(self) -> Dict:
+        return {**self.summary(), "trace": self.root.to_dict()}
+
+
+_runs: Deque[RunTrace] = deque(maxlen=TRACE_HISTORY)
+_runs_lock = threading.Lock()
+_current: contextvars.ContextVar = contextvars.ContextVar("trace_span", default=None)
+
+
+def _find_regressions(trace: RunTrace) -> List[Dict]:
+    with _runs_lock:
+        previous = next((r for r in reversed(_runs)
+                         if r.job == trace.job and r is not trace and not r.running and not r.failed), None)
+    if previous is None:
+        return []
+    before = previous.durations()
+    found: List[Dict] = []
+    for path, took in trace.durations().items():
+        prev = before.get(path)
+        if prev and took - prev >= REGRESSION_MIN_SEC and took >= prev * REGRESSION_RATIO:
+            found.append({
+                "span":        path,
+                "duration_ms": round(took * 1000, 1),
+                "previous_ms": round(prev * 1000, 1),
+                "ratio":       round(took / prev, 2),
+            })
+    found.sort(key=lambda r: r["duration_ms"] - r["previous_ms"], reverse=True)
+    return found
+
+
+# ── Hooks ────────────────────────────────────────────────────────────────────
+
+@contextmanager
+def run(job: str):
+    """Trace one refresh run; kept in the in-memory history when it ends."""
+    trace = RunTrace(job)
+    with _runs_lock:
+        _runs.append(trace)
+    token = _current.set(trace.root)
+    t0 = trace.root.enter()
+    try:
+        yield trace
+    except Exception as e:
+        trace.failed = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        trace.root.exit(t0)
+        trace.running = False
+        trace.regressions = _find_regressions(trace)
+        s = trace.summary()
+        slowest = ", ".join(f"{c['name']} {c['duration_ms'] / 1000:.1f}s" for c in s["chains"][:3])
+        print(f"🧭 [trace {trace.run_id}] {job}: {s['duration_ms'] / 1000:.1f}s, {s['status']}, "
+              f"{s['error_count']} errors" + (f" | slowest: {slowest}" if slowest else "")
+              + (f" | {len(trace.regressions)} regressions" if trace.regressions else ""))
+
+
+@contextmanager
+def span(name: str, kind: str = "stage", **attrs):
+    """Child span of the current one; a no-op outside a traced run."""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    node = parent.child(str(name), kind, attrs)
+    token = _current.set(node)
+    t0 = node.enter()
+    try:
+        yield node
+    except Exception as e:
+        node.error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        node.exit(t0)
+        _current.reset(token)
+
+
+def bind(fn, name: Optional[str] = None, kind: str = "stage", **attrs):
+    """
+    Carry the current trace into an executor thread (run_in_executor does not
+    copy contextvars), optionally inside a span. Bind once per submission.
+    """
+    ctx = contextvars.copy_context()
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        if name is None:
+            return fn(*args, **kwargs)
+        with span(name, kind, **attrs):
+            return fn(*args, **kwargs)
+    return functools.partial(ctx.run, call)
+
+
+def count(key: str, n: int = 1) -> None:
+    current = _current.get()
+    if current is not None:
+        current.count(key, n)
+
+
+def error(message: str) -> None:
+    current = _current.get()
+    if current is not None:
+        current.error(str(message))
+
+
+def recent_runs(job: Optional[str] = None, limit: int = 20) -> List[Dict]:
+    with _runs_lock:
+        runs = [r for r in _runs if job is None or r.job == job]
+    return [r.summary() for r in reversed(runs[-limit:])]
+
+
+def get_run(run_id: str) -> Optional[Dict]:
+    with _runs_lock:
+        found = next((r for r in _runs if r.run_id == run_id), None)
+    return found.report() if found else None
@@ -0,0 +1,333 @@
+import base64
+import bisect
+import os
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from addresses import ADDRESS_BYTES, address_to_bytes
+
+
+# ── Sorted binary address set ────────────────────────────────────────────────
+
+class _KeyView:
+    """Sequence view over a packed buffer so `bisect` can search it in place."""
+
+    __slots__ = ("_buf",)
+
+    def __init__(self, buf: bytes):
+        self._buf = buf
+
+    def __len__(self) -> int:
+        return len(self._buf) // ADDRESS_BYTES
+
+    def __getitem__(self, i: int) -> bytes:
+        start = i * ADDRESS_BYTES
+        return self._buf[start : start + ADDRESS_BYTES]
+
+
+class SortedAddressSet:
+    """
+    Set of addresses stored as one sorted buffer of 20-byte keys.
+
+    ~20 bytes per member versus ~130 for a set of 42-char hex strings.
+    Lookups are a binary search; small merges splice sorted incoming keys in
+    at their bisect positions, bulk merges take one linear pass.
+    """
+
+    __slots__ = ("_buf",)
+
+    def __init__(self, buf: bytes = b""):
+        self._buf = bytes(buf)
+
+    def __len__(self) -> int:
+        return len(self._buf) // ADDRESS_BYTES
+
+    def __iter__(self) -> Iterator[bytes]:
+        buf = self._buf
+        for start in range(0, len(buf), ADDRESS_BYTES):
+            yield buf[start : start + ADDRESS_BYTES]
+
+    def __contains__(self, key: bytes) -> bool:
+        view = _KeyView(self._buf)
+        i = bisect.bisect_left(view, key)
+        return i < len(view) and view[i] == key
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buf)
+
+    def merge(self, keys: Iterable[bytes]) -> List[bytes]:
+        """
+        Fold *keys* into the set and return the ones that were not already
+        present.
+        """
+        incoming = sorted({k for k in keys if k and len(k) == ADDRESS_BYTES})
+        if not incoming:
+            return []
+        buf  = self._buf
+        view = _KeyView(buf)
+        if len(incoming) * 32 > len(view):
+            # Bulk merge: a linear pass beats one bisect per key. timsort sees
+            # two pre-sorted runs and merges them without a full re-sort.
+            existing = list(self)
+            members  = set(existing)
+            added    = [k for k in incoming if k not in members]
+            if added:
+                existing.extend(added)
+                existing.sort()
+                self._buf = b"".join(existing)
+            return added
+        segments: List[bytes] = []
+        added:    List[bytes] = []
+        prev = 0
+        for key in incoming:
+            i = bisect.bisect_left(view, key, prev)
+            if i < len(view) and view[i] == key:
+                continue
+            segments.append(buf[prev * ADDRESS_BYTES : i * ADDRESS_BYTES])
+            segments.append(key)
+            added.append(key)
+            prev = i
+        if added:
+            segments.append(buf[prev * ADDRESS_BYTES :])
+            self._buf = b"".join(segments)
+        return added
+
+    def to_b64(self) -> str:
+        return base64.b64encode(self._buf).decode("ascii")
+
+    @classmethod
+    def from_b64(cls, data: str) -> "SortedAddressSet":
+        buf = base64.b64decode(data or "")
+        if len(buf) % ADDRESS_BYTES:
+            buf = buf[: len(buf) - len(buf) % ADDRESS_BYTES]
+        return cls(buf)
+
+
+# ── Per-chain incremental store ──────────────────────────────────────────────
+
+class UniqueUserStore:
+    """
+    One SortedAddressSet per scope (a chain id, or a non-chain source such as
+    quest/quiz participants) plus ingestion cursors, so each refresh only
+    merges the transactions/participants appended since the previous one.
+    A cross-scope union is maintained alongside so totals are O(1).
+    """
+
+    mode = "exact"
+
+    def __init__(self):
+        self.scopes:  Dict[str, SortedAddressSet] = {}
+        self.union = SortedAddressSet()
+        self.cursors: Dict[str, int] = {}
+        self.deleted: set = set()
+
+    def merge(
+        self,
+        scope,
+        addresses: Iterable[str],
+        source: Optional[str] = None,
+        timestamps: Optional[Iterable[int]] = None,
+    ) -> int:
+        """
+        Merge into *scope*. Returns how many addresses are new across all scopes.
+        *source* and *timestamps* only feed the sketch store's breakdowns.
+        """
+        store = self.scopes.setdefault(str(scope), SortedAddressSet())
+        added = store.merge(address_to_bytes(str(a)) for a in addresses)
+        return len(self.union.merge(added))
+
+    def cursor(self, key: str) -> int:
+        return self.cursors.get(key, 0)
+
+    def advance(self, key: str, position: int) -> None:
+        self.cursors[key] = position
+
+    def scope_size(self, scope) -> int:
+        store = self.scopes.get(str(scope))
+        return len(store) if store else 0
+
+    def total(self) -> int:
+        return len(self.union)
+
+    def breakdown(self) -> Dict:
+        return {
+            "mode":    self.mode,
+            "total":   self.total(),
+            "byScope": {k: len(v) for k, v in self.scopes.items()},
+        }
+
+    def to_state(self) -> Dict:
+        return {
+            "mode":    self.mode,
+            "scopes":  {k: v.to_b64() for k, v in self.scopes.items()},
+            "cursors": dict(self.cursors),
+            "deleted": sorted(self.deleted),
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "UniqueUserStore":
+        store = cls()
+        if not state or state.get("mode", cls.mode) != cls.mode:
+            return store
+        store.scopes  = {k: SortedAddressSet.from_b64(v) for k, v in (state.get("scopes") or {}).items()}
+        store.cursors = {k: int(v) for k, v in (state.get("cursors") or {}).items()}
+        store.deleted = set(state.get("deleted") or [])
+        for scope in store.scopes.values():
+            store.union.merge(iter(scope))
+        return store
+
+
+# ── First-seen date index ────────────────────────────────────────────────────
+
+class FirstSeenIndex:
+    """
+    Earliest activity date per wallet, plus the daily new-user counts derived
+    from it. Updates are folded in one observation at a time and the index
+    remembers the earliest date whose cumulative total moved, so callers can
+    persist only the affected tail of the series.
+
+    Persisted compactly as {date: packed 20-byte addresses}.
+    """
+
+    def __init__(self):
+        self.first_seen: Dict[bytes, str] = {}
+        self.new_by_date: Dict[str, int] = {}
+        self.cursors: Dict[str, int] = {}
+        self.watermarks: Dict[str, str] = {}
+        self.deleted: set = set()
+        self._dirty_from: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.first_seen)
+
+    def cursor(self, key: str) -> int:
+        return self.cursors.get(key, 0)
+
+    def advance(self, key: str, position: int) -> None:
+        self.cursors[key] = position
+
+    def observe(self, addr: str, date_str: str) -> bool:
+        """Record activity on *date_str*. Returns True if the wallet's first-seen date moved."""
+        key = address_to_bytes(addr)
+        if key is None or not date_str:
+            return False
+        prev = self.first_seen.get(key)
+        if prev is not None and prev <= date_str:
+            return False
+        if prev is not None:
+            self.new_by_date[prev] -= 1
+        self.first_seen[key] = date_str
+        self.new_by_date[date_str] = self.new_by_date.get(date_str, 0) + 1
+        if self._dirty_from is None or date_str < self._dirty_from:
+            self._dirty_from = date_str
+        return True
+
+    def inherit_dates(self, previous: "FirstSeenIndex") -> None:
+        """
+        For an index rebuilt from scratch: keep *previous*'s dates as zero
+        entries, so the next take_affected() rewrites every date that was
+        persisted before, including dates left with no users at all.
+        """
+        for date_str in previous.new_by_date:
+            self.new_by_date.setdefault(date_str, 0)
+        if previous.new_by_date:
+            earliest = min(previous.new_by_date)
+            if self._dirty_from is None or earliest < self._dirty_from:
+                self._dirty_from = earliest
+
+    def chart(self) -> List[Dict]:
+        chart: List[Dict] = []
+        cumulative = 0
+        for date_str in sorted(self.new_by_date):
+            new = self.new_by_date[date_str]
+            if new <= 0:
+                continue
+            cumulative += new
+            chart.append({"date": date_str, "newUsers": new, "cumulativeUsers": cumulative})
+        return chart
+
+    def take_affected(self) -> List[Dict]:
+        """
+        Rows whose new-user or cumulative value changed since the last call:
+        every date from the earliest touched one onwards, including dates
+        that dropped to zero because a wallet moved earlier.
+        """
+        if self._dirty_from is None:
+            return []
+        rows: List[Dict] = []
+        cumulative = 0
+        for date_str in sorted(self.new_by_date):
+            new = self.new_by_date[date_str]
+            cumulative += new
+            if date_str >= self._dirty_from:
+                rows.append({"date": date_str, "newUsers": new, "cumulativeUsers": cumulative})
+        self._dirty_from = None
+        return rows
+
+    def to_state(self) -> Dict:
+        by_date: Dict[str, List[bytes]] = {}
+        for key, date_str in self.first_seen.items():
+            by_date.setdefault(date_str, []).append(key)
+        return {
+            "dates":      {d: base64.b64encode(b"".join(sorted(keys))).decode("ascii") for d, keys in by_date.items()},
+            "cursors":    dict(self.cursors),
+            "watermarks": dict(self.watermarks),
+            "deleted":    sorted(self.deleted),
+        }
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "FirstSeenIndex":
+        index = cls()
+        if not state:
+            return index
+        for date_str, packed in (state.get("dates") or {}).items():
+            members = SortedAddressSet.from_b64(packed)
+            for key in members:
+                index.first_seen[key] = date_str
+            index.new_by_date[date_str] = len(members)
+        index.cursors    = {k: int(v) for k, v in (state.get("cursors") or {}).items()}
+        index.watermarks = dict(state.get("watermarks") or {})
+        index.deleted    = set(state.get("deleted") or [])
+        return index
+
+
+# ── Benchmark: python -m user_store [n_addresses] ────────────────────────────
+
+def _bench(n: int = 200_000, delta: int = 2_000, chains: int = 5) -> None:
+    addrs = ["0x" + os.urandom(ADDRESS_BYTES).hex() for _ in range(n)]
+    per_chain = [addrs[i::chains] for i in range(chains)]
+    new_addrs = ["0x" + os.urandom(ADDRESS_BYTES).hex() for _ in range(delta)]
+
+    # Current approach: rebuild a set of lowercase hex strings every run
+    t0 = time.perf_counter()
+    users: set = set()
+    for chunk in per_chain:
+        users.update(a.lower() for a in chunk)
+    users.update(a.lower() for a in new_addrs)
+    set_rebuild_s = time.perf_counter() - t0
+    set_bytes = sys.getsizeof(users) + sum(sys.getsizeof(a) for a in users)
+
+    # Store: initial build once, then merge only the delta
+    t0 = time.perf_counter()
+    store = UniqueUserStore()
+    for cid, chunk in enumerate(per_chain):
+        store.merge(cid, chunk)
+    store_build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    store.merge(0, new_addrs)
+    total = store.total()
+    store_merge_s = time.perf_counter() - t0
+    store_bytes = store.union.nbytes + sum(s.nbytes for s in store.scopes.values())
+
+    assert total == len(users), (total, len(users))
+    print(f"addresses: {n} across {chains} chains, delta {delta}")
+    print(f"  set[str]  rebuild      : {set_rebuild_s * 1000:8.1f} ms   {set_bytes / 1e6:7.2f} MB")
+    print(f"  store     initial build: {store_build_s * 1000:8.1f} ms   {store_bytes / 1e6:7.2f} MB")
+    print(f"  store     delta + total: {store_merge_s * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    _bench(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)